@@ -1,13 +1,19 @@
 """
-API dependencies - authentication
+API dependencies - authentication and conditional requests
 """
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+import hashlib
+from typing import Dict, Optional
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.core.security import decode_access_token
-from app.services.auth_service import AuthService
+from app.db.async_database import get_async_db
+from app.core.config import settings
+from app.core.security import decode_access_token_claims
+from app.core.auth_cache import token_cache, admin_cache
+from app.services.auth_service import AsyncAuthService
+from app.services.table_version_service import TableVersionService
 
 # Use HTTPBearer for token in Authorization header
 security = HTTPBearer(auto_error=False)
@@ -15,11 +21,12 @@ security = HTTPBearer(auto_error=False)
 
 async def get_current_admin_id(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> int:
     """
     Extract and validate bearer token, return admin_id.
     Raises 401 if token is missing or invalid.
+    Verified tokens and existing admins are cached in-process (see app.core.auth_cache).
     """
     if credentials is None:
         raise HTTPException(
@@ -29,22 +36,97 @@ async def get_current_admin_id(
         )
     
     token = credentials.credentials
-    admin_id = decode_access_token(token)
+    use_cache = settings.AUTH_CACHE_ENABLED
+    admin_id = token_cache.get(token) if use_cache else None
     
     if admin_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        claims = decode_access_token_claims(token)
+        if claims is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        admin_id, expires_at = claims
+        if use_cache:
+            token_cache.set(token, admin_id, expires_at=expires_at)
     
     # Verify admin still exists
-    admin = AuthService.get_admin_by_id(db, admin_id)
+    if use_cache and admin_cache.get(admin_id):
+        return admin_id
+    admin = await AsyncAuthService.get_admin_by_id(db, admin_id)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Admin not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if use_cache:
+        admin_cache.set(admin_id, True)
     
     return admin_id
+
+
+async def get_websocket_admin_id(db: AsyncSession, token: Optional[str]) -> Optional[int]:
+    """
+    Admin id for a WebSocket's access token (the ?token= query parameter), or None if it
+    is missing, invalid or expired, or the admin no longer exists. Same checks and caches
+    as get_current_admin_id; the caller closes the socket instead of raising 401.
+    """
+    if not token:
+        return None
+    use_cache = settings.AUTH_CACHE_ENABLED
+    admin_id = token_cache.get(token) if use_cache else None
+    if admin_id is None:
+        claims = decode_access_token_claims(token)
+        if claims is None:
+            return None
+        admin_id, expires_at = claims
+        if use_cache:
+            token_cache.set(token, admin_id, expires_at=expires_at)
+    if use_cache and admin_cache.get(admin_id):
+        return admin_id
+    if not await AsyncAuthService.get_admin_by_id(db, admin_id):
+        return None
+    if use_cache:
+        admin_cache.set(admin_id, True)
+    return admin_id
+
+
+def compute_etag(request: Request, versions: Dict[str, int]) -> str:
+    """Strong ETag from the route path, the table versions and the normalized query parameters"""
+    params = sorted((key, value) for key, value in request.query_params.multi_items() if value != "")
+    raw = repr((request.url.path, sorted(versions.items()), params))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_on(*tables: str):
+    """
+    Dependency factory for conditional GETs on data derived from the given tables.
+    Looks up the tables' change versions (in-process while known current, else one
+    query) and raises 304 Not Modified when If-None-Match matches, before the route
+    runs its main query. Otherwise sets ETag
+    and Cache-Control on the response and returns those headers, for routes that
+    build their own Response. Declare it after get_current_admin_id.
+    """
+    def check_not_modified(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db)
+    ) -> Dict[str, str]:
+        etag = compute_etag(request, TableVersionService.current_versions(db, tables))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+    
+    return check_not_modified
@@ -2,24 +2,33 @@
 Auth router - login endpoint (no auth required)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_database import get_async_db
 from app.schemas.auth import LoginRequest, TokenResponse
-from app.services.auth_service import AuthService
+from app.services.auth_service import AsyncAuthService
 from app.core.config import settings
+from app.core.password_hashing import PasswordHashingUnavailable
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Login with login_id and password.
     Returns JWT bearer token valid for 8 hours.
+    Returns 503 when too many logins are already being checked.
     """
-    result = AuthService.authenticate_admin(
-        db, credentials.login_id, credentials.password
-    )
+    try:
+        result = await AsyncAuthService.authenticate_admin(
+            db, credentials.login_id, credentials.password
+        )
+    except PasswordHashingUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     if not result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
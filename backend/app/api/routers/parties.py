@@ -1,13 +1,17 @@
 """
 API router for Party operations
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.db.database import get_db
-from app.api.deps import get_current_admin_id
-from app.schemas.party import PartyCreate, PartyUpdate, PartyResponse
-from app.services.party_service import PartyService
+from app.db.async_database import get_async_db
+from app.api.deps import get_current_admin_id, conditional_on
+from app.schemas.party import PartyCreate, PartyUpdate, PartyResponse, PartyBalanceResponse
+from app.services.party_service import PartyService, AsyncPartyService
+from app.services.balance_service import BalanceService
+from app.services.table_version_service import PARTIES
 
 router = APIRouter(prefix="/parties", tags=["parties"])
 
@@ -15,12 +19,12 @@ router = APIRouter(prefix="/parties", tags=["parties"])
 @router.post("/", response_model=PartyResponse, status_code=status.HTTP_201_CREATED)
 async def create_party(
     party: PartyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Create a new party"""
     try:
-        db_party = PartyService.create_party(db, party)
+        db_party = await AsyncPartyService.create_party(db, party)
         return db_party
     except Exception as e:
         raise HTTPException(
@@ -32,10 +36,22 @@ async def create_party(
 @router.get("/", response_model=List[PartyResponse])
 def get_all_parties(
     db: Session = Depends(get_db),
-    admin_id: int = Depends(get_current_admin_id)
+    admin_id: int = Depends(get_current_admin_id),
+    cache_headers: dict = Depends(conditional_on(PARTIES))
 ):
     """Get all parties"""
-    return PartyService.get_all_parties(db)
+    return Response(content=PartyService.get_all_parties_json(db), media_type="application/json", headers=cache_headers)
+
+
+@router.get("/search", response_model=List[PartyResponse])
+def search_parties_ranked(
+    q: str = Query(..., min_length=1, description="Part of the party name"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of matches to return"),
+    db: Session = Depends(get_db),
+    admin_id: int = Depends(get_current_admin_id)
+):
+    """Typeahead search: best matching parties first (exact, then prefix, then substring)"""
+    return PartyService.search_parties_ranked(db, q, limit)
 
 
 @router.get("/{party_id}", response_model=PartyResponse)
@@ -54,15 +70,31 @@ def get_party(
     return db_party
 
 
+@router.get("/{party_id}/balance", response_model=PartyBalanceResponse)
+def get_party_balance(
+    party_id: int,
+    db: Session = Depends(get_db),
+    admin_id: int = Depends(get_current_admin_id)
+):
+    """Get the add/reduce totals and net outstanding amount of a party"""
+    balance = BalanceService.get_party_balance(db, party_id)
+    if not balance:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Party not found"
+        )
+    return balance
+
+
 @router.put("/{party_id}", response_model=PartyResponse)
 async def update_party(
     party_id: int,
     party_update: PartyUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Update a party (cascades to related transactions)"""
-    db_party = PartyService.update_party(db, party_id, party_update)
+    db_party = await AsyncPartyService.update_party(db, party_id, party_update)
     if not db_party:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,11 +106,11 @@ async def update_party(
 @router.delete("/{party_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_party(
     party_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Delete a party"""
-    success = PartyService.delete_party(db, party_id)
+    success = await AsyncPartyService.delete_party(db, party_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
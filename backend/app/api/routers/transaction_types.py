@@ -1,13 +1,16 @@
 """
 API router for Transaction Type operations
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.db.database import get_db
-from app.api.deps import get_current_admin_id
+from app.db.async_database import get_async_db
+from app.api.deps import get_current_admin_id, conditional_on
 from app.schemas.transaction_type import TransactionTypeCreate, TransactionTypeUpdate, TransactionTypeResponse
-from app.services.transaction_type_service import TransactionTypeService
+from app.services.transaction_type_service import TransactionTypeService, AsyncTransactionTypeService
+from app.services.table_version_service import TRANSACTION_TYPES
 
 router = APIRouter(prefix="/transaction-types", tags=["transaction-types"])
 
@@ -15,12 +18,12 @@ router = APIRouter(prefix="/transaction-types", tags=["transaction-types"])
 @router.post("/", response_model=TransactionTypeResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction_type(
     transaction_type: TransactionTypeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Create a new transaction type"""
     try:
-        db_transaction_type = TransactionTypeService.create_transaction_type(db, transaction_type)
+        db_transaction_type = await AsyncTransactionTypeService.create_transaction_type(db, transaction_type)
         return db_transaction_type
     except Exception as e:
         raise HTTPException(
@@ -32,10 +35,15 @@ async def create_transaction_type(
 @router.get("/", response_model=List[TransactionTypeResponse])
 def get_all_transaction_types(
     db: Session = Depends(get_db),
-    admin_id: int = Depends(get_current_admin_id)
+    admin_id: int = Depends(get_current_admin_id),
+    cache_headers: dict = Depends(conditional_on(TRANSACTION_TYPES))
 ):
     """Get all transaction types"""
-    return TransactionTypeService.get_all_transaction_types(db)
+    return Response(
+        content=TransactionTypeService.get_all_transaction_types_json(db),
+        media_type="application/json",
+        headers=cache_headers,
+    )
 
 
 @router.get("/{type_id}", response_model=TransactionTypeResponse)
@@ -58,11 +66,11 @@ def get_transaction_type(
 async def update_transaction_type(
     type_id: int,
     type_update: TransactionTypeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Update a transaction type (cascades to related transactions)"""
-    db_transaction_type = TransactionTypeService.update_transaction_type(db, type_id, type_update)
+    db_transaction_type = await AsyncTransactionTypeService.update_transaction_type(db, type_id, type_update)
     if not db_transaction_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,11 +82,11 @@ async def update_transaction_type(
 @router.delete("/{type_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction_type(
     type_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Delete a transaction type"""
-    success = TransactionTypeService.delete_transaction_type(db, type_id)
+    success = await AsyncTransactionTypeService.delete_transaction_type(db, type_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
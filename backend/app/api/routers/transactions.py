@@ -1,14 +1,33 @@
 """
 API router for Transaction operations
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from datetime import date
 from app.db.database import get_db
-from app.api.deps import get_current_admin_id
-from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
-from app.services.transaction_service import TransactionService
+from app.db.async_database import get_async_db
+from app.db.migrations import DatabaseNotMigratedError
+from app.api.deps import get_current_admin_id, conditional_on
+from app.core.fast_json import JSONRowsResponse
+from app.schemas.transaction import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionPage, BulkImportResult,
+    TransactionWithRelations,
+)
+from app.services.transaction_service import TransactionService, AsyncTransactionService, RESPONSE_KEYS
+from app.services.transaction_import_service import TransactionImportService
+from app.services.transaction_export_service import TransactionExportService
+from app.services.table_version_service import PARTIES, TRANSACTION_TYPES, TRANSACTIONS
+
+# Transaction reads depend on party names (filters) and type kinds (totals) as well
+transactions_not_modified = conditional_on(TRANSACTIONS, PARTIES, TRANSACTION_TYPES)
+
+# Uploads are kept in memory up to this size, then spooled to disk
+BULK_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
@@ -16,13 +35,18 @@ router = APIRouter(prefix="/transactions", tags=["transactions"])
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     transaction: TransactionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Create a new transaction"""
     try:
-        db_transaction = TransactionService.create_transaction(db, transaction)
+        db_transaction = await AsyncTransactionService.create_transaction(db, transaction)
         return db_transaction
+    except DatabaseNotMigratedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,55 +54,163 @@ async def create_transaction(
         )
 
 
-@router.get("/", response_model=List[TransactionResponse])
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_transactions(
+    request: Request,
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="Body format; defaults to the Content-Type (text/csv or application/x-ndjson)"
+    ),
+    db: Session = Depends(get_db),
+    admin_id: int = Depends(get_current_admin_id)
+):
+    """
+    Import transactions from a streamed CSV (with header) or NDJSON body.
+    Columns: date, party_id or party (name), type_id or type (note), amount, transaction_note.
+    Invalid rows are reported per row and do not abort the import.
+    """
+    if file_format is None:
+        content_type = request.headers.get("content-type", "")
+        file_format = "csv" if "csv" in content_type else "ndjson"
+    
+    with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        if file_format == "csv":
+            rows = TransactionImportService.iter_csv_rows(spool)
+        else:
+            rows = TransactionImportService.iter_ndjson_rows(spool)
+        # Parsing and inserts are blocking; keep them off the event loop
+        try:
+            return await run_in_threadpool(TransactionImportService.import_rows, db, rows)
+        except DatabaseNotMigratedError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e)
+            )
+
+
+@router.get("/", response_model=List[TransactionWithRelations])
 def get_all_transactions(
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: party, type"),
     party_filter: Optional[str] = Query(None, description="Filter by party name"),
+    party_ids: Optional[List[int]] = Query(None, description="Only these party ids (repeat the parameter); skips the name match"),
     date_start: Optional[date] = Query(None, description="Start date for date range filter"),
     date_end: Optional[date] = Query(None, description="Till date - show transactions up to this date"),
     db: Session = Depends(get_db),
+    admin_id: int = Depends(get_current_admin_id),
+    cache_headers: dict = Depends(transactions_not_modified)
+):
+    """Get all transactions with optional filters, optionally embedding party and type details"""
+    try:
+        relations = TransactionService.parse_include(include)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    # Large result: encode selected columns directly instead of validating ORM objects
+    rows = TransactionService.get_all_transaction_rows(db, party_filter, date_start, date_end, party_ids, relations)
+    return JSONRowsResponse(
+        RESPONSE_KEYS, rows, TransactionService.embedded_keys(relations), headers=cache_headers
+    )
+
+
+@router.get("/export")
+def export_transactions(
+    file_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="Export format"),
+    party_filter: Optional[str] = Query(None, description="Filter by party name"),
+    party_ids: Optional[List[int]] = Query(None, description="Only these party ids (repeat the parameter); skips the name match"),
+    date_start: Optional[date] = Query(None, description="Start date for date range filter"),
+    date_end: Optional[date] = Query(None, description="Till date - show transactions up to this date"),
     admin_id: int = Depends(get_current_admin_id)
 ):
-    """Get all transactions with optional filters"""
-    return TransactionService.get_all_transactions(db, party_filter, date_start, date_end)
+    """Stream filtered transactions, with party name and type note, as CSV or NDJSON"""
+    if file_format == "csv":
+        body = TransactionExportService.stream_csv(party_filter, date_start, date_end, party_ids)
+        media_type = "text/csv"
+    else:
+        body = TransactionExportService.stream_ndjson(party_filter, date_start, date_end, party_ids)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{file_format}"'},
+    )
+
+
+@router.get("/page", response_model=TransactionPage)
+def get_transactions_page(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of transactions to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    party_filter: Optional[str] = Query(None, description="Filter by party name"),
+    party_ids: Optional[List[int]] = Query(None, description="Only these party ids (repeat the parameter); skips the name match"),
+    date_start: Optional[date] = Query(None, description="Start date for date range filter"),
+    date_end: Optional[date] = Query(None, description="Till date - show transactions up to this date"),
+    db: Session = Depends(get_db),
+    admin_id: int = Depends(get_current_admin_id),
+    cache_headers: dict = Depends(transactions_not_modified)
+):
+    """Get one page of transactions (newest first) with optional filters"""
+    try:
+        items, next_cursor = TransactionService.get_transactions_page(
+            db, limit, cursor, party_filter, date_start, date_end, party_ids
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/outstanding/total")
 def get_outstanding_total(
     party_filter: Optional[str] = Query(None, description="Filter by party name"),
+    party_ids: Optional[List[int]] = Query(None, description="Only these party ids (repeat the parameter); skips the name match"),
     date_end: Optional[date] = Query(None, description="Till date - include transactions up to this date"),
     db: Session = Depends(get_db),
-    admin_id: int = Depends(get_current_admin_id)
+    admin_id: int = Depends(get_current_admin_id),
+    cache_headers: dict = Depends(transactions_not_modified)
 ):
     """Get outstanding amount for (optionally) filtered transactions."""
-    total = TransactionService.calculate_outstanding_total(db, party_filter, date_end)
+    total = TransactionService.calculate_outstanding_total(db, party_filter, date_end, party_ids)
     return {"total": total}
 
 
-@router.get("/{transaction_id}", response_model=TransactionResponse)
+@router.get("/{transaction_id}", response_model=TransactionWithRelations, response_model_exclude_unset=True)
 def get_transaction(
     transaction_id: int,
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: party, type"),
     db: Session = Depends(get_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
-    """Get a transaction by ID"""
-    db_transaction = TransactionService.get_transaction(db, transaction_id)
+    """Get a transaction by ID, optionally embedding party and type details"""
+    try:
+        relations = TransactionService.parse_include(include)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    db_transaction = TransactionService.get_transaction(db, transaction_id, relations)
     if not db_transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
-    return db_transaction
+    return TransactionService.to_response(db_transaction, relations)
 
 
 @router.put("/{transaction_id}", response_model=TransactionResponse)
 async def update_transaction(
     transaction_id: int,
     transaction_update: TransactionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Update a transaction"""
-    db_transaction = TransactionService.update_transaction(db, transaction_id, transaction_update)
+    db_transaction = await AsyncTransactionService.update_transaction(db, transaction_id, transaction_update)
     if not db_transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,11 +222,11 @@ async def update_transaction(
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_id: int = Depends(get_current_admin_id)
 ):
     """Delete a transaction"""
-    success = TransactionService.delete_transaction(db, transaction_id)
+    success = await AsyncTransactionService.delete_transaction(db, transaction_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
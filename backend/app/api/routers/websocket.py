@@ -1,41 +1,60 @@
 """
 WebSocket router for real-time updates
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.core.websocket_manager import manager
-from app.db.database import SessionLocal
-from app.services.transaction_service import TransactionService
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.api.deps import get_websocket_admin_id
+from app.core.websocket_manager import manager, RESYNC_MESSAGE
+from app.core.events import event_log
+from app.db.async_database import AsyncSessionLocal
+from app.services.transaction_service import AsyncTransactionService
 
 router = APIRouter()
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None,
+                             since: Optional[int] = None, epoch: Optional[str] = None):
+    """
+    WebSocket endpoint for real-time updates.
+    Requires ?token=<access token>; without a valid one the socket is closed with 1008.
+    Connect with ?since=<last seq>&epoch=<epoch> to receive only the events missed
+    while disconnected; a "resync" message means they are gone and the client must refetch.
+    """
+    async with AsyncSessionLocal() as db:
+        admin_id = await get_websocket_admin_id(db, token)
+    if admin_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    def backlog():
+        if since is None:
+            return []
+        missed = event_log.replay(since, epoch)
+        return [RESYNC_MESSAGE] if missed is None else missed
+    
+    await manager.connect(websocket, backlog)
     try:
-        # Send initial outstanding total when client connects
-        db = SessionLocal()
-        try:
-            total = TransactionService.calculate_outstanding_total(db)
-            await manager.send_personal_message({
-                "type": "outstanding_total",
-                "data": {"total": total}
-            }, websocket)
-        finally:
-            db.close()
+        # Send initial outstanding total (and the current position in the event stream)
+        async with AsyncSessionLocal() as db:
+            total = await AsyncTransactionService.calculate_outstanding_total(db)
+        await manager.send_personal_message({
+            "type": "outstanding_total",
+            "data": {"total": total, "seq": event_log.last_seq, "epoch": event_log.epoch}
+        }, websocket)
         
         # Keep connection alive and handle incoming messages
         while True:
             try:
                 # Wait for any message (text or ping/pong)
                 message = await websocket.receive()
-                # Handle ping/pong for keepalive
-                if message.get("type") == "websocket.receive":
-                    # Client can send ping or we just keep connection alive
-                    pass
+                if message.get("type") == "websocket.disconnect":
+                    break
+                # Client can send ping or we just keep connection alive
             except Exception:
                 # Connection closed or error
                 break
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
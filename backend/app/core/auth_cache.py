@@ -0,0 +1,69 @@
+"""
+In-process caches for authentication - verified tokens and admin existence
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.core.config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL or an explicit deadline"""
+    
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Cache a value until min(now + ttl, expires_at).
+        expires_at is a wall-clock timestamp (e.g. a JWT exp claim).
+        """
+        now = time.monotonic()
+        deadline = now + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, now + (expires_at - time.time()))
+        if deadline <= now:
+            return
+        with self._lock:
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Verified bearer token -> admin_id, never kept past the token's exp
+token_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+
+# admin_id -> True for admins known to exist; invalidated when an admin changes
+admin_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_ADMIN_CACHE_TTL_SECONDS)
@@ -2,7 +2,7 @@
 Application configuration settings
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 import os
 
 
@@ -15,6 +15,36 @@ class Settings(BaseSettings):
     #     DATABASE_URL = DATABASE_URL.replace(
     #         "postgresql://", "postgresql+asyncpg://"
     #     )
+    # Apply pending schema migrations and data set-up when the app starts. Off by default:
+    # run `python migrate.py` as a deploy step so instances start without touching the database
+    MIGRATE_ON_STARTUP: bool = False
+    
+    # Connection pool (per engine: the sync and the async engine each have one per worker)
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Replace connections older than this (-1 keeps them forever)
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # "always" pings on every checkout, "idle" only connections unused for
+    # DB_POOL_PRE_PING_IDLE_SECONDS, "never" relies on errors to drop dead connections
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+    # Connections opened per engine in the background after startup (0 disables)
+    DB_POOL_WARMUP_CONNECTIONS: int = 1
+    
+    # SQL instrumentation: statements slower than this are logged with their route
+    DB_SLOW_QUERY_MS: float = 200.0
+    # Warn when a request runs the same statement more than this many times (0 disables)
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
+    # Send X-DB-Queries and X-DB-Time (ms) response headers; for debugging and query budget checks
+    DB_DEBUG_HEADERS: bool = False
+    
+    # Logging: level for the app.* loggers, "json" lines or plain "text"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    # Serve Prometheus metrics at GET /metrics
+    METRICS_ENABLED: bool = True
+    
     # API
     API_V1_PREFIX: str = "/api/v1"
     
@@ -31,6 +61,40 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_HOURS: int = 8
     
+    # Password hashing (stored hashes are rehashed on login when BCRYPT_ROUNDS changes)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
+    
+    # Auth cache (verified tokens and admin existence, per process)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
+    # Bounds how long another worker may still accept a deleted admin
+    AUTH_ADMIN_CACHE_TTL_SECONDS: int = 60
+    
+    # WebSocket fan-out: per-client queue length and what to do when it overflows
+    # ("resync" replaces the backlog with a resync message, "evict" closes the connection)
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: Literal["resync", "evict"] = "resync"
+    # Recent change events kept for clients resuming with their last seq
+    WS_EVENT_BUFFER_SIZE: int = 1000
+    
+    # Event bus shared by worker processes: "memory" (single worker), "outbox"
+    # (table polling, any database) or "postgres" (outbox + LISTEN/NOTIFY)
+    EVENT_BUS_BACKEND: Literal["memory", "outbox", "postgres"] = "memory"
+    # Worker processes (uvicorn and gunicorn read WEB_CONCURRENCY as their default worker
+    # count); the app refuses to start with more than one on the "memory" bus, whose
+    # events never reach the other workers' websocket clients and caches
+    WEB_CONCURRENCY: int = 1
+    EVENT_BUS_POLL_INTERVAL_SECONDS: float = 0.2
+    # Outbox rows kept behind the newest event
+    EVENT_BUS_RETENTION: int = 10000
+    # How long delivery waits for a missing outbox id (a transaction that took the id but
+    # has not committed yet) before skipping it; a skipped event is still delivered late
+    EVENT_BUS_GAP_GRACE_SECONDS: float = 2.0
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,294 @@
+"""
+Pluggable pub/sub backends for change events.
+
+An event is published once, to the bus, and every worker process consumes it from
+the bus and fans it out to its own websocket clients. The bus also assigns the
+event's sequence number, so sequence numbers are global across workers.
+Events are published inside the writer's DB transaction, before it commits: they
+are delivered if and only if the change commits.
+
+Backends (EVENT_BUS_BACKEND):
+- "memory":   in-process only; fine for a single worker (default)
+- "outbox":   events are rows in the event_outbox table, polled by every worker;
+              works on any database, including SQLite for local runs and tests
+- "postgres": outbox rows plus LISTEN/NOTIFY, so workers wake up immediately
+              instead of waiting for the next poll
+"""
+import abc
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event, select, func, delete, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.event_outbox import EventOutbox
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "ledger_events"
+
+# Called with (seq, event_type, payload_json) for every event, in seq order; an event
+# that commits after later ones were consumed comes late, with a lower seq
+EventSink = Callable[[int, str, str], None]
+# Called once with the seq that consumption starts after, before the first event
+PositionSink = Callable[[int], None]
+
+# Outbox ids skipped after EVENT_BUS_GAP_GRACE_SECONDS, and ids missing just below the
+# start position, are still watched for this long and delivered late if they commit
+LATE_EVENT_WATCH_SECONDS = 300.0
+# Ids below the start position watched for late commits
+STARTUP_WATCH_IDS = 1000
+POLL_BATCH_SIZE = 500
+
+# Session.info key of the callbacks to run once the session's transaction commits
+_ON_COMMIT = "event_bus_on_commit"
+
+
+class EventBus(abc.ABC):
+    """Base class: publish events and feed every consumed event to a sink"""
+    
+    epoch: str
+    
+    @abc.abstractmethod
+    def publish(self, db: Session, event_type: str, data: dict) -> None:
+        """Publish an event with the caller's open DB transaction; call before db.commit()"""
+    
+    @abc.abstractmethod
+    async def start(self, sink: EventSink, start_at: Optional[PositionSink] = None) -> None:
+        """Start consuming events into sink"""
+    
+    async def stop(self) -> None:
+        """Stop consuming events"""
+
+
+class InProcessEventBus(EventBus):
+    """Delivers events straight to this process's sink"""
+    
+    def __init__(self):
+        # A fresh sequence per process; resuming clients from before a restart must resync
+        self.epoch = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._sink: Optional[EventSink] = None
+    
+    def publish(self, db: Session, event_type: str, data: dict) -> None:
+        payload = json.dumps(data, default=str)
+        db.info.setdefault(_ON_COMMIT, []).append(lambda: self._deliver(event_type, payload))
+    
+    def _deliver(self, event_type: str, payload: str) -> None:
+        with self._lock:
+            self._seq += 1
+            # Hand over while holding the lock so the sink sees events in seq order
+            if self._sink is not None:
+                self._sink(self._seq, event_type, payload)
+    
+    async def start(self, sink: EventSink, start_at: Optional[PositionSink] = None) -> None:
+        with self._lock:
+            if start_at is not None:
+                start_at(self._seq)
+            self._sink = sink
+
+
+class OutboxEventBus(EventBus):
+    """
+    Events are rows in event_outbox; each worker polls for rows newer than the last it
+    delivered. Ids are assigned at insert but become visible at commit, so a lower id
+    can appear after a higher one: delivery stops at a missing id until it commits or
+    gap_grace seconds pass, and a skipped id that commits later is still delivered, late.
+    """
+    
+    epoch = "outbox"
+    
+    def __init__(self, poll_interval: float, retention: int, gap_grace: float):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.gap_grace = gap_grace
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Missing id -> when it was first seen missing
+        self._gaps: Dict[int, float] = {}
+        # Skipped id -> until when it is still watched
+        self._late: Dict[int, float] = {}
+    
+    def publish(self, db: Session, event_type: str, data: dict) -> None:
+        # Committed (and visible to the pollers) together with the caller's change
+        db.execute(EventOutbox.__table__.insert().values(
+            type=event_type, payload=json.dumps(data, default=str)
+        ))
+    
+    async def start(self, sink: EventSink, start_at: Optional[PositionSink] = None) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._poll(sink, start_at))
+    
+    def take_in_order(self, rows: List[Tuple], last_id: int, now: float) -> Tuple[List[Tuple], int]:
+        """
+        The rows (ordered by id, all after last_id) that can be delivered now, and the new
+        last_id: stops before a missing id that has been missing for less than gap_grace;
+        older gaps are skipped and watched as late events
+        """
+        ready = []
+        expected = last_id + 1
+        for row in rows:
+            while expected < row[0]:
+                missing_since = self._gaps.setdefault(expected, now)
+                if now - missing_since < self.gap_grace:
+                    return ready, last_id
+                del self._gaps[expected]
+                self._late[expected] = now + LATE_EVENT_WATCH_SECONDS
+                expected += 1
+            self._gaps.pop(row[0], None)
+            ready.append(row)
+            last_id = expected = row[0]
+            expected += 1
+        return ready, last_id
+    
+    def _next_wait(self, now: float) -> float:
+        """Seconds until the next poll: the poll interval, or sooner when a gap's grace period ends"""
+        if not self._gaps:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, min(self._gaps.values()) + self.gap_grace - now))
+    
+    async def _start_position(self, db) -> int:
+        """Newest event id; the missing ids just below it may still commit and are watched"""
+        last_id = (await db.execute(select(func.max(EventOutbox.id)))).scalar() or 0
+        floor = max(last_id - min(STARTUP_WATCH_IDS, self.retention), 0)
+        present = set((await db.execute(select(EventOutbox.id).where(EventOutbox.id > floor))).scalars())
+        deadline = time.monotonic() + LATE_EVENT_WATCH_SECONDS
+        self._late = {event_id: deadline for event_id in range(floor + 1, last_id + 1) if event_id not in present}
+        return last_id
+    
+    async def _poll_late(self, db, sink: EventSink, now: float) -> None:
+        """Deliver skipped events that have committed since, and stop watching expired ones"""
+        self._late = {event_id: deadline for event_id, deadline in self._late.items() if deadline > now}
+        if not self._late:
+            return
+        rows = (await db.execute(
+            select(EventOutbox.id, EventOutbox.type, EventOutbox.payload)
+            .where(EventOutbox.id.in_(sorted(self._late)))
+            .order_by(EventOutbox.id)
+        )).all()
+        for seq, event_type, payload in rows:
+            del self._late[seq]
+            logger.warning("Event %d committed after later events were delivered; delivering it late", seq)
+            sink(seq, event_type, payload)
+    
+    async def _poll(self, sink: EventSink, start_at: Optional[PositionSink]) -> None:
+        from app.db.async_database import AsyncSessionLocal
+        
+        last_id = None
+        polls = 0
+        failing = False
+        while True:
+            full_batch = False
+            try:
+                async with AsyncSessionLocal() as db:
+                    if last_id is None:
+                        # Start after the newest event; read here so a slow database does not hold up startup
+                        last_id = await self._start_position(db)
+                        if start_at is not None:
+                            start_at(last_id)
+                    rows = (await db.execute(
+                        select(EventOutbox.id, EventOutbox.type, EventOutbox.payload)
+                        .where(EventOutbox.id > last_id)
+                        .order_by(EventOutbox.id)
+                        .limit(POLL_BATCH_SIZE)
+                    )).all()
+                    now = time.monotonic()
+                    ready, last_id = self.take_in_order(rows, last_id, now)
+                    for seq, event_type, payload in ready:
+                        sink(seq, event_type, payload)
+                    await self._poll_late(db, sink, now)
+                    full_batch = len(ready) == POLL_BATCH_SIZE
+                    polls += 1
+                    if polls % 100 == 0 and last_id > self.retention:
+                        await db.execute(delete(EventOutbox).where(EventOutbox.id <= last_id - self.retention))
+                        await db.commit()
+                if failing:
+                    logger.info("Event outbox poll recovered")
+                    failing = False
+                if full_batch:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Database hiccup: keep the worker alive and retry on the next tick,
+                # logging once per outage rather than on every poll
+                if not failing:
+                    logger.warning("Event outbox poll failed; retrying", exc_info=True)
+                failing = True
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_wait(time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class PostgresEventBus(OutboxEventBus):
+    """Outbox rows plus NOTIFY at commit; LISTENing workers poll as soon as an event lands"""
+    
+    def __init__(self, dsn: str, poll_interval: float, retention: int, gap_grace: float):
+        super().__init__(poll_interval, retention, gap_grace)
+        self.dsn = dsn
+        self._listener = None
+    
+    def publish(self, db: Session, event_type: str, data: dict) -> None:
+        db.execute(EventOutbox.__table__.insert().values(
+            type=event_type, payload=json.dumps(data, default=str)
+        ))
+        # Delivered to listeners when this transaction commits
+        db.execute(text(f"NOTIFY {NOTIFY_CHANNEL}"))
+    
+    async def start(self, sink: EventSink, start_at: Optional[PositionSink] = None) -> None:
+        import asyncpg
+        
+        await super().start(sink, start_at)
+        self._listener = await asyncpg.connect(self.dsn)
+        await self._listener.add_listener(NOTIFY_CHANNEL, lambda *args: self._wakeup.set())
+    
+    async def stop(self) -> None:
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+        await super().stop()
+
+
+def create_event_bus() -> EventBus:
+    """Build the backend selected by EVENT_BUS_BACKEND"""
+    backend = settings.EVENT_BUS_BACKEND
+    if backend == "outbox":
+        return OutboxEventBus(
+            settings.EVENT_BUS_POLL_INTERVAL_SECONDS, settings.EVENT_BUS_RETENTION, settings.EVENT_BUS_GAP_GRACE_SECONDS
+        )
+    if backend == "postgres":
+        dsn = settings.DATABASE_URL.replace("postgresql+psycopg2://", "postgresql://")
+        # The fallback poll only matters if a notification is missed
+        return PostgresEventBus(
+            dsn, max(settings.EVENT_BUS_POLL_INTERVAL_SECONDS, 5.0), settings.EVENT_BUS_RETENTION,
+            settings.EVENT_BUS_GAP_GRACE_SECONDS,
+        )
+    return InProcessEventBus()
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session) -> None:
+    """Deliver the in-process events published in the transaction that just committed"""
+    for callback in session.info.pop(_ON_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_ON_COMMIT, None)
@@ -0,0 +1,112 @@
+"""
+Change events for real-time updates.
+
+Services publish typed delta events (e.g. "transaction.created") inside the DB
+transaction of the change, right before committing. Events go through the configured event bus (app.core.event_bus), which assigns each
+one a sequence number; every worker consumes them into an in-memory ring buffer and
+broadcasts them to its websocket clients, so a reconnecting client can ask for
+everything after the last sequence number it saw.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.event_bus import create_event_bus
+from app.core.websocket_manager import manager
+
+
+class EventLog:
+    """Sequenced ring buffer of encoded events, delivered to the websocket manager"""
+    
+    def __init__(self, buffer_size: int, epoch: str):
+        self.epoch = epoch
+        self._seq = 0
+        # Replay covers exactly the seqs after _floor up to _seq; None until the bus
+        # reports where this worker started consuming
+        self._floor: Optional[int] = None
+        self._buffer: "deque[tuple]" = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listeners: List[Callable[[str, str], None]] = []
+    
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent event (0 if none)"""
+        return self._seq
+    
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Remember the event loop that owns the websocket connections"""
+        self._loop = loop
+    
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Call listener(event_type, payload) for every consumed event, e.g. to keep local caches in sync"""
+        self._listeners.append(listener)
+    
+    def start_at(self, seq: int) -> None:
+        """Start the sequence after seq, the bus position this worker consumes from"""
+        with self._lock:
+            self._seq = seq
+            self._floor = seq
+    
+    def receive(self, seq: int, event_type: str, payload: str) -> None:
+        """
+        Buffer and broadcast one event consumed from the bus; safe to call from any thread.
+        An event with a seq at or below the newest one (committed after later events went
+        out) is broadcast with "late": true, so clients apply it without moving their position.
+        """
+        with self._lock:
+            late = seq <= self._seq
+            flag = '"late": true, ' if late else ""
+            message = f'{{"type": {json.dumps(event_type)}, "seq": {seq}, "epoch": {json.dumps(self.epoch)}, {flag}"data": {payload}}}'.encode()
+            if self._floor is None:
+                self._floor = seq - 1
+            if late:
+                # Not in the buffer: a client resuming from any position up to now may
+                # have missed it, so those must resync
+                self._floor = self._seq + 1
+            else:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._floor = self._buffer[0][0]
+                self._seq = seq
+                self._buffer.append((seq, message))
+            # Deliver while holding the lock so clients receive events in seq order
+            self._deliver(message)
+            for listener in self._listeners:
+                listener(event_type, payload)
+    
+    def _deliver(self, message: bytes) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None:
+            manager.broadcast_bytes(message)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(manager.broadcast_bytes, message)
+    
+    def replay(self, since: int, epoch: Optional[str] = None) -> Optional[List[bytes]]:
+        """
+        Encoded events with seq > since, or None if this worker cannot prove it has
+        them all (since is before the buffered range or after the newest event this
+        worker consumed, or the client's epoch is from another sequence), in which
+        case the client must resync.
+        """
+        if epoch is not None and epoch != self.epoch:
+            return None
+        with self._lock:
+            if self._floor is None or not self._floor <= since <= self._seq:
+                return None
+            return [message for seq, message in self._buffer if seq > since]
+
+
+# Global event bus and this worker's event log
+event_bus = create_event_bus()
+event_log = EventLog(settings.WS_EVENT_BUFFER_SIZE, event_bus.epoch)
+
+
+def publish_event(db: Session, event_type: str, data: dict) -> None:
+    """Publish a change event to every connected client of every worker"""
+    event_bus.publish(db, event_type, data)
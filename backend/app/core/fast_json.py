@@ -0,0 +1,60 @@
+"""
+Fast JSON responses for trusted database rows
+"""
+from typing import Dict, Optional, Sequence
+import orjson
+from fastapi.responses import Response
+
+# Rows encoded per orjson call; bounds the temporary dicts alive at once
+ENCODE_CHUNK_SIZE = 5000
+
+
+def _to_objects(keys: Sequence[str], rows: Sequence[tuple],
+                nested: Optional[Dict[str, Sequence[str]]]) -> list:
+    if not nested:
+        return [dict(zip(keys, row)) for row in rows]
+    # Columns after the first len(keys) belong to the nested objects, in order
+    spans = []
+    offset = len(keys)
+    for name, nested_keys in nested.items():
+        spans.append((name, nested_keys, offset, offset + len(nested_keys)))
+        offset += len(nested_keys)
+    objects = []
+    for row in rows:
+        item = dict(zip(keys, row))
+        for name, nested_keys, start, end in spans:
+            item[name] = dict(zip(nested_keys, row[start:end]))
+        objects.append(item)
+    return objects
+
+
+def encode_rows(keys: Sequence[str], rows: Sequence[tuple],
+                nested: Optional[Dict[str, Sequence[str]]] = None) -> bytes:
+    """
+    Encode row tuples as a JSON array of objects with the given keys. With nested
+    ({"party": ("name", ...)}), the remaining columns become nested objects.
+    """
+    if not rows:
+        return b"[]"
+    parts = []
+    for start in range(0, len(rows), ENCODE_CHUNK_SIZE):
+        # Each chunk encodes as "[...]"; strip the brackets and join the chunks with commas
+        parts.append(orjson.dumps(
+            _to_objects(keys, rows[start:start + ENCODE_CHUNK_SIZE], nested),
+            option=orjson.OPT_UTC_Z,
+        )[1:-1])
+    return b"[" + b",".join(parts) + b"]"
+
+
+class JSONRowsResponse(Response):
+    """
+    JSON array built straight from row tuples with orjson.
+    No ORM objects and no response-model validation, so only use it for rows selected
+    from the database in the shape of the route's response_model (keep response_model
+    on the route for the OpenAPI schema). Routes opt in by returning it.
+    """
+    media_type = "application/json"
+    
+    def __init__(self, keys: Sequence[str], rows: Sequence[tuple],
+                 nested: Optional[Dict[str, Sequence[str]]] = None, **kwargs):
+        super().__init__(content=encode_rows(keys, rows, nested), **kwargs)
@@ -0,0 +1,119 @@
+"""
+Request timing middleware
+"""
+import logging
+import time
+from typing import Dict
+from starlette.routing import NoMatchFound
+from app.core.config import settings
+from app.core.metrics import (
+    db_repeated_statements_total, http_request_db_seconds, http_request_db_statements,
+    http_request_duration_seconds, http_requests_in_flight, http_requests_total,
+    websocket_connections, websocket_connections_total,
+)
+from app.db.query_stats import QueryStats, begin_request, current_stats, end_request, statement_shape
+
+logger = logging.getLogger(__name__)
+
+# Logged statements are cut to this many characters
+LOGGED_STATEMENT_CHARS = 500
+
+# Route -> prefix its router was included under
+_route_prefixes: Dict[int, str] = {}
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route, e.g. /api/v1/parties/{party_id}, or
+    "unmatched". Templates keep the label cardinality bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    prefix = _route_prefixes.get(id(route))
+    if prefix is None:
+        # Routes of included routers carry their path without the include prefix;
+        # recover it once from the concrete request path
+        path = scope["path"]
+        try:
+            suffix = route.url_path_for(route.name, **scope.get("path_params", {}))
+        except NoMatchFound:
+            suffix = None
+        prefix = path[:len(path) - len(suffix)] if suffix and path.endswith(suffix) else ""
+        _route_prefixes[id(route)] = prefix
+    return prefix + route.path
+
+
+def _report_queries(queries: QueryStats, method: str, template: str) -> None:
+    """Log the request's slow statements and statements repeated past DB_N_PLUS_ONE_THRESHOLD"""
+    for seconds, statement in queries.slow:
+        logger.warning(
+            "Slow query in %s %s (%.0fms): %s",
+            method, template, seconds * 1000, statement_shape(statement)[:LOGGED_STATEMENT_CHARS],
+        )
+    threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    if threshold:
+        for shape, count in queries.repeated(threshold):
+            db_repeated_statements_total.inc(method, template)
+            logger.warning(
+                "Possible N+1 in %s %s: same statement ran %d times: %s",
+                method, template, count, shape[:LOGGED_STATEMENT_CHARS],
+            )
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status code, SQL statements and SQL time per route template,
+    in-flight requests and open WebSocket connections, and reports slow and repeated
+    statements. Plain ASGI, so streamed responses pass through untouched and are
+    timed until their last chunk.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            websocket_connections.inc()
+            websocket_connections_total.inc()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                websocket_connections.dec()
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.DB_DEBUG_HEADERS:
+                    # SQL run before the response starts (all of it, unless the body is streamed)
+                    message = {**message, "headers": [
+                        *message.get("headers", ()),
+                        (b"x-db-queries", str(queries.statements).encode()),
+                        (b"x-db-time", f"{queries.seconds * 1000:.2f}".encode()),
+                    ]}
+            await send(message)
+        
+        token = begin_request()
+        queries = current_stats()
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            end_request(token)
+            template = route_template(scope)
+            method = scope["method"]
+            http_requests_total.inc(method, template, str(status))
+            http_request_duration_seconds.observe(elapsed, method, template)
+            http_request_db_seconds.observe(queries.seconds, method, template)
+            http_request_db_statements.observe(queries.statements, method, template)
+            _report_queries(queries, method, template)
@@ -0,0 +1,23 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import date
+from typing import Tuple
+
+
+def encode_cursor(last_date: date, last_serial_number: int) -> str:
+    """Encode the (date, serial_number) of the last row on a page into an opaque cursor"""
+    raw = json.dumps({"d": last_date.isoformat(), "s": last_serial_number}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Decode an opaque cursor back into (date, serial_number). Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(payload["d"]), int(payload["s"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,88 @@
+"""
+Dedicated, size-limited executor for password hashing and verification.
+
+bcrypt is deliberately slow; running it on the shared threadpool lets a burst of
+logins starve every other sync route. Work submitted here runs on its own small
+pool, with a cap on queued requests and a timeout on waiting for a result.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+from app.core.config import settings
+from app.core.security import pwd_context
+
+T = TypeVar("T")
+
+
+class PasswordHashingUnavailable(Exception):
+    """Raised when the password hashing queue is full or a result did not arrive in time"""
+
+
+class PasswordHashExecutor:
+    """Runs password hashing on a bounded pool with bounded queueing and a per-call timeout"""
+    
+    def __init__(self, max_workers: int, max_pending: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        """Calls running or queued"""
+        return self._pending
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+    
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+    
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        Run fn(*args) on the hashing pool.
+        The slot is held until the work really finishes, even if the caller timed out,
+        so the pool can never be oversubscribed.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashingUnavailable("Too many concurrent password checks, retry shortly")
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise PasswordHashingUnavailable("Password check timed out, retry shortly")
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also return a new hash if the stored one uses an outdated cost factor"""
+        return await self.run(pwd_context.verify_and_update, plain_password, hashed_password)
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost factor"""
+        return await self.run(pwd_context.hash, password)
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global password hashing executor
+password_executor = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    timeout_seconds=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,94 @@
+"""
+In-process cache of table versions and serialized reference-data responses
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Tables modified by each change event (deletes cascade to transactions)
+EVENT_TABLES = {
+    "party.deleted": ("parties", "transactions"),
+    "party.": ("parties",),
+    "transaction_type.deleted": ("transaction_types", "transactions"),
+    "transaction_type.": ("transaction_types",),
+    "transaction.": ("transactions",),
+    "transactions.": ("transactions",),
+}
+
+
+class ReferenceDataCache:
+    """
+    Table versions known to be current, and pre-serialized response bodies keyed by
+    the table's DB version counter.
+    While a table is known to be unchanged a hit touches no database at all. A write
+    (in this worker on commit, or in another one via its change event) marks the table
+    unknown; the next request then reads the version counter once and only reloads the
+    table if the counter moved. The counter is incremented in the writer's transaction,
+    so by the time either invalidation happens it already holds the new version.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, bytes]] = {}
+        # Versions known to be current
+        self._current: Dict[str, int] = {}
+        self._generation: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, table: str, read_version: Callable[[], int], load: Callable[[], bytes]) -> bytes:
+        """Cached body for table, refreshed with load() when read_version() says it changed"""
+        with self._lock:
+            entry = self._entries.get(table)
+            if entry is not None and self._current.get(table) == entry[0]:
+                return entry[1]
+            generation = self._generation.get(table, 0)
+        
+        # Read the version before the data: a write in between only makes the entry look older
+        version = read_version()
+        if entry is None or entry[0] != version:
+            entry = (version, load())
+        with self._lock:
+            self._entries[table] = entry
+            # An invalidation that raced with this load wins
+            if self._generation.get(table, 0) == generation:
+                self._current[table] = version
+        return entry[1]
+    
+    def versions(self, tables: Iterable[str],
+                 read_versions: Callable[[List[str]], Dict[str, int]]) -> Dict[str, int]:
+        """Current versions of tables, reading only the ones not known to be current"""
+        tables = list(tables)
+        with self._lock:
+            known = {table: self._current[table] for table in tables if table in self._current}
+            generations = {table: self._generation.get(table, 0) for table in tables}
+        missing = [table for table in tables if table not in known]
+        if missing:
+            fresh = read_versions(missing)
+            with self._lock:
+                for table, version in fresh.items():
+                    if self._generation.get(table, 0) == generations[table]:
+                        self._current[table] = version
+            known.update(fresh)
+        return known
+    
+    def invalidate(self, table: str) -> None:
+        """Forget that the cached version of table is current"""
+        with self._lock:
+            self._current.pop(table, None)
+            self._generation[table] = self._generation.get(table, 0) + 1
+    
+    def apply_event(self, event_type: str, payload: str) -> None:
+        """Invalidate the table a change event consumed from the event bus refers to"""
+        for prefix, tables in EVENT_TABLES.items():
+            if event_type.startswith(prefix):
+                for table in tables:
+                    self.invalidate(table)
+                return
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+
+
+# Global reference data cache
+reference_cache = ReferenceDataCache()
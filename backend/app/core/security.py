@@ -2,17 +2,24 @@
 Security utilities - JWT and password hashing
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured cost makes any other cost "needs update", so
+# hashes are transparently rehashed when BCRYPT_ROUNDS is raised or lowered
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    print(f"Verifying password: {plain_password} against hash: {hashed_password}")
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -34,6 +41,12 @@ def create_access_token(admin_id: int) -> str:
 
 def decode_access_token(token: str) -> Optional[int]:
     """Decode and verify JWT token, return admin_id or None"""
+    claims = decode_access_token_claims(token)
+    return claims[0] if claims else None
+
+
+def decode_access_token_claims(token: str) -> Optional[Tuple[int, float]]:
+    """Decode and verify JWT token, return (admin_id, exp timestamp) or None"""
     try:
         payload = jwt.decode(
             token,
@@ -41,8 +54,8 @@ def decode_access_token(token: str) -> Optional[int]:
             algorithms=[settings.JWT_ALGORITHM]
         )
         admin_id = payload.get("sub")
-        if admin_id is None:
+        if admin_id is None or payload.get("exp") is None:
             return None
-        return int(admin_id)
-    except JWTError:
+        return int(admin_id), float(payload["exp"])
+    except (JWTError, ValueError):
         return None
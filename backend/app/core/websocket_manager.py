@@ -1,43 +1,106 @@
 """
 WebSocket connection manager for real-time updates
 """
-from typing import List
+import asyncio
+from typing import Callable, Dict, List, Optional
+import orjson
 from fastapi import WebSocket
-import json
+from app.core.config import settings
+
+# Sent to a client whose queue overflowed (with the "resync" policy): refetch everything
+RESYNC_MESSAGE = orjson.dumps({"type": "resync", "data": {}})
+
+
+class ClientConnection:
+    """One connected client: a bounded queue of pre-encoded messages and the task draining it"""
+    
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
 
 
 class ConnectionManager:
-    """Manages WebSocket connections and broadcasts messages"""
+    """
+    Manages WebSocket connections and broadcasts messages.
+    Each connection has its own bounded send queue and writer task, so a slow client
+    only delays itself. Messages are serialized and UTF-8 encoded once per broadcast,
+    and the same bytes are sent to every client as binary frames (JSON text).
+    """
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, queue_size: Optional[int] = None, overflow_policy: Optional[str] = None):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.WS_OVERFLOW_POLICY
+        self.clients: Dict[WebSocket, ClientConnection] = {}
     
-    async def connect(self, websocket: WebSocket):
-        """Accept a new WebSocket connection"""
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Currently connected websockets"""
+        return list(self.clients)
+    
+    async def connect(self, websocket: WebSocket, backlog: Optional[Callable[[], List[bytes]]] = None):
+        """
+        Accept a new WebSocket connection and start its writer task.
+        backlog, if given, is called once the client is registered and its messages are
+        queued ahead of any later broadcast (used to replay missed events without gaps).
+        """
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = ClientConnection(websocket, self.queue_size)
+        self.clients[websocket] = client
+        for payload in (backlog() if backlog else []):
+            self._enqueue(client, payload)
+        client.writer = asyncio.create_task(self._writer(client))
     
     def disconnect(self, websocket: WebSocket):
-        """Remove a WebSocket connection"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        """Remove a WebSocket connection and stop its writer task"""
+        client = self.clients.pop(websocket, None)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+    
+    async def _writer(self, client: ClientConnection):
+        """Drain one client's queue; a failed send drops the client"""
+        try:
+            while True:
+                payload = await client.queue.get()
+                if payload is None:
+                    await client.websocket.close(code=1008)
+                    break
+                await client.websocket.send_bytes(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        self.disconnect(client.websocket)
+    
+    def _enqueue(self, client: ClientConnection, payload: bytes) -> None:
+        """Queue an encoded message for a client, applying the overflow policy when its queue is full"""
+        try:
+            client.queue.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Drop whatever the client has not received yet
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        if self.overflow_policy == "evict":
+            client.queue.put_nowait(None)
+        else:
+            client.queue.put_nowait(RESYNC_MESSAGE)
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to a specific connection"""
-        await websocket.send_json(message)
+        client = self.clients.get(websocket)
+        if client:
+            self._enqueue(client, orjson.dumps(message))
     
     async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
-        
-        # Remove disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+        """Broadcast message to all connected clients without waiting for any of them"""
+        self.broadcast_bytes(orjson.dumps(message))
+    
+    def broadcast_bytes(self, payload: bytes):
+        """Queue an already-encoded JSON message for every connected client"""
+        for client in list(self.clients.values()):
+            self._enqueue(client, payload)
     
     async def broadcast_update(self, event_type: str, data: dict):
         """Broadcast a standardized update message"""
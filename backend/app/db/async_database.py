@@ -0,0 +1,75 @@
+"""
+Async database configuration and session management.
+
+Mirrors app/db/database.py for async routes: the same DATABASE_URL is mapped to an
+asyncio driver (asyncpg for PostgreSQL, aiosqlite for SQLite) so DB round trips
+no longer block the event loop.
+"""
+import threading
+from typing import Optional
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from app.core.config import settings
+from app.db.pool import instrument_pool, pool_options, pool_stats
+from app.db.query_stats import track_queries
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL to the equivalent asyncio driver URL"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async database engine, created on first use (see get_engine)"""
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                engine = create_async_engine(
+                    to_async_url(settings.DATABASE_URL),
+                    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+                    **pool_options(settings.DATABASE_URL, asyncio=True)
+                )
+                instrument_pool(engine.sync_engine, pool_stats["async"])
+                track_queries(engine.sync_engine)
+                AsyncSessionLocal.configure(bind=engine)
+                _async_engine = engine
+    return _async_engine
+
+
+class _LazyAsyncSessionMaker(async_sessionmaker):
+    """async_sessionmaker that creates the engine on the first session"""
+    
+    def __call__(self, **local_kw):
+        get_async_engine()
+        return super().__call__(**local_kw)
+
+
+# Create async session factory; objects stay usable after commit without a lazy reload
+AsyncSessionLocal = _LazyAsyncSessionMaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def __getattr__(name: str):
+    # `from app.db.async_database import async_engine` keeps working, creating the engine at that point
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
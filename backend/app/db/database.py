@@ -1,21 +1,51 @@
 """
 Database configuration and session management
 """
+import threading
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import instrument_pool, pool_options, pool_stats
+from app.db.query_stats import track_queries
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    The database engine, created on first use so that importing the app does no
+    database work (the driver is loaded and connections are opened only when needed)
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    settings.DATABASE_URL,
+                    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+                    **pool_options(settings.DATABASE_URL)
+                )
+                instrument_pool(engine, pool_stats["sync"])
+                track_queries(engine)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+class _LazySessionMaker(sessionmaker):
+    """sessionmaker that creates the engine on the first session"""
+    
+    def __call__(self, **local_kw):
+        get_engine()
+        return super().__call__(**local_kw)
 
-print(f"Database URL: {settings.DATABASE_URL}")
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    pool_pre_ping=True
-)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
 
 # Base class for models
 Base = declarative_base()
@@ -25,9 +55,15 @@ def get_db():
     """
     Dependency function to get database session
     """
-    print("Creating new database session")
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def __getattr__(name: str):
+    # `from app.db.database import engine` keeps working, creating the engine at that point
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
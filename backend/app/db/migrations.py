@@ -0,0 +1,336 @@
+"""
+Versioned schema migrations
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, Tuple
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, func, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+# PostgreSQL advisory lock key held while migrating
+MIGRATION_LOCK_ID = 7_301_994
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class Migration:
+    """
+    One schema change. upgrade/downgrade receive a Connection and must be idempotent
+    (IF [NOT] EXISTS), so a migration interrupted half-way can simply be re-run.
+    Non-transactional migrations run on an autocommit connection, which PostgreSQL
+    requires for CREATE INDEX CONCURRENTLY.
+    """
+
+    def __init__(self, version: int, name: str, upgrade: Callable[[Connection], None],
+                 downgrade: Optional[Callable[[Connection], None]] = None, transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.downgrade = downgrade
+        self.transactional = transactional
+
+
+def _is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: str, using: str = "") -> None:
+    """Create an index without blocking writes (CONCURRENTLY on PostgreSQL)"""
+    if _is_postgres(conn):
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        invalid = conn.execute(text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {using}({columns})"))
+    else:
+        # SQLite builds the index in one short write transaction; readers are not blocked under WAL
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _drop_index(conn: Connection, name: str) -> None:
+    concurrently = "CONCURRENTLY " if _is_postgres(conn) else ""
+    conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+
+
+# --- Frozen table definitions ------------------------------------------------
+# Tables as each migration created them, independent of the live models: a later
+# model change needs a new migration and never alters what an old one creates.
+
+SCHEMA = MetaData()
+
+BASELINE_TABLES = [
+    Table(
+        "admins", SCHEMA,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("login_id", String, nullable=False, unique=True, index=True),
+        Column("hashed_password", String, nullable=False),
+    ),
+    Table(
+        "parties", SCHEMA,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String, nullable=False, index=True),
+        Column("billing_name", String, nullable=True),
+        Column("location", String, nullable=True),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    ),
+    Table(
+        "transaction_types", SCHEMA,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("note", String, nullable=False),
+        Column("type", String, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    ),
+    Table(
+        "transactions", SCHEMA,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("serial_number", Integer, nullable=False, unique=True, index=True),
+        Column("date", Date, nullable=False, index=True),
+        Column("party_id", Integer, ForeignKey("parties.id"), nullable=False, index=True),
+        Column("transaction_note", String, nullable=True),
+        Column("type_id", Integer, ForeignKey("transaction_types.id"), nullable=False, index=True),
+        Column("amount", Integer, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    ),
+    Table(
+        "party_balances", SCHEMA,
+        Column("party_id", Integer, ForeignKey("parties.id"), primary_key=True),
+        Column("add_total", BigInteger, nullable=False),
+        Column("reduce_total", BigInteger, nullable=False),
+        Column("net", BigInteger, nullable=False),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+    ),
+    Table(
+        "serial_counters", SCHEMA,
+        Column("name", String, primary_key=True),
+        Column("value", BigInteger, nullable=False),
+    ),
+    Table(
+        "event_outbox", SCHEMA,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("type", String, nullable=False),
+        Column("payload", Text, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    ),
+    Table(
+        "table_versions", SCHEMA,
+        Column("name", String, primary_key=True),
+        Column("version", BigInteger, nullable=False),
+    ),
+]
+
+PARTY_MONTHLY_BALANCES = Table(
+    "party_monthly_balances", SCHEMA,
+    Column("party_id", Integer, ForeignKey("parties.id"), primary_key=True),
+    Column("month", Date, primary_key=True),
+    Column("add_total", BigInteger, nullable=False),
+    Column("reduce_total", BigInteger, nullable=False),
+)
+
+
+# --- 1: initial schema -------------------------------------------------------
+
+def _initial_schema(conn: Connection) -> None:
+    # Creates only missing tables, so databases made by the old create_all are adopted as-is
+    SCHEMA.create_all(bind=conn, tables=BASELINE_TABLES)
+
+
+# --- 2: composite indexes for the hot transaction queries ---------------------
+
+TRANSACTION_INDEXES = [
+    # GET /transactions/ and /transactions/page order
+    ("ix_transactions_date_serial", "date DESC, serial_number DESC"),
+    # Per-party statements (party filter + date range)
+    ("ix_transactions_party_date", "party_id, date"),
+    # Outstanding totals up to a date, grouped by transaction type
+    ("ix_transactions_type_date", "type_id, date"),
+]
+
+
+def _add_transaction_indexes(conn: Connection) -> None:
+    for name, columns in TRANSACTION_INDEXES:
+        _create_index(conn, name, "transactions", columns)
+
+
+def _drop_transaction_indexes(conn: Connection) -> None:
+    for name, _ in TRANSACTION_INDEXES:
+        _drop_index(conn, name)
+
+
+# --- 3: trigram index for party search (PostgreSQL only) ----------------------
+
+PARTY_NAME_TRGM_INDEX = "ix_parties_name_trgm"
+
+
+def _add_party_name_trigram(conn: Connection) -> None:
+    if not _is_postgres(conn):
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    _create_index(conn, PARTY_NAME_TRGM_INDEX, "parties", "name gin_trgm_ops", using="USING gin ")
+
+
+def _drop_party_name_trigram(conn: Connection) -> None:
+    if _is_postgres(conn):
+        _drop_index(conn, PARTY_NAME_TRGM_INDEX)
+
+
+# --- 4: monthly balance checkpoints ------------------------------------------
+
+def _add_party_monthly_balances(conn: Connection) -> None:
+    # Filled by initialize_data (MonthlyBalanceService.ensure_initialized)
+    PARTY_MONTHLY_BALANCES.create(conn, checkfirst=True)
+
+
+def _drop_party_monthly_balances(conn: Connection) -> None:
+    PARTY_MONTHLY_BALANCES.drop(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "transaction composite indexes", _add_transaction_indexes, _drop_transaction_indexes,
+              transactional=False),
+    Migration(3, "party name trigram index", _add_party_name_trigram, _drop_party_name_trigram,
+              transactional=False),
+    Migration(4, "party monthly balances", _add_party_monthly_balances, _drop_party_monthly_balances),
+]
+
+HEAD = MIGRATIONS[-1].version
+
+
+class DatabaseNotMigratedError(RuntimeError):
+    """The schema or the data set-up a request needs is missing: `python migrate.py` has not been run"""
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[Connection]:
+    """
+    Autocommit connection holding the migration lock, so concurrently starting workers
+    apply each migration once: an advisory lock on PostgreSQL; on SQLite the database
+    write lock, with the whole run inside one transaction.
+    """
+    conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    sqlite = conn.dialect.name == "sqlite"
+    try:
+        if _is_postgres(conn):
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        elif sqlite:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            if sqlite:
+                conn.exec_driver_sql("ROLLBACK")
+            raise
+        else:
+            if sqlite:
+                conn.exec_driver_sql("COMMIT")
+        finally:
+            if _is_postgres(conn):
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    finally:
+        conn.close()
+
+
+def _applied(conn: Connection) -> List[Tuple[int, datetime]]:
+    schema_migrations.create(conn, checkfirst=True)
+    return [tuple(row) for row in conn.execute(
+        select(schema_migrations.c.version, schema_migrations.c.applied_at).order_by(schema_migrations.c.version)
+    )]
+
+
+def _run(conn: Connection, migration: Migration, step: Callable[[Connection], None], record: bool) -> None:
+    """Run one step and record (or forget) its version, in a transaction unless the migration opts out"""
+    # On SQLite the caller's transaction already covers the whole run
+    transaction = migration.transactional and _is_postgres(conn)
+    if transaction:
+        conn.exec_driver_sql("BEGIN")
+    try:
+        step(conn)
+        if record:
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version, name=migration.name, applied_at=datetime.now(timezone.utc),
+            ))
+        else:
+            conn.execute(schema_migrations.delete().where(schema_migrations.c.version == migration.version))
+    except BaseException:
+        if transaction:
+            conn.exec_driver_sql("ROLLBACK")
+        raise
+    if transaction:
+        conn.exec_driver_sql("COMMIT")
+
+
+class MigrationRunner:
+    """Applies and reverts MIGRATIONS, recording applied versions in schema_migrations"""
+
+    @staticmethod
+    def applied_versions(engine: Engine) -> List[Tuple[int, datetime]]:
+        """(version, applied_at) of every applied migration, oldest first"""
+        with engine.begin() as conn:
+            return _applied(conn)
+
+    @staticmethod
+    def pending(engine: Engine) -> List[Migration]:
+        """Migrations not applied yet"""
+        applied = {version for version, _ in MigrationRunner.applied_versions(engine)}
+        return [migration for migration in MIGRATIONS if migration.version not in applied]
+
+    @staticmethod
+    def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+        """Apply pending migrations up to target (default: all); returns the ones applied by this call"""
+        target = HEAD if target is None else target
+        done = []
+        with _migration_lock(engine) as conn:
+            applied = {version for version, _ in _applied(conn)}
+            for migration in MIGRATIONS:
+                if migration.version > target:
+                    break
+                if migration.version not in applied:
+                    _run(conn, migration, migration.upgrade, record=True)
+                    done.append(migration)
+        return done
+
+    @staticmethod
+    def downgrade(engine: Engine, target: int) -> List[Migration]:
+        """Revert applied migrations newer than target, newest first; returns the ones reverted"""
+        by_version = {migration.version: migration for migration in MIGRATIONS}
+        with _migration_lock(engine) as conn:
+            to_revert = [by_version[version] for version, _ in reversed(_applied(conn)) if version > target]
+            for migration in to_revert:
+                if migration.downgrade is None:
+                    raise ValueError(f"Migration {migration.version} ({migration.name}) cannot be reverted")
+            for migration in to_revert:
+                _run(conn, migration, migration.downgrade, record=False)
+        return to_revert
+
+    @staticmethod
+    def initialize_data(engine: Engine) -> None:
+        """
+        Idempotent data set-up that follows the schema: backfill the party balance
+        projection and the monthly checkpoints, move the serial allocator past existing transactions and create
+        the table version rows
+        """
+        from sqlalchemy.orm import Session
+        from app.services.balance_service import BalanceService
+        from app.services.monthly_balance_service import MonthlyBalanceService
+        from app.services.serial_allocator import SerialAllocator
+        from app.services.table_version_service import TableVersionService
+
+        with Session(bind=engine) as db:
+            BalanceService.ensure_initialized(db)
+            MonthlyBalanceService.ensure_initialized(db)
+            SerialAllocator.initialize(db)
+            TableVersionService.initialize(db)
@@ -0,0 +1,183 @@
+"""
+Connection pool configuration and instrumentation
+"""
+import bisect
+import threading
+import time
+from typing import Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, metrics
+
+# Upper bounds (ms) of the checkout time histogram buckets
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStats:
+    """Counters for one engine's pool: checkouts, checkout time, connection churn and pre-pings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters (the checked-out gauge included)"""
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.invalidations = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+
+    def record_checkout(self, ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.checkout_ms_total += ms
+            self.checkout_ms_max = max(self.checkout_ms_max, ms)
+            self.checkout_buckets[bisect.bisect_left(CHECKOUT_BUCKETS_MS, ms)] += 1
+
+    def record(self, counter: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_ms_avg": round(self.checkout_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_ms_max": round(self.checkout_ms_max, 3),
+                "checkout_ms_buckets": {
+                    **{f"le_{bound}": count for bound, count in zip(CHECKOUT_BUCKETS_MS, self.checkout_buckets)},
+                    "inf": self.checkout_buckets[-1],
+                },
+                "timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "invalidations": self.invalidations,
+                "pre_pings": self.pre_pings,
+                "pre_ping_failures": self.pre_ping_failures,
+            }
+
+
+# Per-engine stats ("sync" for app.db.database, "async" for app.db.async_database)
+pool_stats: Dict[str, PoolStats] = {"sync": PoolStats(), "async": PoolStats()}
+
+
+def _per_engine(field: str, scale: float = 1.0):
+    return lambda: [((name,), getattr(stats, field) * scale) for name, stats in pool_stats.items()]
+
+
+for _kind, _name, _field, _doc in (
+    (Gauge, "db_pool_checked_out", "checked_out", "Connections checked out of the pool"),
+    (Gauge, "db_pool_checked_out_peak", "peak_checked_out", "Most connections checked out at once"),
+    (Counter, "db_pool_checkouts_total", "checkouts", "Pool checkouts"),
+    (Counter, "db_pool_checkout_timeouts_total", "timeouts", "Checkouts that timed out waiting for a connection"),
+    (Counter, "db_pool_connections_opened_total", "connections_opened", "Database connections opened"),
+    (Counter, "db_pool_connections_closed_total", "connections_closed", "Database connections closed"),
+    (Counter, "db_pool_pre_ping_failures_total", "pre_ping_failures", "Pooled connections found dead by a pre-ping"),
+):
+    metrics.register(_kind(_name, _doc, ("engine",), callback=_per_engine(_field)))
+metrics.register(Counter(
+    "db_pool_checkout_seconds_total", "Time spent checking out connections", ("engine",),
+    callback=_per_engine("checkout_ms_total", 0.001),
+))
+
+
+class _InstrumentedPoolMixin:
+    """Times checkouts: waiting for a free connection, plus opening or pinging one when needed"""
+
+    stats: PoolStats
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record("timeouts")
+            raise
+        self.stats.record_checkout((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, asyncio: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments for the DB_POOL_* settings"""
+    if ":memory:" in url:
+        # In-memory SQLite keeps one connection per thread; there is nothing to size
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def instrument_pool(engine: Engine, stats: PoolStats) -> None:
+    """Attach stats to the engine's pool and install the churn counters and the idle pre-ping"""
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.stats = stats
+    idle_ping = settings.DB_POOL_PRE_PING == "idle"
+    idle_seconds = settings.DB_POOL_PRE_PING_IDLE_SECONDS
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.record("connections_opened")
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        stats.record("connections_closed")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record("invalidations")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.record("checked_out", -1)
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if not idle_ping:
+            return
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        # Only connections that sat idle long enough to have been dropped pay for a ping;
+        # a DisconnectionError makes the pool discard this one and check out another
+        stats.record("pre_pings")
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            stats.record("pre_ping_failures")
+            raise exc.DisconnectionError() from e
+        finally:
+            cursor.close()
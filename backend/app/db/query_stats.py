@@ -0,0 +1,97 @@
+"""
+Per-request SQL accounting: statement count and time, slow statements and
+statements repeated within a request (N+1 queries)
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Expanded IN lists ("IN (?, ?, ?)") of any length are the same statement shape
+_IN_LIST = re.compile(r"\bIN \((?:\?|%\(\w+\)s|\$\d+|:\w+)(?:, (?:\?|%\(\w+\)s|\$\d+|:\w+))+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace collapsed and IN lists reduced to one placeholder"""
+    return _IN_LIST.sub("IN (?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """SQL statements executed and time spent in them, for one request"""
+    
+    __slots__ = ("statements", "seconds", "counts", "slow")
+    
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        # Statement text -> executions; shapes are only computed when reporting
+        self.counts: Dict[str, int] = {}
+        # (seconds, statement) of statements over DB_SLOW_QUERY_MS
+        self.slow: List[Tuple[float, str]] = []
+    
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than threshold times, most frequent first"""
+        if self.statements <= threshold:
+            return []
+        shapes: Dict[str, int] = {}
+        for statement, count in self.counts.items():
+            shape = statement_shape(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return sorted(
+            ((shape, count) for shape, count in shapes.items() if count > threshold),
+            key=lambda item: -item[1],
+        )
+
+
+# Set by the metrics middleware for each request; the object is shared with the
+# threadpool and greenlet contexts the request's queries run in
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def begin_request() -> Token:
+    """Start counting the current context's queries in a fresh QueryStats"""
+    return _current.set(QueryStats())
+
+
+def end_request(token: Token) -> QueryStats:
+    """Stop counting and return the totals"""
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Totals of the request being handled, or None outside a request"""
+    return _current.get()
+
+
+def track_queries(engine: Engine) -> None:
+    """
+    Add the engine's statements to the current request's QueryStats. Slow statements
+    outside a request (startup, background tasks) are logged right away.
+    """
+    slow_seconds = settings.DB_SLOW_QUERY_MS / 1000
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+            stats.counts[statement] = stats.counts.get(statement, 0) + 1
+            if elapsed >= slow_seconds:
+                stats.slow.append((elapsed, statement))
+        elif elapsed >= slow_seconds:
+            logger.warning("Slow query outside a request (%.0fms): %s", elapsed * 1000, statement_shape(statement))
@@ -0,0 +1,151 @@
+"""
+Database readiness: background pool warm-up and the /ready probe
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, ExitStack
+from typing import Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.database import get_engine
+from app.db.async_database import get_async_engine
+from app.db.migrations import MigrationRunner
+from app.db.pool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+# Retry delays while the database is unreachable at startup
+WARMUP_RETRY_INITIAL_SECONDS = 0.5
+WARMUP_RETRY_MAX_SECONDS = 5.0
+
+
+class DatabaseReadiness:
+    """
+    Warms the connection pools in the background after startup (DB_POOL_WARMUP_CONNECTIONS
+    per engine), so a slow or briefly unavailable database delays readiness instead of
+    failing the process, then runs the idempotent data set-up (MigrationRunner.initialize_data)
+    as soon as the schema is at head. Answers readiness probes with the warm-up state,
+    pool stats, DB latency, schema and data set-up state.
+    """
+
+    def __init__(self):
+        self.warm = False
+        self.warmup_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # Set once all migrations are seen applied; not re-checked afterwards
+        self.schema_current = False
+        # Set once initialize_data has run (at startup with MIGRATE_ON_STARTUP, else by the warm-up)
+        self.initialized = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start warming the pool (call from a startup handler)"""
+        self._task = asyncio.create_task(self._warm_up())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _warm_up(self) -> None:
+        started = time.perf_counter()
+        count = min(settings.DB_POOL_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+        delay = WARMUP_RETRY_INITIAL_SECONDS
+        while count > 0:
+            try:
+                await asyncio.to_thread(self._open_connections, count)
+                await self._open_async_connections(count)
+                break
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("Database warm-up failed, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+        self.warmup_ms = (time.perf_counter() - started) * 1000
+        self.last_error = None
+        self.warm = True
+        logger.info("Connection pools warm after %.0fms", self.warmup_ms)
+        await self._initialize_data()
+
+    async def _initialize_data(self) -> None:
+        """
+        Run initialize_data (serial counter, projections, table versions) once no
+        migration is pending, so an instance started without MIGRATE_ON_STARTUP does not
+        depend on the deploy step having run it; waits while migrations are pending
+        """
+        delay = WARMUP_RETRY_INITIAL_SECONDS
+        while not self.initialized:
+            try:
+                engine = get_engine()
+                if not await asyncio.to_thread(MigrationRunner.pending, engine):
+                    await asyncio.to_thread(MigrationRunner.initialize_data, engine)
+                    self.initialized = True
+                    logger.info("Data set-up done")
+                    return
+            except Exception as e:
+                # Also another worker initializing concurrently; the retry finds the data in place
+                logger.warning("Data set-up failed, retrying in %.1fs: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    @staticmethod
+    def _open_connections(count: int) -> None:
+        """Hold count connections at once, so the pool opens that many and keeps them"""
+        with ExitStack() as stack:
+            for _ in range(count):
+                stack.enter_context(get_engine().connect()).execute(text("SELECT 1"))
+
+    @staticmethod
+    async def _open_async_connections(count: int) -> None:
+        async with AsyncExitStack() as stack:
+            for _ in range(count):
+                connection = await stack.enter_async_context(get_async_engine().connect())
+                await connection.execute(text("SELECT 1"))
+
+    @staticmethod
+    def _ping() -> float:
+        """Round trip of SELECT 1 on a pooled connection, in milliseconds"""
+        started = time.perf_counter()
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return (time.perf_counter() - started) * 1000
+
+    def probe(self) -> Tuple[bool, dict]:
+        """(ready, report) for the readiness endpoint; runs at most two small queries"""
+        report = {
+            "status": "ready",
+            "pool": {
+                "warm": self.warm,
+                "warmup_ms": self.warmup_ms,
+                **{name: stats.snapshot() for name, stats in pool_stats.items()},
+            },
+        }
+        if not self.warm:
+            report["status"] = "starting"
+            report["error"] = self.last_error
+            return False, report
+        try:
+            report["database"] = {"latency_ms": round(self._ping(), 2)}
+            if not self.schema_current:
+                pending = MigrationRunner.pending(get_engine())
+                self.schema_current = not pending
+                report["schema"] = {"pending_migrations": [migration.version for migration in pending]}
+        except Exception as e:
+            report["status"] = "unavailable"
+            report["error"] = str(e)
+            return False, report
+        if not self.schema_current:
+            report["status"] = "migrations pending"
+            return False, report
+        if not self.initialized:
+            report["status"] = "initializing"
+            return False, report
+        return True, report
+
+
+# Global readiness state
+db_readiness = DatabaseReadiness()
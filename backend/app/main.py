@@ -1,15 +1,25 @@
 """
 FastAPI application entry point
 """
+import asyncio
+import logging
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
-from app.api.routers import auth, parties, transaction_types, transactions
-import app.models.admin  # noqa: F401 - ensure Admin table is created
+from app.core.logging_config import configure_logging, shutdown_logging
+from app.core.metrics import metrics
+from app.core.middleware import MetricsMiddleware
+from app.db.database import get_engine
+from app.db.migrations import MigrationRunner
+from app.db.readiness import db_readiness
+from app.api.routers import auth, parties, transaction_types, transactions, websocket
+from app.services.party_search_service import party_search_index
+from app.core.reference_cache import reference_cache
+from app.core.password_hashing import password_executor
+from app.core.events import event_log, event_bus
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,18 +35,57 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time"],
 )
 
+# Outermost, so the timings include CORS and error handling
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(parties.router, prefix=settings.API_V1_PREFIX)
 app.include_router(transaction_types.router, prefix=settings.API_V1_PREFIX)
 app.include_router(transactions.router, prefix=settings.API_V1_PREFIX)
+app.include_router(websocket.router)
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
-    
+    configure_logging()
+    # Importing the app does no database work. Schema migrations and data set-up are a
+    # deploy step (python migrate.py) unless MIGRATE_ON_STARTUP is set
+    if settings.MIGRATE_ON_STARTUP:
+        engine = get_engine()
+        for migration in MigrationRunner.upgrade(engine):
+            logger.info("Applied migration %d: %s", migration.version, migration.name)
+        MigrationRunner.initialize_data(engine)
+        db_readiness.initialized = True
+
+
+@app.on_event("startup")
+async def start_event_bus():
+    if settings.EVENT_BUS_BACKEND == "memory" and settings.WEB_CONCURRENCY > 1:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} needs a shared event bus: "
+            "set EVENT_BUS_BACKEND to outbox or postgres"
+        )
+    # Events consumed off the loop are handed to the websocket manager on this loop
+    event_log.bind_loop(asyncio.get_running_loop())
+    # Keep the in-process party index and reference data cache in sync with writes on other workers
+    event_log.add_listener(party_search_index.apply_event)
+    event_log.add_listener(reference_cache.apply_event)
+    await event_bus.start(event_log.receive, event_log.start_at)
+    # Open the first pooled connection in the background; /ready reports when it is done
+    db_readiness.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await db_readiness.stop()
+    await event_bus.stop()
+    password_executor.shutdown()
+    shutdown_logging()
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -45,5 +94,20 @@ def root():
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
+    """Liveness check endpoint (no database access)"""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness check: pool warm-up, database latency, pending migrations and data set-up; 503 until ready"""
+    ready, report = db_readiness.probe()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Request, WebSocket and connection pool metrics in the Prometheus text format"""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,16 @@
+"""
+Event outbox model - change events shared by every worker process
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class EventOutbox(Base):
+    """One published change event; the id is the event's global sequence number"""
+    __tablename__ = "event_outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON-encoded event data
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
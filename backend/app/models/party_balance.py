@@ -0,0 +1,21 @@
+"""
+Party balance model - incrementally maintained per-party outstanding totals
+"""
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class PartyBalance(Base):
+    """
+    Projection of add/reduce totals per party.
+    Kept in sync by the service layer in the same DB transaction as every
+    transaction write, so outstanding totals never need a table scan.
+    """
+    __tablename__ = "party_balances"
+    
+    party_id = Column(Integer, ForeignKey("parties.id"), primary_key=True)
+    add_total = Column(BigInteger, nullable=False, default=0)
+    reduce_total = Column(BigInteger, nullable=False, default=0)
+    net = Column(BigInteger, nullable=False, default=0)  # add_total - reduce_total
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,22 @@
+"""
+Party monthly balance model - cumulative per-party add/reduce totals at each month end
+"""
+from sqlalchemy import Column, Integer, BigInteger, Date, ForeignKey
+from app.db.database import Base
+
+
+class PartyMonthlyBalance(Base):
+    """
+    Month-end checkpoints of a party's cumulative add/reduce totals: everything dated
+    up to the end of `month`. There is a row for every month in which the party has
+    transactions; months without one carry the previous row's totals forward.
+    Kept in sync by the service layer in the same DB transaction as every transaction
+    write, back-dated ones included, so a total up to any date is one checkpoint per
+    party plus a scan of at most half a month of transactions.
+    """
+    __tablename__ = "party_monthly_balances"
+
+    party_id = Column(Integer, ForeignKey("parties.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    add_total = Column(BigInteger, nullable=False, default=0)
+    reduce_total = Column(BigInteger, nullable=False, default=0)
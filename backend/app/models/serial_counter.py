@@ -0,0 +1,13 @@
+"""
+Serial counter model - named counters used to allocate serial numbers
+"""
+from sqlalchemy import Column, String, BigInteger
+from app.db.database import Base
+
+
+class SerialCounter(Base):
+    """Named counter; value is the last serial number handed out"""
+    __tablename__ = "serial_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
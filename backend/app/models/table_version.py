@@ -0,0 +1,13 @@
+"""
+Table version model - change counters for cached and conditional responses
+"""
+from sqlalchemy import Column, String, BigInteger
+from app.db.database import Base
+
+
+class TableVersion(Base):
+    """Per-table change counter; incremented right after every committed write to the table"""
+    __tablename__ = "table_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,7 +1,7 @@
 """
 Transaction model - represents individual ledger transactions
 """
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -10,7 +10,7 @@ from app.db.database import Base
 class Transaction(Base):
     """Transaction model"""
     __tablename__ = "transactions"
-    
+
     id = Column(Integer, primary_key=True, index=True)
     serial_number = Column(Integer, nullable=False, unique=True, index=True)  # Continuous numbering
     date = Column(Date, nullable=False, index=True)
@@ -24,3 +24,10 @@ class Transaction(Base):
     # Relationships
     party = relationship("Party", back_populates="transactions")
     transaction_type = relationship("TransactionType", back_populates="transactions")
+
+
+# Composite indexes for the hot queries (added to existing databases by migration 2):
+# the list order, per-party statements and date-bounded totals
+Index("ix_transactions_date_serial", Transaction.date.desc(), Transaction.serial_number.desc())
+Index("ix_transactions_party_date", Transaction.party_id, Transaction.date)
+Index("ix_transactions_type_date", Transaction.type_id, Transaction.date)
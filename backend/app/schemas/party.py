@@ -33,3 +33,14 @@ class PartyResponse(PartyBase):
     
     class Config:
         from_attributes = True
+
+
+class PartyBalanceResponse(BaseModel):
+    """Schema for a party's outstanding balance"""
+    party_id: int
+    add_total: int
+    reduce_total: int
+    net: int
+    
+    class Config:
+        from_attributes = True
@@ -3,7 +3,9 @@ Pydantic schemas for Transaction
 """
 from pydantic import BaseModel, Field, field_validator
 from datetime import date as DateType, datetime
-from typing import Optional
+from typing import List, Optional
+from app.schemas.party import PartyResponse
+from app.schemas.transaction_type import TransactionTypeResponse
 
 
 class TransactionBase(BaseModel):
@@ -56,7 +58,28 @@ class TransactionResponse(TransactionBase):
         from_attributes = True
 
 
+class TransactionPage(BaseModel):
+    """One page of transactions with an opaque cursor for the next page"""
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+class BulkImportError(BaseModel):
+    """A row rejected by a bulk import"""
+    row: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    """Outcome of a bulk import"""
+    inserted: int
+    failed: int
+    errors: List[BulkImportError] = []
+    # True when more rows failed than errors lists
+    errors_truncated: bool = False
+
+
 class TransactionWithRelations(TransactionResponse):
     """Transaction response with related party and transaction type details"""
-    party: Optional[dict] = None
-    transaction_type: Optional[dict] = None
+    party: Optional[PartyResponse] = None
+    transaction_type: Optional[TransactionTypeResponse] = None
@@ -1,9 +1,13 @@
 """
 Service layer for authentication
 """
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.admin import Admin
-from app.core.security import verify_password, create_access_token
+from app.core.security import pwd_context, create_access_token
+from app.core.password_hashing import password_executor
+from app.core.auth_cache import admin_cache
 from typing import Optional, Tuple
 
 
@@ -16,16 +20,77 @@ class AuthService:
         Authenticate admin by login_id and password.
         Returns (admin, access_token) if valid, None otherwise.
         """
-        admin = db.query(Admin).filter(Admin.login_id == login_id).first()
+        admin = AuthService.get_admin_by_login_id(db, login_id)
         if not admin:
-            print(f"Admin with login_id '{login_id}' not found.")
             return None
-        if not verify_password(password, admin.hashed_password):
+        valid, new_hash = pwd_context.verify_and_update(password, admin.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            admin.hashed_password = new_hash
+            db.commit()
         token = create_access_token(admin.id)
         return (admin, token)
     
+    @staticmethod
+    def get_admin_by_login_id(db: Session, login_id: str) -> Optional[Admin]:
+        """Get admin by login ID"""
+        return db.query(Admin).filter(Admin.login_id == login_id).first()
+    
+    @staticmethod
+    def set_password_hash(db: Session, admin_id: int, hashed_password: str) -> None:
+        """Store a new password hash for an admin"""
+        db.query(Admin).filter(Admin.id == admin_id).update(
+            {Admin.hashed_password: hashed_password}, synchronize_session=False
+        )
+        db.commit()
+        AuthService.invalidate_admin(admin_id)
+    
     @staticmethod
     def get_admin_by_id(db: Session, admin_id: int) -> Optional[Admin]:
         """Get admin by ID"""
         return db.query(Admin).filter(Admin.id == admin_id).first()
+    
+    @staticmethod
+    def invalidate_admin(admin_id: int) -> None:
+        """Forget cached existence of an admin; call whenever an admin is changed or removed"""
+        admin_cache.invalidate(admin_id)
+
+
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _invalidate_admin_cache(mapper, connection, target: Admin) -> None:
+    """Keep the in-process admin cache exact for ORM writes made by this process"""
+    AuthService.invalidate_admin(target.id)
+
+
+class AsyncAuthService:
+    """
+    Async variant of AuthService for async routes.
+    Runs the same logic through AsyncSession.run_sync, so DB I/O is awaited
+    instead of blocking the event loop.
+    """
+    
+    @staticmethod
+    async def authenticate_admin(db: AsyncSession, login_id: str, password: str) -> Optional[Tuple[Admin, str]]:
+        """
+        Authenticate admin by login_id and password.
+        bcrypt runs on the dedicated password executor, never on the event loop or
+        the shared threadpool; outdated hashes are replaced at the configured cost.
+        Raises PasswordHashingUnavailable when the executor is saturated.
+        """
+        admin = await db.run_sync(AuthService.get_admin_by_login_id, login_id)
+        if not admin:
+            return None
+        valid, new_hash = await password_executor.verify_and_update(password, admin.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            await db.run_sync(AuthService.set_password_hash, admin.id, new_hash)
+        token = create_access_token(admin.id)
+        return (admin, token)
+    
+    @staticmethod
+    async def get_admin_by_id(db: AsyncSession, admin_id: int) -> Optional[Admin]:
+        """Get admin by ID"""
+        return await db.run_sync(AuthService.get_admin_by_id, admin_id)
@@ -0,0 +1,194 @@
+"""
+Service layer for the per-party balance projection
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, update, bindparam
+from app.models.party import Party
+from app.models.party_balance import PartyBalance
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.services.party_search_service import PartySearchService
+from typing import Dict, List, Optional, Tuple
+
+
+class BalanceService:
+    """
+    Maintains the party_balances projection.
+    None of these methods commit; callers apply them inside their own DB transaction.
+    """
+    
+    @staticmethod
+    def get_type_kind(db: Session, type_id: int) -> str:
+        """Return "add" or "reduce" for a transaction type. Raises ValueError if it does not exist."""
+        kind = db.query(TransactionType.type).filter(TransactionType.id == type_id).scalar()
+        if kind is None:
+            raise ValueError("Transaction type not found")
+        return kind
+    
+    @staticmethod
+    def ensure_party(db: Session, party_id: int) -> None:
+        """Create an empty balance row for a party"""
+        db.add(PartyBalance(party_id=party_id, add_total=0, reduce_total=0, net=0))
+        db.flush()
+    
+    @staticmethod
+    def remove_party(db: Session, party_id: int) -> None:
+        """Delete the balance row of a party"""
+        db.query(PartyBalance).filter(PartyBalance.party_id == party_id).delete(synchronize_session=False)
+    
+    @staticmethod
+    def apply_delta(db: Session, party_id: int, kind: str, amount: int) -> None:
+        """
+        Add (or, with a negative amount, remove) an amount of the given kind to a party's balance.
+        Uses an in-place UPDATE so concurrent writers never lose each other's deltas.
+        """
+        add_delta = amount if kind == "add" else 0
+        reduce_delta = amount if kind == "reduce" else 0
+        updated = db.query(PartyBalance).filter(PartyBalance.party_id == party_id).update(
+            {
+                PartyBalance.add_total: PartyBalance.add_total + add_delta,
+                PartyBalance.reduce_total: PartyBalance.reduce_total + reduce_delta,
+                PartyBalance.net: PartyBalance.net + add_delta - reduce_delta,
+            },
+            synchronize_session=False,
+        )
+        if not updated:
+            db.add(PartyBalance(
+                party_id=party_id,
+                add_total=add_delta,
+                reduce_total=reduce_delta,
+                net=add_delta - reduce_delta,
+            ))
+            db.flush()
+    
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Dict[int, Tuple[int, int]]) -> None:
+        """
+        Apply many (add_delta, reduce_delta) pairs keyed by party_id with a single executemany UPDATE.
+        Used by bulk paths where one statement per party would dominate the cost.
+        """
+        if not deltas:
+            return
+        existing = {
+            row[0] for row in
+            db.query(PartyBalance.party_id).filter(PartyBalance.party_id.in_(list(deltas))).all()
+        }
+        missing = [
+            {"party_id": party_id, "add_total": 0, "reduce_total": 0, "net": 0}
+            for party_id in deltas if party_id not in existing
+        ]
+        if missing:
+            db.execute(PartyBalance.__table__.insert(), missing)
+        
+        table = PartyBalance.__table__
+        stmt = (
+            update(table)
+            .where(table.c.party_id == bindparam("b_party_id"))
+            .values(
+                add_total=table.c.add_total + bindparam("b_add"),
+                reduce_total=table.c.reduce_total + bindparam("b_reduce"),
+                net=table.c.net + bindparam("b_add") - bindparam("b_reduce"),
+            )
+        )
+        db.execute(stmt, [
+            {"b_party_id": party_id, "b_add": add, "b_reduce": reduce}
+            for party_id, (add, reduce) in deltas.items()
+        ])
+    
+    @staticmethod
+    def apply_type_change(db: Session, type_id: int, old_kind: str, new_kind: Optional[str]) -> None:
+        """
+        Move every party's amounts for a transaction type from old_kind to new_kind.
+        Pass new_kind=None when the type (and its transactions) is being deleted.
+        """
+        per_party = (
+            db.query(Transaction.party_id, func.sum(Transaction.amount))
+            .filter(Transaction.type_id == type_id)
+            .group_by(Transaction.party_id)
+            .all()
+        )
+        for party_id, total in per_party:
+            BalanceService.apply_delta(db, party_id, old_kind, -int(total))
+            if new_kind is not None:
+                BalanceService.apply_delta(db, party_id, new_kind, int(total))
+    
+    @staticmethod
+    def get_party_balance(db: Session, party_id: int) -> Optional[PartyBalance]:
+        """Get the balance row of a party"""
+        return db.query(PartyBalance).filter(PartyBalance.party_id == party_id).first()
+    
+    @staticmethod
+    def get_outstanding_total(db: Session, party_filter: Optional[str] = None,
+                              party_ids: Optional[List[int]] = None) -> int:
+        """Sum of net balances, optionally restricted to parties matching a name filter and/or ids"""
+        query = db.query(func.coalesce(func.sum(PartyBalance.net), 0))
+        party_condition = PartySearchService.party_condition(db, PartyBalance.party_id, party_filter, party_ids)
+        if party_condition is not None:
+            query = query.filter(party_condition)
+        return int(query.scalar() or 0)
+    
+    @staticmethod
+    def compute_from_transactions(db: Session) -> Dict[int, Tuple[int, int]]:
+        """Aggregate (add_total, reduce_total) per party directly from the transactions table"""
+        rows = (
+            db.query(
+                Transaction.party_id,
+                func.coalesce(func.sum(case((TransactionType.type == "add", Transaction.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((TransactionType.type == "reduce", Transaction.amount), else_=0)), 0),
+            )
+            .join(TransactionType, TransactionType.id == Transaction.type_id)
+            .group_by(Transaction.party_id)
+            .all()
+        )
+        return {party_id: (int(add), int(reduce)) for party_id, add, reduce in rows}
+    
+    @staticmethod
+    def find_mismatches(db: Session) -> List[dict]:
+        """Compare the projection against the raw aggregates and return every differing party"""
+        expected = BalanceService.compute_from_transactions(db)
+        party_ids = [row[0] for row in db.query(Party.id).all()]
+        stored = {b.party_id: b for b in db.query(PartyBalance).all()}
+        
+        mismatches = []
+        for party_id in set(party_ids) | set(stored) | set(expected):
+            add, reduce = expected.get(party_id, (0, 0))
+            balance = stored.get(party_id)
+            actual = (balance.add_total, balance.reduce_total, balance.net) if balance else None
+            if actual != (add, reduce, add - reduce):
+                mismatches.append({
+                    "party_id": party_id,
+                    "expected": {"add_total": add, "reduce_total": reduce, "net": add - reduce},
+                    "actual": None if actual is None else {
+                        "add_total": actual[0], "reduce_total": actual[1], "net": actual[2]
+                    },
+                })
+        return mismatches
+    
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute the whole projection from the transactions table. Returns the number of rows written."""
+        expected = BalanceService.compute_from_transactions(db)
+        party_ids = [row[0] for row in db.query(Party.id).all()]
+        
+        db.query(PartyBalance).delete(synchronize_session=False)
+        rows = []
+        for party_id in party_ids:
+            add, reduce = expected.get(party_id, (0, 0))
+            rows.append({"party_id": party_id, "add_total": add, "reduce_total": reduce, "net": add - reduce})
+        if rows:
+            db.execute(PartyBalance.__table__.insert(), rows)
+        return len(rows)
+    
+    @staticmethod
+    def ensure_initialized(db: Session) -> bool:
+        """
+        Build the projection if it is empty but parties exist (e.g. first start after upgrade).
+        Returns True if a rebuild was performed.
+        """
+        if db.query(PartyBalance.party_id).first() is not None:
+            return False
+        if db.query(Party.id).first() is None:
+            return False
+        BalanceService.rebuild(db)
+        db.commit()
+        return True
@@ -0,0 +1,275 @@
+"""
+Service layer for the monthly balance checkpoints
+"""
+import calendar
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, Integer, bindparam, case, cast, func, select, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.party import Party
+from app.models.party_monthly_balance import PartyMonthlyBalance
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.services.party_search_service import PartySearchService
+from typing import Dict, List, Optional, Tuple
+
+MonthKey = Tuple[int, date]
+
+
+def month_of(day: date) -> date:
+    """First day of the day's month"""
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class MonthlyBalanceService:
+    """
+    Maintains the party_monthly_balances checkpoints and answers point-in-time totals
+    from them. A write dated in month m adds its delta to the party's checkpoint for m
+    (created from the previous one if missing) and to every later checkpoint, in the
+    same DB transaction, so a back-dated insert, edit or delete recomputes exactly the
+    checkpoints it invalidates. None of the write methods commit; callers apply the
+    party_balances delta first, and its row lock serializes concurrent writers of the
+    same party, so a carried-forward checkpoint never misses a committed delta.
+    """
+
+    @staticmethod
+    def _month_column(db: Session, column):
+        """SQL expression for the first day of a date column's month"""
+        if db.get_bind().dialect.name == "sqlite":
+            return func.date(column, "start of month")
+        return cast(func.date_trunc("month", column), Date)
+
+    @staticmethod
+    def _latest_before(column, party_id, boundary):
+        """Scalar subquery: column of a party's last checkpoint before the boundary month (a primary key seek)"""
+        return (
+            select(column)
+            .where(PartyMonthlyBalance.party_id == party_id, PartyMonthlyBalance.month < boundary)
+            .order_by(PartyMonthlyBalance.month.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _ensure_checkpoint(db: Session):
+        """INSERT of a missing (party, month) checkpoint carrying the previous one's totals forward"""
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        party_id, month = bindparam("p_party_id", type_=Integer), bindparam("p_month", type_=Date)
+        previous = [
+            func.coalesce(MonthlyBalanceService._latest_before(column, party_id, month), 0)
+            for column in (PartyMonthlyBalance.add_total, PartyMonthlyBalance.reduce_total)
+        ]
+        # WHERE true keeps SQLite from parsing ON CONFLICT as part of the SELECT
+        source = select(party_id, month, *previous).where(true())
+        table = PartyMonthlyBalance.__table__
+        return dialect.insert(table).from_select(
+            [table.c.party_id, table.c.month, table.c.add_total, table.c.reduce_total], source
+        ).on_conflict_do_nothing(index_elements=[table.c.party_id, table.c.month])
+
+    @staticmethod
+    def apply_delta(db: Session, party_id: int, day: date, kind: str, amount: int) -> None:
+        """Add (or, with a negative amount, remove) an amount of the given kind dated on day"""
+        MonthlyBalanceService.apply_deltas(db, {
+            (party_id, month_of(day)): (amount if kind == "add" else 0, amount if kind == "reduce" else 0),
+        })
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Dict[MonthKey, Tuple[int, int]]) -> None:
+        """
+        Apply (add_delta, reduce_delta) pairs keyed by (party_id, month): create the
+        missing checkpoints, then add each delta to its month and all later months
+        (one executemany each)
+        """
+        keys = sorted(key for key, (add, reduce) in deltas.items() if add or reduce)
+        if not keys:
+            return
+        db.execute(MonthlyBalanceService._ensure_checkpoint(db), [
+            {"p_party_id": party_id, "p_month": month} for party_id, month in keys
+        ])
+        db.execute(
+            update(PartyMonthlyBalance.__table__)
+            .where(
+                PartyMonthlyBalance.party_id == bindparam("p_party_id"),
+                PartyMonthlyBalance.month >= bindparam("p_month", type_=Date),
+            )
+            .values(
+                add_total=PartyMonthlyBalance.add_total + bindparam("p_add"),
+                reduce_total=PartyMonthlyBalance.reduce_total + bindparam("p_reduce"),
+            ),
+            [
+                {"p_party_id": party_id, "p_month": month,
+                 "p_add": deltas[(party_id, month)][0], "p_reduce": deltas[(party_id, month)][1]}
+                for party_id, month in keys
+            ],
+        )
+
+    @staticmethod
+    def apply_type_change(db: Session, type_id: int, old_kind: str, new_kind: Optional[str]) -> None:
+        """
+        Move every checkpoint's amounts for a transaction type from old_kind to new_kind.
+        Pass new_kind=None when the type (and its transactions) is being deleted.
+        """
+        month = MonthlyBalanceService._month_column(db, Transaction.date)
+        per_month = (
+            db.query(Transaction.party_id, month, func.sum(Transaction.amount))
+            .filter(Transaction.type_id == type_id)
+            .group_by(Transaction.party_id, month)
+            .all()
+        )
+        deltas = {}
+        for party_id, month_start, total in per_month:
+            total = int(total)
+            add = (total if new_kind == "add" else 0) - (total if old_kind == "add" else 0)
+            reduce = (total if new_kind == "reduce" else 0) - (total if old_kind == "reduce" else 0)
+            deltas[(party_id, _as_date(month_start))] = (add, reduce)
+        MonthlyBalanceService.apply_deltas(db, deltas)
+
+    @staticmethod
+    def remove_party(db: Session, party_id: int) -> None:
+        """Delete the checkpoints of a party"""
+        db.query(PartyMonthlyBalance).filter(PartyMonthlyBalance.party_id == party_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def outstanding_total_at(db: Session, date_end: date, party_filter: Optional[str] = None,
+                             party_ids: Optional[List[int]] = None) -> int:
+        """
+        Outstanding total of transactions dated up to date_end, optionally restricted to
+        parties matching a name filter and/or ids, in one statement. Takes each party's
+        nearest month-end checkpoint (the previous month's in the first half of the
+        month, this month's in the second) and scans only the transactions between it
+        and date_end.
+        """
+        month = month_of(date_end)
+        next_month = _next_month(month)
+        from_month_start = date_end.day <= calendar.monthrange(date_end.year, date_end.month)[1] // 2
+
+        checkpoint = MonthlyBalanceService._latest_before(
+            PartyMonthlyBalance.add_total - PartyMonthlyBalance.reduce_total,
+            Party.id,
+            month if from_month_start else next_month,
+        )
+        checkpoints = select(func.coalesce(func.sum(checkpoint), 0)).select_from(Party)
+        condition = PartySearchService.party_condition(db, Party.id, party_filter, party_ids)
+        if condition is not None:
+            checkpoints = checkpoints.where(condition)
+
+        signed_amount = case(
+            (TransactionType.type == "add", Transaction.amount),
+            (TransactionType.type == "reduce", -Transaction.amount),
+            else_=0,
+        )
+        if from_month_start:
+            window = (Transaction.date >= month, Transaction.date <= date_end)
+        else:
+            # Subtract the rest of the month from this month's checkpoint
+            signed_amount = -signed_amount
+            window = (Transaction.date > date_end, Transaction.date < next_month)
+        rest = select(func.coalesce(func.sum(signed_amount), 0)).select_from(Transaction).join(TransactionType).where(*window)
+        condition = PartySearchService.party_condition(db, Transaction.party_id, party_filter, party_ids)
+        if condition is not None:
+            rest = rest.where(condition)
+
+        return int(db.execute(select(checkpoints.scalar_subquery() + rest.scalar_subquery())).scalar() or 0)
+
+    @staticmethod
+    def compute_from_transactions(db: Session) -> Dict[MonthKey, Tuple[int, int]]:
+        """
+        Cumulative (add_total, reduce_total) per party at the end of every month in which
+        it has transactions, aggregated directly from the transactions table
+        """
+        month = MonthlyBalanceService._month_column(db, Transaction.date)
+        rows = (
+            db.query(
+                Transaction.party_id,
+                month,
+                func.coalesce(func.sum(case((TransactionType.type == "add", Transaction.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((TransactionType.type == "reduce", Transaction.amount), else_=0)), 0),
+            )
+            .join(TransactionType, TransactionType.id == Transaction.type_id)
+            .group_by(Transaction.party_id, month)
+            .all()
+        )
+        running: Dict[int, Tuple[int, int]] = defaultdict(lambda: (0, 0))
+        cumulative = {}
+        for party_id, month_start, add, reduce in sorted(
+            (party_id, _as_date(month_start), int(add), int(reduce)) for party_id, month_start, add, reduce in rows
+        ):
+            total_add, total_reduce = running[party_id]
+            running[party_id] = cumulative[(party_id, month_start)] = (total_add + add, total_reduce + reduce)
+        return cumulative
+
+    @staticmethod
+    def find_mismatches(db: Session) -> List[dict]:
+        """
+        Compare the checkpoints against the raw aggregates and return every (party, month)
+        whose month-end totals differ. Checkpoints of months whose transactions were all
+        deleted or moved stay behind; they only have to carry the right totals.
+        """
+        def by_party(checkpoints: Dict[MonthKey, Tuple[int, int]]) -> Dict[int, List[Tuple[date, Tuple[int, int]]]]:
+            parties = defaultdict(list)
+            for (party_id, month), totals in sorted(checkpoints.items()):
+                parties[party_id].append((month, totals))
+            return parties
+
+        def totals_at(checkpoints: List[Tuple[date, Tuple[int, int]]], month: date) -> Tuple[int, int]:
+            position = bisect_right([m for m, _ in checkpoints], month)
+            return checkpoints[position - 1][1] if position else (0, 0)
+
+        expected = by_party(MonthlyBalanceService.compute_from_transactions(db))
+        stored = by_party({
+            (row.party_id, _as_date(row.month)): (row.add_total, row.reduce_total)
+            for row in db.query(PartyMonthlyBalance).all()
+        })
+        mismatches = []
+        for party_id in sorted(set(expected) | set(stored)):
+            want, have = expected.get(party_id, []), stored.get(party_id, [])
+            for month in sorted({m for m, _ in want} | {m for m, _ in have}):
+                if totals_at(want, month) != totals_at(have, month):
+                    mismatches.append({
+                        "party_id": party_id,
+                        "month": month.isoformat(),
+                        "expected": totals_at(want, month),
+                        "actual": totals_at(have, month),
+                    })
+        return mismatches
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute all checkpoints from the transactions table. Returns the number of rows written."""
+        cumulative = MonthlyBalanceService.compute_from_transactions(db)
+        db.query(PartyMonthlyBalance).delete(synchronize_session=False)
+        rows = [
+            {"party_id": party_id, "month": month, "add_total": add, "reduce_total": reduce}
+            for (party_id, month), (add, reduce) in cumulative.items()
+        ]
+        if rows:
+            db.execute(PartyMonthlyBalance.__table__.insert(), rows)
+        return len(rows)
+
+    @staticmethod
+    def ensure_initialized(db: Session) -> bool:
+        """
+        Build the checkpoints if there are none but transactions exist (e.g. first start
+        after upgrade). Returns True if a rebuild was performed.
+        """
+        if db.query(PartyMonthlyBalance.party_id).first() is not None:
+            return False
+        if db.query(Transaction.id).first() is None:
+            return False
+        MonthlyBalanceService.rebuild(db)
+        db.commit()
+        return True
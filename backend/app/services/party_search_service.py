@@ -0,0 +1,340 @@
+"""
+Indexed substring search for parties
+"""
+import bisect
+import json
+import logging
+import threading
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, or_, select
+from app.models.party import Party
+from app.services.table_version_service import TableVersionService, PARTIES
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+NGRAM = 3
+# Resolved party filters larger than this are applied as a subquery instead of an inline IN list
+PARTY_IDS_INLINE_LIMIT = 1000
+
+
+def _ngrams(value: str) -> Set[str]:
+    return {value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)}
+
+
+def _word_suffixes(value: str) -> List[str]:
+    return [value[i:] for i in range(1, len(value)) if value[i - 1] == " " and value[i] != " "]
+
+
+def _remove_sorted(entries: List[Tuple[str, int]], entry: Tuple[str, int]) -> None:
+    position = bisect.bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PartySearchIndex:
+    """
+    In-process trigram index over lower-cased party names.
+    Resolves party name filters to ids, and serves ranked search where the database
+    has no trigram index (SQLite). It is loaded on first use and kept in sync by
+    PartyService on local writes and by party.* events from other workers; all
+    updates are idempotent. `version` is the parties table version it was loaded at:
+    only while that is still the table's version is the index known to be complete.
+    """
+
+    def __init__(self):
+        self._names: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # (name, id) and (name from the start of a later word, id), both sorted for prefix lookups
+        self._sorted: List[Tuple[str, int]] = []
+        self._words: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.version: Optional[int] = None
+        self._reloading = False
+
+    @staticmethod
+    def _build(db: Session) -> Tuple[Dict[int, str], Dict[str, Set[int]], List[Tuple[str, int]], List[Tuple[str, int]]]:
+        names = {party_id: name.lower() for party_id, name in db.query(Party.id, Party.name).yield_per(5000)}
+        postings: Dict[str, Set[int]] = {}
+        for party_id, lowered in names.items():
+            for gram in _ngrams(lowered):
+                postings.setdefault(gram, set()).add(party_id)
+        ordered = sorted((lowered, party_id) for party_id, lowered in names.items())
+        words = sorted(
+            (suffix, party_id) for party_id, lowered in names.items() for suffix in _word_suffixes(lowered)
+        )
+        return names, postings, ordered, words
+
+    def load(self, db: Session, version: int) -> None:
+        """Build the index from the parties table (once); version is the table's version, read before calling"""
+        with self._lock:
+            if self.loaded:
+                return
+            self._names, self._postings, self._sorted, self._words = self._build(db)
+            self.version = version
+            self.loaded = True
+
+    def reload(self, db: Session, version: int) -> None:
+        """Rebuild the index from the parties table, serving the old one meanwhile"""
+        built = self._build(db)
+        with self._lock:
+            self._names, self._postings, self._sorted, self._words = built
+            self.version = version
+            self.loaded = True
+
+    def start_reload(self, reload) -> Optional[threading.Thread]:
+        """Run reload() in a background thread unless one is already running; returns the thread"""
+        with self._lock:
+            if self._reloading:
+                return None
+            self._reloading = True
+
+        def run():
+            try:
+                reload()
+            except Exception:
+                logger.exception("Party index reload failed")
+            finally:
+                self._reloading = False
+
+        thread = threading.Thread(target=run, name="party-index-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, party_id: int, name: str) -> None:
+        """Index (or re-index) a party name"""
+        with self._lock:
+            if self.loaded:
+                self._add(party_id, name)
+
+    def remove(self, party_id: int) -> None:
+        """Drop a party from the index"""
+        with self._lock:
+            if self.loaded:
+                self._remove(party_id)
+
+    def apply_event(self, event_type: str, payload: str) -> None:
+        """Apply a party change event consumed from the event bus"""
+        if not event_type.startswith("party."):
+            return
+        data = json.loads(payload)
+        if event_type == "party.deleted":
+            self.remove(data["id"])
+        else:
+            self.add(data["party"]["id"], data["party"]["name"])
+
+    def _add(self, party_id: int, name: str) -> None:
+        lowered = name.lower()
+        if self._names.get(party_id) == lowered:
+            return
+        self._remove(party_id)
+        self._names[party_id] = lowered
+        for gram in _ngrams(lowered):
+            self._postings.setdefault(gram, set()).add(party_id)
+        bisect.insort(self._sorted, (lowered, party_id))
+        for suffix in _word_suffixes(lowered):
+            bisect.insort(self._words, (suffix, party_id))
+
+    def _remove(self, party_id: int) -> None:
+        lowered = self._names.pop(party_id, None)
+        if lowered is None:
+            return
+        for gram in _ngrams(lowered):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(party_id)
+                if not ids:
+                    del self._postings[gram]
+        _remove_sorted(self._sorted, (lowered, party_id))
+        for suffix in _word_suffixes(lowered):
+            _remove_sorted(self._words, (suffix, party_id))
+
+    def _candidates(self, term: str) -> Set[int]:
+        postings = [self._postings.get(gram) for gram in _ngrams(term)]
+        if any(ids is None for ids in postings):
+            return set()
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def matching_ids(self, term: str) -> Set[int]:
+        """Ids of all parties whose name contains the term (case-insensitive)"""
+        term = term.lower()
+        with self._lock:
+            if len(term) >= NGRAM:
+                return {party_id for party_id in self._candidates(term) if term in self._names[party_id]}
+            return {party_id for party_id, name in self._names.items() if term in name}
+
+    def search(self, term: str, limit: int) -> List[int]:
+        """
+        Ids of the best `limit` parties whose name contains the term, ranked: exact match,
+        names starting with the term, names with a later word starting with it, then any
+        other substring match; alphabetical within each group. Terms shorter than a
+        trigram only match at word starts.
+        """
+        term = term.lower()
+        found: List[int] = []
+        seen: Set[int] = set()
+
+        def collect(entries: List[Tuple[str, int]]) -> None:
+            position = bisect.bisect_left(entries, (term, -1))
+            while len(found) < limit and position < len(entries):
+                value, party_id = entries[position]
+                if not value.startswith(term):
+                    break
+                if party_id not in seen:
+                    seen.add(party_id)
+                    found.append(party_id)
+                position += 1
+
+        with self._lock:
+            # Exact and prefix matches (the exact name sorts first), then word-prefix matches
+            collect(self._sorted)
+            collect(self._words)
+            if len(found) >= limit or len(term) < NGRAM:
+                return found
+            candidates = self._candidates(term) - seen
+            names = self._names
+            if len(candidates) ** 2 <= limit * len(names):
+                # Few candidates: verify and sort them
+                matches = sorted((names[party_id], party_id) for party_id in candidates if term in names[party_id])
+                found.extend(party_id for _, party_id in matches[:limit - len(found)])
+            else:
+                # Many candidates: walk names alphabetically until the page is full
+                for lowered, party_id in self._sorted:
+                    if party_id in candidates and term in lowered:
+                        found.append(party_id)
+                        if len(found) >= limit:
+                            break
+            return found
+
+
+# Global index
+party_search_index = PartySearchIndex()
+
+
+class PartySearchService:
+    """
+    Ranked party name search backed by pg_trgm on PostgreSQL (index created by
+    migration 3) and PartySearchIndex elsewhere
+    """
+
+    @staticmethod
+    def _uses_trigram_index(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def index_party(db: Session, party: Party) -> None:
+        """Reflect a committed party insert/rename in the in-process index"""
+        party_search_index.add(party.id, party.name)
+
+    @staticmethod
+    def unindex_party(db: Session, party_id: int) -> None:
+        """Reflect a committed party delete in the in-process index"""
+        party_search_index.remove(party_id)
+
+    @staticmethod
+    def _reload_index() -> None:
+        from app.db.database import SessionLocal
+
+        with SessionLocal() as db:
+            # Version first: a write in between only makes the index look older than it is
+            version = TableVersionService.get_version(db, PARTIES)
+            party_search_index.reload(db, version)
+
+    @staticmethod
+    def index_is_current(db: Session) -> bool:
+        """
+        Whether the in-process index reflects the parties table as of its current
+        version (loading it on first use). A stale index, after a write here or in
+        another worker, is reloaded in the background and not used until then.
+        """
+        version = TableVersionService.current_versions(db, [PARTIES])[PARTIES]
+        if not party_search_index.loaded:
+            party_search_index.load(db, version)
+        if party_search_index.version == version:
+            return True
+        party_search_index.start_reload(PartySearchService._reload_index)
+        return False
+
+    @staticmethod
+    def _name_condition(column, party_filter: str):
+        """column IN (ids of parties whose name contains party_filter), matched by the database"""
+        pattern = f"%{_escape_like(party_filter)}%"
+        return column.in_(select(Party.id).where(Party.name.ilike(pattern, escape="\\")))
+
+    @staticmethod
+    def resolve_party_ids(db: Session, party_filter: Optional[str] = None,
+                          party_ids: Optional[List[int]] = None) -> Optional[Set[int]]:
+        """
+        Party ids selected by a name filter (substring, case-insensitive) and/or an
+        explicit id list; both are combined when given. None means unfiltered.
+        Name filters are resolved from the in-process index; check index_is_current first.
+        """
+        resolved = None
+        if party_filter:
+            resolved = party_search_index.matching_ids(party_filter)
+        if party_ids is not None:
+            resolved = set(party_ids) if resolved is None else resolved & set(party_ids)
+        return resolved
+
+    @staticmethod
+    def party_condition(db: Session, column, party_filter: Optional[str] = None,
+                        party_ids: Optional[List[int]] = None):
+        """
+        WHERE condition restricting a party_id column to the filtered parties, or None.
+        The filter is resolved to ids up front, so queries use the party_id index
+        instead of joining parties and matching names row by row. While the in-process
+        index may be stale the names are matched by the database instead.
+        """
+        if party_filter and not PartySearchService.index_is_current(db):
+            condition = PartySearchService._name_condition(column, party_filter)
+            if party_ids is not None:
+                condition = and_(condition, column.in_(sorted(set(party_ids))))
+            return condition
+        resolved = PartySearchService.resolve_party_ids(db, party_filter, party_ids)
+        if resolved is None:
+            return None
+        if len(resolved) > PARTY_IDS_INLINE_LIMIT and party_ids is None:
+            return PartySearchService._name_condition(column, party_filter)
+        return column.in_(sorted(resolved))
+
+    @staticmethod
+    def search(db: Session, term: str, limit: int) -> List[Party]:
+        """Top `limit` parties whose name contains the term, best matches first"""
+        term = term.strip()
+        if not term:
+            return []
+        # A stale in-process index is reloading; rank in the database meanwhile
+        if PartySearchService._uses_trigram_index(db) or not PartySearchService.index_is_current(db):
+            lowered = term.lower()
+            escaped = _escape_like(lowered)
+            name = func.lower(Party.name)
+            # ILIKE on the raw column so the gin_trgm_ops index can be used
+            starts_name = Party.name.ilike(f"{escaped}%", escape="\\")
+            starts_word = Party.name.ilike(f"% {escaped}%", escape="\\")
+            query = db.query(Party)
+            if len(lowered) < NGRAM:
+                query = query.filter(or_(starts_name, starts_word))
+            else:
+                query = query.filter(Party.name.ilike(f"%{escaped}%", escape="\\"))
+            return query.order_by(
+                case(
+                    (name == lowered, 0),
+                    (starts_name, 1),
+                    (starts_word, 2),
+                    else_=3,
+                ),
+                name,
+                Party.id,
+            ).limit(limit).all()
+
+        ids = party_search_index.search(term, limit)
+        if not ids:
+            return []
+        parties = {party.id: party for party in db.query(Party).filter(Party.id.in_(ids))}
+        return [parties[party_id] for party_id in ids if party_id in parties]
@@ -2,12 +2,22 @@
 Service layer for Party operations
 """
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update
+from pydantic import TypeAdapter
 from app.models.party import Party
 from app.models.transaction import Transaction
-from app.schemas.party import PartyCreate, PartyUpdate
+from app.schemas.party import PartyCreate, PartyUpdate, PartyResponse
+from app.core.events import publish_event
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+from app.services.party_search_service import PartySearchService
+from app.services.table_version_service import TableVersionService, PARTIES, TRANSACTIONS
+from app.core.reference_cache import reference_cache
 from typing import List, Optional
 
+_party_list = TypeAdapter(List[PartyResponse])
+
 
 class PartyService:
     """Service for party-related operations"""
@@ -17,8 +27,14 @@ class PartyService:
         """Create a new party"""
         db_party = Party(**party.model_dump())
         db.add(db_party)
+        db.flush()
+        BalanceService.ensure_party(db, db_party.id)
+        TableVersionService.bump(db, PARTIES)
+        db.refresh(db_party)
+        publish_event(db, "party.created", {"party": PartyResponse.model_validate(db_party).model_dump(mode="json")})
         db.commit()
         db.refresh(db_party)
+        PartySearchService.index_party(db, db_party)
         return db_party
     
     @staticmethod
@@ -31,6 +47,15 @@ class PartyService:
         """Get all parties"""
         return db.query(Party).order_by(Party.name).all()
     
+    @staticmethod
+    def get_all_parties_json(db: Session) -> bytes:
+        """All parties as a serialized JSON response body, served from the reference data cache"""
+        return reference_cache.get(
+            PARTIES,
+            lambda: TableVersionService.get_version(db, PARTIES),
+            lambda: _party_list.dump_json(_party_list.validate_python(PartyService.get_all_parties(db), from_attributes=True)),
+        )
+    
     @staticmethod
     def update_party(db: Session, party_id: int, party_update: PartyUpdate) -> Optional[Party]:
         """
@@ -51,8 +76,13 @@ class PartyService:
         # reference party name, we'd need to update those separately if needed.
         # For now, we're updating the party object which will reflect in relationships.
         
+        TableVersionService.bump(db, PARTIES)
+        db.flush()
+        db.refresh(db_party)
+        publish_event(db, "party.updated", {"party": PartyResponse.model_validate(db_party).model_dump(mode="json")})
         db.commit()
         db.refresh(db_party)
+        PartySearchService.index_party(db, db_party)
         return db_party
     
     @staticmethod
@@ -62,13 +92,70 @@ class PartyService:
         if not db_party:
             return False
         
+        BalanceService.remove_party(db, party_id)
+        MonthlyBalanceService.remove_party(db, party_id)
         db.delete(db_party)
+        TableVersionService.bump(db, PARTIES, TRANSACTIONS)
+        db.flush()
+        publish_event(db, "party.deleted", {
+            "id": party_id,
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
         db.commit()
+        PartySearchService.unindex_party(db, party_id)
         return True
     
     @staticmethod
     def search_parties(db: Session, search_term: str) -> List[Party]:
-        """Search parties by name (partial match, case-insensitive)"""
-        return db.query(Party).filter(
-            Party.name.ilike(f"%{search_term}%")
-        ).order_by(Party.name).all()
+        """
+        Search parties by name (partial match, case-insensitive, % and _ taken literally).
+        Matched by the in-process party index, or by the database while it may be stale.
+        """
+        query = db.query(Party)
+        condition = PartySearchService.party_condition(db, Party.id, search_term)
+        if condition is not None:
+            query = query.filter(condition)
+        return query.order_by(Party.name).all()
+    
+    @staticmethod
+    def search_parties_ranked(db: Session, search_term: str, limit: int) -> List[Party]:
+        """Top matches for a name search (exact, then prefix, then substring matches)"""
+        return PartySearchService.search(db, search_term, limit)
+
+
+class AsyncPartyService:
+    """
+    Async variant of PartyService for async routes.
+    Runs the same logic through AsyncSession.run_sync, so DB I/O is awaited
+    instead of blocking the event loop.
+    """
+    
+    @staticmethod
+    async def create_party(db: AsyncSession, party: PartyCreate) -> Party:
+        """Create a new party"""
+        return await db.run_sync(PartyService.create_party, party)
+    
+    @staticmethod
+    async def get_party(db: AsyncSession, party_id: int) -> Optional[Party]:
+        """Get a party by ID"""
+        return await db.run_sync(PartyService.get_party, party_id)
+    
+    @staticmethod
+    async def get_all_parties(db: AsyncSession) -> List[Party]:
+        """Get all parties"""
+        return await db.run_sync(PartyService.get_all_parties)
+    
+    @staticmethod
+    async def update_party(db: AsyncSession, party_id: int, party_update: PartyUpdate) -> Optional[Party]:
+        """Update a party"""
+        return await db.run_sync(PartyService.update_party, party_id, party_update)
+    
+    @staticmethod
+    async def delete_party(db: AsyncSession, party_id: int) -> bool:
+        """Delete a party (cascades to transactions)"""
+        return await db.run_sync(PartyService.delete_party, party_id)
+    
+    @staticmethod
+    async def search_parties(db: AsyncSession, search_term: str) -> List[Party]:
+        """Search parties by name"""
+        return await db.run_sync(PartyService.search_parties, search_term)
@@ -0,0 +1,93 @@
+"""
+Serial number allocator for transactions
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text
+from sqlalchemy.exc import ProgrammingError
+from app.db.migrations import DatabaseNotMigratedError
+from app.models.serial_counter import SerialCounter
+from app.models.transaction import Transaction
+from typing import List
+
+TRANSACTION_COUNTER = "transactions"
+TRANSACTION_SEQUENCE = "transaction_serial_seq"
+
+
+class SerialAllocator:
+    """
+    Hands out transaction serial numbers atomically.
+    On PostgreSQL a native sequence is used, so allocation never blocks other writers.
+    Elsewhere a counter row is incremented in place; the row lock is held until the
+    caller commits, which keeps numbering gapless and serializes concurrent allocators.
+    """
+    
+    @staticmethod
+    def _uses_sequence(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+    
+    @staticmethod
+    def initialize(db: Session) -> None:
+        """Create the counter (or sequence) and move it past the highest existing serial number"""
+        max_serial = db.query(func.max(Transaction.serial_number)).scalar() or 0
+        if SerialAllocator._uses_sequence(db):
+            db.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {TRANSACTION_SEQUENCE}"))
+            current = db.execute(text(f"SELECT last_value, is_called FROM {TRANSACTION_SEQUENCE}")).one()
+            last_issued = current.last_value if current.is_called else current.last_value - 1
+            if last_issued < max_serial:
+                db.execute(text("SELECT setval(:seq, :value)"), {"seq": TRANSACTION_SEQUENCE, "value": max_serial})
+        else:
+            counter = db.get(SerialCounter, TRANSACTION_COUNTER)
+            if counter is None:
+                db.add(SerialCounter(name=TRANSACTION_COUNTER, value=max_serial))
+            elif counter.value < max_serial:
+                counter.value = max_serial
+        db.commit()
+    
+    @staticmethod
+    def reset(db: Session) -> None:
+        """
+        Restart numbering at 1; only for a transactions table emptied in the same DB
+        transaction. The caller commits (a PostgreSQL setval takes effect at once).
+        """
+        if SerialAllocator._uses_sequence(db):
+            db.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {TRANSACTION_SEQUENCE}"))
+            db.execute(text("SELECT setval(:seq, 1, false)"), {"seq": TRANSACTION_SEQUENCE})
+        else:
+            db.query(SerialCounter).filter(SerialCounter.name == TRANSACTION_COUNTER).delete(synchronize_session=False)
+            db.add(SerialCounter(name=TRANSACTION_COUNTER, value=0))
+
+    @staticmethod
+    def allocate(db: Session) -> int:
+        """Allocate the next serial number"""
+        return SerialAllocator.reserve_block(db, 1)[0]
+    
+    @staticmethod
+    def reserve_block(db: Session, count: int) -> List[int]:
+        """Allocate count serial numbers in one round trip (contiguous except under concurrency on PostgreSQL)"""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        
+        if SerialAllocator._uses_sequence(db):
+            try:
+                rows = db.execute(
+                    text(f"SELECT nextval('{TRANSACTION_SEQUENCE}') FROM generate_series(1, :n)"),
+                    {"n": count},
+                ).scalars().all()
+            except ProgrammingError as e:
+                if TRANSACTION_SEQUENCE not in str(e):
+                    raise
+                raise DatabaseNotMigratedError(
+                    "Serial number sequence does not exist; run `python migrate.py`"
+                ) from e
+            return sorted(int(v) for v in rows)
+        
+        updated = db.query(SerialCounter).filter(SerialCounter.name == TRANSACTION_COUNTER).update(
+            {SerialCounter.value: SerialCounter.value + count},
+            synchronize_session=False,
+        )
+        if not updated:
+            raise DatabaseNotMigratedError("Serial counter is not initialized; run `python migrate.py`")
+        # The UPDATE holds the write lock, so this read sees our own increment
+        last = db.query(SerialCounter.value).filter(SerialCounter.name == TRANSACTION_COUNTER).scalar()
+        first = int(last) - count + 1
+        return list(range(first, int(last) + 1))
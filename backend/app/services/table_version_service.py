@@ -0,0 +1,99 @@
+"""
+Service layer for per-table change versions
+"""
+import logging
+from sqlalchemy import event, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.models.table_version import TableVersion
+from app.core.reference_cache import reference_cache
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+PARTIES = "parties"
+TRANSACTION_TYPES = "transaction_types"
+TRANSACTIONS = "transactions"
+VERSIONED_TABLES = (PARTIES, TRANSACTION_TYPES, TRANSACTIONS)
+# Session.info keys of the tables bumped in the session's open transaction, and of the
+# ones whose versions its commit is incrementing
+_BUMPED = "bumped_tables"
+_COMMITTED = "committed_tables"
+
+
+class TableVersionService:
+    """
+    Change counters for tables whose responses are cached or served conditionally.
+    Writers mark the tables they change with bump() inside their DB transaction; the
+    counters are incremented in that same transaction, as its last statements before
+    the commit, so a version never lags the data it describes. The counter rows are
+    locked in table-name order and only held for the commit itself. Once the commit
+    succeeds this worker's reference_cache forgets the versions; other workers forget
+    them on the change event, which is published in the same transaction.
+    """
+    
+    @staticmethod
+    def initialize(db: Session) -> None:
+        """Create the counter rows that do not exist yet"""
+        existing = {name for (name,) in db.query(TableVersion.name).all()}
+        for name in VERSIONED_TABLES:
+            if name not in existing:
+                db.add(TableVersion(name=name, version=0))
+        db.commit()
+    
+    @staticmethod
+    def bump(db: Session, *tables: str) -> None:
+        """Increment the version of each table when the session's transaction commits (in that transaction)"""
+        db.info.setdefault(_BUMPED, set()).update(tables)
+    
+    @staticmethod
+    def increment(conn: Connection, tables: Iterable[str]) -> None:
+        """Increment the versions of tables on conn (in name order, so concurrent calls never deadlock)"""
+        table = TableVersion.__table__
+        for name in sorted(tables):
+            updated = conn.execute(
+                update(table).where(table.c.name == name).values(version=table.c.version + 1)
+            ).rowcount
+            if not updated:
+                conn.execute(table.insert().values(name=name, version=1))
+    
+    @staticmethod
+    def current_versions(db: Session, tables: Iterable[str]) -> Dict[str, int]:
+        """Versions of tables, from reference_cache while known current, else from the DB"""
+        return reference_cache.versions(tables, lambda missing: TableVersionService.get_versions(db, missing))
+    
+    @staticmethod
+    def get_version(db: Session, table: str) -> int:
+        """Current version of a table (0 if never written)"""
+        return int(db.query(TableVersion.version).filter(TableVersion.name == table).scalar() or 0)
+    
+    @staticmethod
+    def get_versions(db: Session, tables: Iterable[str]) -> Dict[str, int]:
+        """Current versions of several tables in one query"""
+        tables = list(tables)
+        versions = dict(db.query(TableVersion.name, TableVersion.version).filter(TableVersion.name.in_(tables)).all())
+        return {name: int(versions.get(name, 0)) for name in tables}
+
+
+@event.listens_for(Session, "before_commit")
+def _increment_bumped_tables(session: Session) -> None:
+    """Increment the versions of the bumped tables as the last statements of the committing transaction"""
+    tables = session.info.pop(_BUMPED, None)
+    if not tables:
+        return
+    session.flush()
+    TableVersionService.increment(session.connection(), tables)
+    session.info[_COMMITTED] = tables
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tables(session: Session) -> None:
+    """Make this worker re-read the versions of the tables the commit changed"""
+    for table in session.info.pop(_COMMITTED, ()):
+        reference_cache.invalidate(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumped_tables(session: Session) -> None:
+    session.info.pop(_BUMPED, None)
+    session.info.pop(_COMMITTED, None)
@@ -0,0 +1,104 @@
+"""
+Service layer for streaming transaction exports (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.party import Party
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.services.party_search_service import PartySearchService
+
+# Rows fetched from the server-side cursor (and written) per batch
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "id", "serial_number", "date", "party_id", "party_name", "transaction_note",
+    "type_id", "type_note", "type", "amount", "created_at", "updated_at",
+]
+
+
+class TransactionExportService:
+    """
+    Streams filtered transactions with their party name and type note.
+    Rows are read through a server-side cursor in fixed-size batches, so memory
+    stays flat regardless of result size. Each export owns its DB session because
+    it outlives the request handler.
+    """
+    
+    @staticmethod
+    def export_query(db: Session,
+                     party_filter: Optional[str] = None,
+                     date_start: Optional[date] = None,
+                     date_end: Optional[date] = None,
+                     party_ids: Optional[List[int]] = None):
+        """Build the column-only export statement with the same filters as get_all_transactions"""
+        stmt = (
+            select(
+                Transaction.id, Transaction.serial_number, Transaction.date, Transaction.party_id,
+                Party.name, Transaction.transaction_note, Transaction.type_id,
+                TransactionType.note, TransactionType.type, Transaction.amount,
+                Transaction.created_at, Transaction.updated_at,
+            )
+            .join(Party, Party.id == Transaction.party_id)
+            .join(TransactionType, TransactionType.id == Transaction.type_id)
+        )
+        party_condition = PartySearchService.party_condition(db, Transaction.party_id, party_filter, party_ids)
+        if party_condition is not None:
+            stmt = stmt.where(party_condition)
+        if date_start:
+            stmt = stmt.where(Transaction.date >= date_start)
+        if date_end:
+            stmt = stmt.where(Transaction.date <= date_end)
+        return stmt.order_by(Transaction.date.desc(), Transaction.serial_number.desc())
+    
+    @staticmethod
+    def iter_batches(party_filter: Optional[str] = None,
+                     date_start: Optional[date] = None,
+                     date_end: Optional[date] = None,
+                     party_ids: Optional[List[int]] = None) -> Iterator[list]:
+        """Yield lists of row tuples read through a server-side cursor"""
+        db = SessionLocal()
+        try:
+            stmt = TransactionExportService.export_query(db, party_filter, date_start, date_end, party_ids)
+            result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            for partition in result.partitions():
+                yield partition
+        finally:
+            db.close()
+    
+    @staticmethod
+    def stream_csv(party_filter: Optional[str] = None,
+                   date_start: Optional[date] = None,
+                   date_end: Optional[date] = None,
+                   party_ids: Optional[List[int]] = None) -> Iterator[bytes]:
+        """Yield the export as CSV, header first"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue().encode()
+        for batch in TransactionExportService.iter_batches(party_filter, date_start, date_end, party_ids):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+                for row in batch
+            )
+            yield buffer.getvalue().encode()
+    
+    @staticmethod
+    def stream_ndjson(party_filter: Optional[str] = None,
+                      date_start: Optional[date] = None,
+                      date_end: Optional[date] = None,
+                      party_ids: Optional[List[int]] = None) -> Iterator[bytes]:
+        """Yield the export as newline-delimited JSON, one object per transaction"""
+        for batch in TransactionExportService.iter_batches(party_filter, date_start, date_end, party_ids):
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=lambda v: v.isoformat()) + "\n"
+                for row in batch
+            ).encode()
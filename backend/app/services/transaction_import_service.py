@@ -0,0 +1,227 @@
+"""
+Service layer for bulk transaction import (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+import logging
+from collections import defaultdict
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from app.models.party import Party
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.schemas.transaction import TransactionCreate
+from app.db.migrations import DatabaseNotMigratedError
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthKey, MonthlyBalanceService, month_of
+from app.services.serial_allocator import SerialAllocator
+from app.services.table_version_service import TableVersionService, TRANSACTIONS
+from app.core.events import publish_event
+
+logger = logging.getLogger(__name__)
+
+# Rows validated, numbered and inserted per DB transaction
+IMPORT_CHUNK_SIZE = 2000
+# Rejected rows listed in the result; the failed count covers all of them
+MAX_REPORTED_ERRORS = 1000
+
+
+class TransactionImportService:
+    """
+    Imports transactions in bulk.
+    Rows may reference parties and types by id (party_id / type_id) or by name
+    (party = party name, type = transaction type note). Invalid rows are reported
+    individually and never abort the rest of the file.
+    """
+    
+    @staticmethod
+    def iter_csv_rows(source: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+        """Yield (row_number, row) from a CSV file with a header line"""
+        reader = csv.DictReader(io.TextIOWrapper(source, encoding="utf-8-sig", newline=""))
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, {k.strip(): (v.strip() if isinstance(v, str) else v)
+                               for k, v in row.items() if k is not None}
+    
+    @staticmethod
+    def iter_ndjson_rows(source: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+        """Yield (row_number, row) from newline-delimited JSON; malformed lines yield an error marker"""
+        row_number = 0
+        for line in io.TextIOWrapper(source, encoding="utf-8-sig"):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = {"__error__": f"Invalid JSON: {e}"}
+            if not isinstance(row, dict):
+                row = {"__error__": "Each line must be a JSON object"}
+            yield row_number, row
+    
+    @staticmethod
+    def load_lookups(db: Session) -> Tuple[Dict[str, Optional[int]], Set[int], Dict[str, Optional[int]], Dict[int, str]]:
+        """
+        Load, with one query per table, the name -> id map and id set of parties and
+        the note -> id and id -> kind maps of transaction types.
+        Names shared by several rows map to None (ambiguous).
+        """
+        party_by_name: Dict[str, Optional[int]] = {}
+        party_ids: Set[int] = set()
+        for party_id, name in db.query(Party.id, Party.name).all():
+            key = name.strip().lower()
+            party_by_name[key] = None if key in party_by_name else party_id
+            party_ids.add(party_id)
+        type_by_note: Dict[str, Optional[int]] = {}
+        kind_by_type: Dict[int, str] = {}
+        for type_id, note, kind in db.query(TransactionType.id, TransactionType.note, TransactionType.type).all():
+            key = note.strip().lower()
+            type_by_note[key] = None if key in type_by_note else type_id
+            kind_by_type[type_id] = kind
+        return party_by_name, party_ids, type_by_note, kind_by_type
+    
+    @staticmethod
+    def _resolve(row: dict, id_field: str, name_field: str, by_name: Dict[str, Optional[int]], label: str) -> dict:
+        """Replace a name reference with its id; raises ValueError when it cannot be resolved"""
+        if row.get(id_field) not in (None, ""):
+            return row
+        name = row.get(name_field)
+        if not name:
+            raise ValueError(f"Missing {id_field} or {name_field}")
+        key = str(name).strip().lower()
+        if key not in by_name:
+            raise ValueError(f"Unknown {label} '{name}'")
+        if by_name[key] is None:
+            raise ValueError(f"Ambiguous {label} '{name}', use {id_field}")
+        row = dict(row)
+        row[id_field] = by_name[key]
+        return row
+    
+    @staticmethod
+    def import_rows(db: Session, rows: Iterator[Tuple[int, dict]], chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+        """
+        Validate and insert rows in chunks, one commit per chunk.
+        Returns {"inserted": n, "failed": n, "errors": [{"row": n, "error": msg}, ...],
+        "errors_truncated": bool}; errors lists the first MAX_REPORTED_ERRORS rejected rows.
+        """
+        party_by_name, party_ids, type_by_note, kind_by_type = TransactionImportService.load_lookups(db)
+        
+        result = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        chunk: List[Tuple[int, TransactionCreate]] = []
+        
+        def fail(row_number: int, message: str):
+            result["failed"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append({"row": row_number, "error": message})
+            else:
+                result["errors_truncated"] = True
+        
+        for row_number, raw in rows:
+            if "__error__" in raw:
+                fail(row_number, raw["__error__"])
+                continue
+            try:
+                raw = TransactionImportService._resolve(raw, "party_id", "party", party_by_name, "party")
+                raw = TransactionImportService._resolve(raw, "type_id", "type", type_by_note, "transaction type")
+                if raw.get("transaction_note") == "":
+                    raw = {**raw, "transaction_note": None}
+                item = TransactionCreate.model_validate(raw)
+            except ValidationError as e:
+                fail(row_number, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            except ValueError as e:
+                fail(row_number, str(e))
+                continue
+            if item.party_id not in party_ids:
+                fail(row_number, f"Party {item.party_id} not found")
+                continue
+            if item.type_id not in kind_by_type:
+                fail(row_number, f"Transaction type {item.type_id} not found")
+                continue
+            chunk.append((row_number, item))
+            if len(chunk) >= chunk_size:
+                TransactionImportService._insert_chunk(db, chunk, kind_by_type, result, fail)
+                chunk = []
+        if chunk:
+            TransactionImportService._insert_chunk(db, chunk, kind_by_type, result, fail)
+        return result
+    
+    @staticmethod
+    def _insert_chunk(db: Session, chunk: List[Tuple[int, TransactionCreate]], kind_by_type: Dict[int, str],
+                      result: dict, fail) -> None:
+        """
+        Insert one chunk and publish its event in one commit. If the chunk fails, insert
+        its rows one commit each, so only the rows that fail themselves are rejected.
+        """
+        try:
+            TransactionImportService._insert_rows(db, [item for _, item in chunk], kind_by_type)
+            TransactionImportService._publish_imported(db, len(chunk))
+            db.commit()
+            result["inserted"] += len(chunk)
+            return
+        except DatabaseNotMigratedError:
+            # Not a problem with the rows: fail the whole import
+            db.rollback()
+            raise
+        except Exception:
+            db.rollback()
+        
+        inserted = 0
+        for row_number, item in chunk:
+            try:
+                TransactionImportService._insert_rows(db, [item], kind_by_type)
+                db.commit()
+                inserted += 1
+            except DatabaseNotMigratedError:
+                db.rollback()
+                raise
+            except Exception as e:
+                db.rollback()
+                # The exception carries SQL and parameters: log it, report a fixed message
+                logger.warning("Import row %d could not be inserted", row_number, exc_info=True)
+                fail(row_number, f"Insert failed: {TransactionImportService._describe(e)}")
+        if inserted:
+            TransactionImportService._publish_imported(db, inserted)
+            db.commit()
+            result["inserted"] += inserted
+    
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        """Short client-safe reason for a failed row insert"""
+        if isinstance(error, IntegrityError):
+            return "duplicate or invalid reference"
+        if isinstance(error, (DataError, OverflowError)):
+            return "value out of range"
+        return "database error"
+    
+    @staticmethod
+    def _insert_rows(db: Session, items: List[TransactionCreate], kind_by_type: Dict[int, str]) -> None:
+        """Number, insert (executemany) and apply the balance and checkpoint deltas of items, without committing"""
+        serials = SerialAllocator.reserve_block(db, len(items))
+        values = [
+            {"serial_number": serial, **item.model_dump()}
+            for serial, item in zip(serials, items)
+        ]
+        db.execute(Transaction.__table__.insert(), values)
+        
+        deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        monthly_deltas: Dict[MonthKey, List[int]] = defaultdict(lambda: [0, 0])
+        for item in items:
+            side = 0 if kind_by_type[item.type_id] == "add" else 1
+            deltas[item.party_id][side] += item.amount
+            monthly_deltas[(item.party_id, month_of(item.date))][side] += item.amount
+        BalanceService.apply_deltas(db, {party_id: (add, reduce) for party_id, (add, reduce) in deltas.items()})
+        MonthlyBalanceService.apply_deltas(db, {key: (add, reduce) for key, (add, reduce) in monthly_deltas.items()})
+        TableVersionService.bump(db, TRANSACTIONS)
+    
+    @staticmethod
+    def _publish_imported(db: Session, inserted: int) -> None:
+        """One summary event per chunk instead of one per row; clients refetch the list"""
+        publish_event(db, "transactions.imported", {
+            "inserted": inserted,
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
@@ -1,63 +1,202 @@
 """
 Service layer for Transaction operations
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, joinedload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select
+from sqlalchemy.engine import Row
 from app.models.transaction import Transaction
-from app.models.party import Party
 from app.models.transaction_type import TransactionType
-from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.models.party import Party
+from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
+from app.schemas.party import PartyResponse
+from app.schemas.transaction_type import TransactionTypeResponse
+from app.core.events import publish_event
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+from app.services.serial_allocator import SerialAllocator
+from app.services.party_search_service import PartySearchService
+from app.services.table_version_service import TableVersionService, TRANSACTIONS
 from datetime import date
 from typing import List, Optional, Tuple
 
+# TransactionResponse fields, in order, for the row-tuple fast path
+RESPONSE_COLUMNS = (
+    Transaction.date, Transaction.party_id, Transaction.transaction_note, Transaction.type_id,
+    Transaction.amount, Transaction.id, Transaction.serial_number, Transaction.created_at,
+    Transaction.updated_at,
+)
+RESPONSE_KEYS = tuple(column.key for column in RESPONSE_COLUMNS)
+
+# Relations that can be embedded with ?include=: name -> (relationship, response schema, columns in field order)
+RELATIONS = {
+    "party": (Transaction.party, PartyResponse, (
+        Party.name, Party.billing_name, Party.location, Party.id, Party.created_at, Party.updated_at,
+    )),
+    "type": (Transaction.transaction_type, TransactionTypeResponse, (
+        TransactionType.note, TransactionType.type, TransactionType.id, TransactionType.created_at,
+        TransactionType.updated_at,
+    )),
+}
+
 
 class TransactionService:
     """Service for transaction-related operations"""
     
     @staticmethod
-    def get_next_serial_number(db: Session) -> int:
-        """Get the next serial number for a new transaction (continuous numbering)"""
-        max_serial = db.query(func.max(Transaction.serial_number)).scalar()
-        return (max_serial or 0) + 1
+    def parse_include(include: Optional[str]) -> Tuple[str, ...]:
+        """Relation names from an include parameter such as "party,type". Raises ValueError for unknown names."""
+        if not include:
+            return ()
+        names = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+        unknown = [name for name in names if name not in RELATIONS]
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)} (allowed: {', '.join(RELATIONS)})")
+        return names
+    
+    @staticmethod
+    def embedded_keys(include: Tuple[str, ...]) -> dict:
+        """Response key -> field keys of each embedded relation, in row column order"""
+        return {
+            RELATIONS[name][0].key: tuple(column.key for column in RELATIONS[name][2])
+            for name in include
+        }
+    
+    @staticmethod
+    def to_response(db_transaction: Transaction, include: Tuple[str, ...] = ()) -> dict:
+        """TransactionResponse fields plus the loaded relations named in include"""
+        data = TransactionResponse.model_validate(db_transaction).model_dump()
+        for name in include:
+            relationship, schema, _ = RELATIONS[name]
+            data[relationship.key] = schema.model_validate(getattr(db_transaction, relationship.key)).model_dump()
+        return data
+    
+    @staticmethod
+    def _apply_filters(db: Session, query, party_filter: Optional[str] = None,
+                       date_start: Optional[date] = None, date_end: Optional[date] = None,
+                       party_ids: Optional[List[int]] = None):
+        """Apply the list filters to an ORM query or a select()"""
+        # Filter by party name (partial match) and/or explicit party ids
+        party_condition = PartySearchService.party_condition(db, Transaction.party_id, party_filter, party_ids)
+        if party_condition is not None:
+            query = query.filter(party_condition)
+        
+        # Filter by date range
+        if date_start:
+            query = query.filter(Transaction.date >= date_start)
+        if date_end:
+            query = query.filter(Transaction.date <= date_end)
+        return query
+    
+    @staticmethod
+    def publish_change(db: Session, event_type: str, db_transaction: Transaction) -> None:
+        """Publish a written transaction and the new outstanding total; call right before committing"""
+        db.flush()
+        db.refresh(db_transaction)
+        publish_event(db, event_type, {
+            "transaction": TransactionResponse.model_validate(db_transaction).model_dump(mode="json"),
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
     
     @staticmethod
     def create_transaction(db: Session, transaction: TransactionCreate) -> Transaction:
         """Create a new transaction"""
-        serial_number = TransactionService.get_next_serial_number(db)
+        serial_number = SerialAllocator.allocate(db)
         db_transaction = Transaction(
             serial_number=serial_number,
             **transaction.model_dump()
         )
         db.add(db_transaction)
+        kind = BalanceService.get_type_kind(db, db_transaction.type_id)
+        BalanceService.apply_delta(db, db_transaction.party_id, kind, db_transaction.amount)
+        MonthlyBalanceService.apply_delta(db, db_transaction.party_id, db_transaction.date, kind, db_transaction.amount)
+        TableVersionService.bump(db, TRANSACTIONS)
+        TransactionService.publish_change(db, "transaction.created", db_transaction)
         db.commit()
         db.refresh(db_transaction)
         return db_transaction
     
     @staticmethod
-    def get_transaction(db: Session, transaction_id: int) -> Optional[Transaction]:
-        """Get a transaction by ID with relations"""
-        return db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    def get_transaction(db: Session, transaction_id: int, include: Tuple[str, ...] = ()) -> Optional[Transaction]:
+        """
+        Get a transaction by ID. Relations named in include are joined into the same
+        query; any other relationship access raises instead of lazy-loading.
+        """
+        query = db.query(Transaction)
+        if include:
+            query = query.options(
+                *(joinedload(RELATIONS[name][0]) for name in include),
+                raiseload("*"),
+            )
+        return query.filter(Transaction.id == transaction_id).first()
     
     @staticmethod
     def get_all_transactions(db: Session, party_filter: Optional[str] = None, 
                             date_start: Optional[date] = None, 
-                            date_end: Optional[date] = None) -> List[Transaction]:
+                            date_end: Optional[date] = None,
+                            party_ids: Optional[List[int]] = None) -> List[Transaction]:
         """
         Get all transactions with optional filters
         """
-        query = db.query(Transaction)
+        query = TransactionService._apply_filters(
+            db, db.query(Transaction), party_filter, date_start, date_end, party_ids
+        )
         
-        # Filter by party name (partial match)
-        if party_filter:
-            query = query.join(Party).filter(Party.name.ilike(f"%{party_filter}%"))
+        return query.order_by(Transaction.date.desc(), Transaction.serial_number.desc()).all()
+    
+    @staticmethod
+    def get_all_transaction_rows(db: Session, party_filter: Optional[str] = None,
+                                 date_start: Optional[date] = None,
+                                 date_end: Optional[date] = None,
+                                 party_ids: Optional[List[int]] = None,
+                                 include: Tuple[str, ...] = ()) -> List[Row]:
+        """
+        Same result as get_all_transactions, as plain row tuples of RESPONSE_COLUMNS
+        followed by the columns of each included relation (joined in the same query).
+        Skips ORM object construction and the identity map; pair with JSONRowsResponse.
+        """
+        stmt = select(*RESPONSE_COLUMNS, *(column for name in include for column in RELATIONS[name][2]))
+        for name in include:
+            stmt = stmt.join(RELATIONS[name][0])
+        stmt = TransactionService._apply_filters(db, stmt, party_filter, date_start, date_end, party_ids)
+        return db.execute(stmt.order_by(Transaction.date.desc(), Transaction.serial_number.desc())).all()
+    
+    @staticmethod
+    def get_transactions_page(db: Session, limit: int, cursor: Optional[str] = None,
+                              party_filter: Optional[str] = None,
+                              date_start: Optional[date] = None,
+                              date_end: Optional[date] = None,
+                              party_ids: Optional[List[int]] = None) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Get one page of transactions ordered by (date desc, serial_number desc).
+        Uses keyset pagination so the cost of a page does not depend on its position.
+        Returns (transactions, next_cursor); next_cursor is None on the last page.
+        Raises ValueError if the cursor is malformed.
+        """
+        query = TransactionService._apply_filters(
+            db, db.query(Transaction), party_filter, date_start, date_end, party_ids
+        )
         
-        # Filter by date range
-        if date_start:
-            query = query.filter(Transaction.date >= date_start)
-        if date_end:
-            query = query.filter(Transaction.date <= date_end)
+        # Seek past the last row of the previous page
+        if cursor:
+            last_date, last_serial = decode_cursor(cursor)
+            query = query.filter(or_(
+                Transaction.date < last_date,
+                and_(Transaction.date == last_date, Transaction.serial_number < last_serial),
+            ))
         
-        return query.order_by(Transaction.date.desc(), Transaction.serial_number.desc()).all()
+        # Fetch one extra row to know whether another page exists
+        rows = (
+            query.order_by(Transaction.date.desc(), Transaction.serial_number.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        if len(rows) <= limit:
+            return rows, None
+        page = rows[:limit]
+        last = page[-1]
+        return page, encode_cursor(last.date, last.serial_number)
     
     @staticmethod
     def update_transaction(db: Session, transaction_id: int, transaction_update: TransactionUpdate) -> Optional[Transaction]:
@@ -66,10 +205,25 @@ class TransactionService:
         if not db_transaction:
             return None
         
+        old_party_id = db_transaction.party_id
+        old_date = db_transaction.date
+        old_kind = BalanceService.get_type_kind(db, db_transaction.type_id)
+        old_amount = db_transaction.amount
+        
         update_data = transaction_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_transaction, field, value)
         
+        # Move the amount in the balance projection and the monthly checkpoints
+        # from the old values to the new ones
+        new_kind = BalanceService.get_type_kind(db, db_transaction.type_id)
+        BalanceService.apply_delta(db, old_party_id, old_kind, -old_amount)
+        BalanceService.apply_delta(db, db_transaction.party_id, new_kind, db_transaction.amount)
+        MonthlyBalanceService.apply_delta(db, old_party_id, old_date, old_kind, -old_amount)
+        MonthlyBalanceService.apply_delta(db, db_transaction.party_id, db_transaction.date, new_kind, db_transaction.amount)
+        
+        TableVersionService.bump(db, TRANSACTIONS)
+        TransactionService.publish_change(db, "transaction.updated", db_transaction)
         db.commit()
         db.refresh(db_transaction)
         return db_transaction
@@ -81,7 +235,15 @@ class TransactionService:
         if not db_transaction:
             return False
         
+        kind = BalanceService.get_type_kind(db, db_transaction.type_id)
+        BalanceService.apply_delta(db, db_transaction.party_id, kind, -db_transaction.amount)
+        MonthlyBalanceService.apply_delta(db, db_transaction.party_id, db_transaction.date, kind, -db_transaction.amount)
         db.delete(db_transaction)
+        TableVersionService.bump(db, TRANSACTIONS)
+        publish_event(db, "transaction.deleted", {
+            "id": transaction_id,
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
         db.commit()
         return True
     
@@ -90,32 +252,67 @@ class TransactionService:
         db: Session,
         party_filter: Optional[str] = None,
         date_end: Optional[date] = None,
+        party_ids: Optional[List[int]] = None,
     ) -> int:
         """
         Calculate outstanding amount for (optionally) filtered transactions.
         Logic: Sum of 'add' amounts minus sum of 'reduce' amounts.
         When filters are provided, only transactions matching those filters are included.
+        Without a date_end the total is read from the party_balances projection;
+        with one, from the monthly checkpoints plus the rows of date_end's month.
         """
-        def filtered_query():
-            q = db.query(Transaction).join(TransactionType)
-            if party_filter:
-                q = q.join(Party).filter(Party.name.ilike(f"%{party_filter}%"))
-            if date_end is not None:
-                q = q.filter(Transaction.date <= date_end)
-            return q
+        if date_end is None:
+            return BalanceService.get_outstanding_total(db, party_filter, party_ids)
+        return MonthlyBalanceService.outstanding_total_at(db, date_end, party_filter, party_ids)
 
-        add_total = (
-            filtered_query()
-            .filter(TransactionType.type == "add")
-            .with_entities(func.coalesce(func.sum(Transaction.amount), 0))
-            .scalar()
-            or 0
-        )
-        reduce_total = (
-            filtered_query()
-            .filter(TransactionType.type == "reduce")
-            .with_entities(func.coalesce(func.sum(Transaction.amount), 0))
-            .scalar()
-            or 0
-        )
-        return int(add_total - reduce_total)
+
+class AsyncTransactionService:
+    """
+    Async variant of TransactionService for async routes.
+    Runs the same logic through AsyncSession.run_sync, so DB I/O is awaited
+    instead of blocking the event loop.
+    """
+    
+    @staticmethod
+    async def create_transaction(db: AsyncSession, transaction: TransactionCreate) -> Transaction:
+        """Create a new transaction"""
+        return await db.run_sync(TransactionService.create_transaction, transaction)
+    
+    @staticmethod
+    async def get_transaction(db: AsyncSession, transaction_id: int, include: Tuple[str, ...] = ()) -> Optional[Transaction]:
+        """Get a transaction by ID"""
+        return await db.run_sync(TransactionService.get_transaction, transaction_id, include)
+    
+    @staticmethod
+    async def get_all_transactions(db: AsyncSession, party_filter: Optional[str] = None,
+                                   date_start: Optional[date] = None,
+                                   date_end: Optional[date] = None,
+                                   party_ids: Optional[List[int]] = None) -> List[Transaction]:
+        """Get all transactions with optional filters"""
+        return await db.run_sync(TransactionService.get_all_transactions, party_filter, date_start, date_end, party_ids)
+    
+    @staticmethod
+    async def get_transactions_page(db: AsyncSession, limit: int, cursor: Optional[str] = None,
+                                    party_filter: Optional[str] = None,
+                                    date_start: Optional[date] = None,
+                                    date_end: Optional[date] = None,
+                                    party_ids: Optional[List[int]] = None) -> Tuple[List[Transaction], Optional[str]]:
+        """Get one page of transactions"""
+        return await db.run_sync(TransactionService.get_transactions_page, limit, cursor, party_filter, date_start, date_end, party_ids)
+    
+    @staticmethod
+    async def update_transaction(db: AsyncSession, transaction_id: int, transaction_update: TransactionUpdate) -> Optional[Transaction]:
+        """Update a transaction"""
+        return await db.run_sync(TransactionService.update_transaction, transaction_id, transaction_update)
+    
+    @staticmethod
+    async def delete_transaction(db: AsyncSession, transaction_id: int) -> bool:
+        """Delete a transaction"""
+        return await db.run_sync(TransactionService.delete_transaction, transaction_id)
+    
+    @staticmethod
+    async def calculate_outstanding_total(db: AsyncSession, party_filter: Optional[str] = None,
+                                          date_end: Optional[date] = None,
+                                          party_ids: Optional[List[int]] = None) -> int:
+        """Calculate outstanding amount for (optionally) filtered transactions"""
+        return await db.run_sync(TransactionService.calculate_outstanding_total, party_filter, date_end, party_ids)
@@ -2,11 +2,20 @@
 Service layer for Transaction Type operations
 """
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from app.models.transaction_type import TransactionType
 from app.models.transaction import Transaction
-from app.schemas.transaction_type import TransactionTypeCreate, TransactionTypeUpdate
+from app.schemas.transaction_type import TransactionTypeCreate, TransactionTypeUpdate, TransactionTypeResponse
+from app.core.events import publish_event
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+from app.services.table_version_service import TableVersionService, TRANSACTION_TYPES, TRANSACTIONS
+from app.core.reference_cache import reference_cache
 from typing import List, Optional
 
+_transaction_type_list = TypeAdapter(List[TransactionTypeResponse])
+
 
 class TransactionTypeService:
     """Service for transaction type-related operations"""
@@ -16,6 +25,12 @@ class TransactionTypeService:
         """Create a new transaction type"""
         db_transaction_type = TransactionType(**transaction_type.model_dump())
         db.add(db_transaction_type)
+        TableVersionService.bump(db, TRANSACTION_TYPES)
+        db.flush()
+        db.refresh(db_transaction_type)
+        publish_event(db, "transaction_type.created", {
+            "transaction_type": TransactionTypeResponse.model_validate(db_transaction_type).model_dump(mode="json"),
+        })
         db.commit()
         db.refresh(db_transaction_type)
         return db_transaction_type
@@ -30,6 +45,17 @@ class TransactionTypeService:
         """Get all transaction types"""
         return db.query(TransactionType).order_by(TransactionType.type, TransactionType.note).all()
     
+    @staticmethod
+    def get_all_transaction_types_json(db: Session) -> bytes:
+        """All transaction types as a serialized JSON response body, served from the reference data cache"""
+        return reference_cache.get(
+            TRANSACTION_TYPES,
+            lambda: TableVersionService.get_version(db, TRANSACTION_TYPES),
+            lambda: _transaction_type_list.dump_json(_transaction_type_list.validate_python(
+                TransactionTypeService.get_all_transaction_types(db), from_attributes=True
+            )),
+        )
+    
     @staticmethod
     def update_transaction_type(db: Session, type_id: int, type_update: TransactionTypeUpdate) -> Optional[TransactionType]:
         """
@@ -39,6 +65,8 @@ class TransactionTypeService:
         if not db_transaction_type:
             return None
         
+        old_kind = db_transaction_type.type
+        
         # Update transaction type fields
         update_data = type_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -52,6 +80,18 @@ class TransactionTypeService:
             # to append the new note or handle it differently based on requirements.
             pass  # The relationship is maintained through type_id, so transactions will reflect the change
         
+        # Flipping add <-> reduce moves every related amount in the balance projection
+        if db_transaction_type.type != old_kind:
+            BalanceService.apply_type_change(db, type_id, old_kind, db_transaction_type.type)
+            MonthlyBalanceService.apply_type_change(db, type_id, old_kind, db_transaction_type.type)
+        
+        TableVersionService.bump(db, TRANSACTION_TYPES)
+        db.flush()
+        db.refresh(db_transaction_type)
+        publish_event(db, "transaction_type.updated", {
+            "transaction_type": TransactionTypeResponse.model_validate(db_transaction_type).model_dump(mode="json"),
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
         db.commit()
         db.refresh(db_transaction_type)
         return db_transaction_type
@@ -63,6 +103,46 @@ class TransactionTypeService:
         if not db_transaction_type:
             return False
         
+        BalanceService.apply_type_change(db, type_id, db_transaction_type.type, None)
+        MonthlyBalanceService.apply_type_change(db, type_id, db_transaction_type.type, None)
         db.delete(db_transaction_type)
+        TableVersionService.bump(db, TRANSACTION_TYPES, TRANSACTIONS)
+        publish_event(db, "transaction_type.deleted", {
+            "id": type_id,
+            "outstanding_total": BalanceService.get_outstanding_total(db),
+        })
         db.commit()
         return True
+
+
+class AsyncTransactionTypeService:
+    """
+    Async variant of TransactionTypeService for async routes.
+    Runs the same logic through AsyncSession.run_sync, so DB I/O is awaited
+    instead of blocking the event loop.
+    """
+    
+    @staticmethod
+    async def create_transaction_type(db: AsyncSession, transaction_type: TransactionTypeCreate) -> TransactionType:
+        """Create a new transaction type"""
+        return await db.run_sync(TransactionTypeService.create_transaction_type, transaction_type)
+    
+    @staticmethod
+    async def get_transaction_type(db: AsyncSession, type_id: int) -> Optional[TransactionType]:
+        """Get a transaction type by ID"""
+        return await db.run_sync(TransactionTypeService.get_transaction_type, type_id)
+    
+    @staticmethod
+    async def get_all_transaction_types(db: AsyncSession) -> List[TransactionType]:
+        """Get all transaction types"""
+        return await db.run_sync(TransactionTypeService.get_all_transaction_types)
+    
+    @staticmethod
+    async def update_transaction_type(db: AsyncSession, type_id: int, type_update: TransactionTypeUpdate) -> Optional[TransactionType]:
+        """Update a transaction type"""
+        return await db.run_sync(TransactionTypeService.update_transaction_type, type_id, type_update)
+    
+    @staticmethod
+    async def delete_transaction_type(db: AsyncSession, type_id: int) -> bool:
+        """Delete a transaction type (cascades to transactions)"""
+        return await db.run_sync(TransactionTypeService.delete_transaction_type, type_id)
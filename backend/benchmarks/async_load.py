@@ -0,0 +1,103 @@
+"""
+Mixed read/write load test for the async DB path.
+
+Every SQL statement is delayed by --db-latency-ms inside the thread that executes it
+(the threadpool for sync routes, the aiosqlite worker for async ones), emulating a
+remote database. While writers and readers run, a probe hits GET /health; if any
+route blocked the event loop on the DB, the probe's p99 would track the DB latency.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_load --db-latency-ms 50 --seconds 10
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date
+from benchmarks.common import add_latency, bootstrap_database, percentile, use_temp_database
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.db.database import SessionLocal, engine
+    from app.db.async_database import async_engine
+    from app.models.party import Party
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    
+    bootstrap_database()
+    db = SessionLocal()
+    party = Party(name="Load Party")
+    transaction_type = TransactionType(note="Load", type="add")
+    db.add_all([party, transaction_type])
+    db.commit()
+    party_id, type_id = party.id, transaction_type.id
+    BalanceService.ensure_party(db, party_id)
+    db.commit()
+    db.close()
+    
+    latency = args.db_latency_ms / 1000
+    add_latency(engine, latency)
+    add_latency(async_engine.sync_engine, latency)
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        timings = {"POST /transactions/": [], "GET /parties/": [], "GET /health": []}
+        failures = 0
+        deadline = time.perf_counter() + args.seconds
+        
+        async def timed(name, coro):
+            nonlocal failures
+            started = time.perf_counter()
+            response = await coro
+            timings[name].append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                failures += 1
+        
+        async def writer():
+            while time.perf_counter() < deadline:
+                await timed("POST /transactions/", client.post("/api/v1/transactions/", headers=headers, json={
+                    "date": date.today().isoformat(), "party_id": party_id, "type_id": type_id, "amount": 1,
+                }))
+        
+        async def reader():
+            while time.perf_counter() < deadline:
+                await timed("GET /parties/", client.get("/api/v1/parties/", headers=headers))
+        
+        async def probe():
+            while time.perf_counter() < deadline:
+                await timed("GET /health", client.get("/health"))
+                await asyncio.sleep(0.01)
+        
+        await asyncio.gather(
+            *(writer() for _ in range(args.writers)),
+            *(reader() for _ in range(args.readers)),
+            probe(),
+        )
+    
+    print(f"db_latency={args.db_latency_ms}ms writers={args.writers} readers={args.readers} failures={failures}")
+    for name, samples in timings.items():
+        print(f"  {name:22s} n={len(samples):5d} p50={percentile(samples, 50):8.1f}ms "
+              f"p95={percentile(samples, 95):8.1f}ms p99={percentile(samples, 99):8.1f}ms")
+    probe_p99 = percentile(timings["GET /health"], 99)
+    ok = failures == 0 and probe_p99 < args.db_latency_ms
+    print("PASS" if ok else f"FAIL (GET /health p99 {probe_p99:.1f}ms tracks DB latency)")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Mixed read/write load test for the async DB path")
+    parser.add_argument("--writers", type=int, default=2, help="Concurrent writer tasks (SQLite serializes writes)")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent reader tasks")
+    parser.add_argument("--seconds", type=float, default=10, help="Test duration")
+    parser.add_argument("--db-latency-ms", type=float, default=50, help="Delay added to every SQL statement")
+    args = parser.parse_args()
+    use_temp_database("async_load.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
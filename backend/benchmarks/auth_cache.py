@@ -0,0 +1,79 @@
+"""
+Requests/sec for GET /api/v1/parties/ with and without the in-process auth cache.
+
+Usage (from the backend directory):
+    python -m benchmarks.auth_cache --requests 2000 --db-latency-ms 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+from benchmarks.common import add_latency, bootstrap_database, percentile, use_temp_database
+
+
+async def measure(client, headers, requests, concurrency):
+    """Issue requests GET /parties/ calls with the given concurrency; return (req/s, latencies ms)"""
+    latencies = []
+    remaining = iter(range(requests))
+    
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get("/api/v1/parties/", headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.core.config import settings
+    from app.core.auth_cache import token_cache, admin_cache
+    from app.db.database import SessionLocal, engine
+    from app.db.async_database import async_engine
+    from app.models.party import Party
+    
+    bootstrap_database()
+    db = SessionLocal()
+    db.add_all([Party(name=f"Party {i}") for i in range(20)])
+    db.commit()
+    db.close()
+    if args.db_latency_ms:
+        add_latency(engine, args.db_latency_ms / 1000)
+        add_latency(async_engine.sync_engine, args.db_latency_ms / 1000)
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        results = {}
+        for enabled in (False, True):
+            settings.AUTH_CACHE_ENABLED = enabled
+            token_cache.clear()
+            admin_cache.clear()
+            await measure(client, headers, 50, args.concurrency)  # warm up
+            results[enabled] = await measure(client, headers, args.requests, args.concurrency)
+    
+    for enabled, (rate, latencies) in results.items():
+        print(f"auth cache {'on ' if enabled else 'off'}: {rate:8.1f} req/s "
+              f"p50={percentile(latencies, 50):6.1f}ms p99={percentile(latencies, 99):6.1f}ms")
+    print(f"speedup: {results[True][0] / results[False][0]:.2f}x")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Auth cache throughput benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Delay added to every SQL statement")
+    args = parser.parse_args()
+    use_temp_database("auth_cache.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Point-in-time outstanding totals: monthly checkpoints vs. scanning transactions.
+
+Seeds --parties parties and --transactions transactions, then computes the total
+up to a spread of dates (unfiltered, by party filter and by party ids) both with
+MonthlyBalanceService.outstanding_total_at and with the plain SUM over every
+transaction up to the date, and fails if any pair differs. Back-dated creates,
+edits and deletes and a type flip go through the service layer in between, and the
+checkpoints must still match the raw aggregates afterwards. Prints the p50 of both
+forms per filter.
+
+Usage (from the backend directory):
+    python -m benchmarks.balance_checkpoints --parties 2000 --transactions 500000
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+START = date(2020, 1, 1)
+DAYS = 1500
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Monthly checkpoint totals vs. transaction scans")
+    parser.add_argument("--parties", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--dates", type=int, default=25, help="Dates to total up to, per filter")
+    args = parser.parse_args()
+    use_temp_database("balance_checkpoints.db")
+    # The scans being compared against are slow queries by design
+    logging.getLogger("app.db.query_stats").setLevel(logging.ERROR)
+
+    from sqlalchemy import case, func
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.schemas.transaction import TransactionCreate, TransactionUpdate
+    from app.schemas.transaction_type import TransactionTypeUpdate
+    from app.services.balance_service import BalanceService
+    from app.services.monthly_balance_service import MonthlyBalanceService
+    from app.services.party_search_service import PartySearchService
+    from app.services.serial_allocator import SerialAllocator
+    from app.services.transaction_service import TransactionService
+    from app.services.transaction_type_service import TransactionTypeService
+
+    bootstrap_database()
+    rng = random.Random(25)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n:05d} Traders"} for n in range(args.parties)])
+    db.bulk_insert_mappings(TransactionType, [
+        {"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}, {"note": "misc", "type": "add"},
+    ])
+    db.commit()
+    db.bulk_insert_mappings(Transaction, [
+        {
+            "serial_number": n + 1, "date": START + timedelta(days=rng.randrange(DAYS)),
+            "party_id": rng.randint(1, args.parties), "type_id": rng.randint(1, 3), "amount": rng.randint(1, 1000),
+        }
+        for n in range(args.transactions)
+    ])
+    db.commit()
+    BalanceService.rebuild(db)
+    MonthlyBalanceService.rebuild(db)
+    db.commit()
+    SerialAllocator.initialize(db)
+
+    def scan_total(date_end, party_filter=None, party_ids=None):
+        """The total as computed before the checkpoints: one SUM over every matching transaction"""
+        signed_amount = case(
+            (TransactionType.type == "add", Transaction.amount),
+            (TransactionType.type == "reduce", -Transaction.amount),
+            else_=0,
+        )
+        q = db.query(func.coalesce(func.sum(signed_amount), 0)).select_from(Transaction).join(TransactionType)
+        condition = PartySearchService.party_condition(db, Transaction.party_id, party_filter, party_ids)
+        if condition is not None:
+            q = q.filter(condition)
+        return int(q.filter(Transaction.date <= date_end).scalar() or 0)
+
+    filters = {
+        "all parties": {},
+        "party_filter": {"party_filter": "party 001"},
+        "party_ids": {"party_ids": [1, 2, 3]},
+    }
+    dates = [START - timedelta(days=10)] + sorted(
+        START + timedelta(days=rng.randrange(DAYS + 30)) for _ in range(args.dates - 1)
+    )
+    failures = []
+
+    def compare(stage):
+        db.expire_all()
+        for label, kwargs in filters.items():
+            for date_end in dates:
+                expected = scan_total(date_end, **kwargs)
+                actual = MonthlyBalanceService.outstanding_total_at(db, date_end, **kwargs)
+                if actual != expected:
+                    failures.append(f"{stage}, {label}, {date_end}: checkpoints {actual}, scan {expected}")
+        mismatches = MonthlyBalanceService.find_mismatches(db)
+        if mismatches:
+            failures.append(f"{stage}: {len(mismatches)} checkpoints differ from the raw aggregates")
+
+    compare("seeded")
+    for _ in range(20):
+        TransactionService.create_transaction(db, TransactionCreate(
+            date=START + timedelta(days=rng.randrange(DAYS)), party_id=rng.randint(1, args.parties),
+            type_id=rng.randint(1, 3), amount=rng.randint(1, 1000),
+        ))
+    for transaction_id in rng.sample(range(1, args.transactions + 1), 40):
+        if rng.random() < 0.5:
+            TransactionService.delete_transaction(db, transaction_id)
+        else:
+            TransactionService.update_transaction(db, transaction_id, TransactionUpdate(
+                date=START + timedelta(days=rng.randrange(DAYS)), party_id=rng.randint(1, 3), amount=rng.randint(1, 1000),
+            ))
+    TransactionTypeService.update_transaction_type(db, 3, TransactionTypeUpdate(type="reduce"))
+    compare("after back-dated writes")
+
+    def timed(fn, kwargs):
+        latencies = []
+        for date_end in dates:
+            started = time.perf_counter()
+            fn(date_end, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return percentile(latencies, 50)
+
+    def checkpoint_total(date_end, **kwargs):
+        return MonthlyBalanceService.outstanding_total_at(db, date_end, **kwargs)
+
+    print(f"parties={args.parties} transactions={args.transactions} dates={len(dates)}")
+    for label, kwargs in filters.items():
+        scan = timed(scan_total, kwargs)
+        checkpoints = timed(checkpoint_total, kwargs)
+        print(f"  {label:14s} scan p50={scan:8.2f}ms  checkpoints p50={checkpoints:8.2f}ms  "
+              f"({scan / max(checkpoints, 1e-6):.1f}x)")
+    db.close()
+    print("PASS" if not failures else "FAIL:\n  " + "\n  ".join(failures))
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Throughput benchmark for the bulk transaction import.
+
+Generates a CSV in memory and feeds it through the same parsing, validation and
+chunked insert path used by POST /api/v1/transactions/bulk.
+
+Usage (from the backend directory):
+    python -m benchmarks.bulk_import --rows 100000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import throughput benchmark")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows to import")
+    parser.add_argument("--parties", type=int, default=500, help="Parties referenced by name")
+    parser.add_argument("--target", type=float, default=10_000, help="Minimum rows/sec to pass")
+    parser.add_argument("--database-url", default=None, help="Database to run against (default: temporary SQLite file)")
+    args = parser.parse_args()
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bulk_import.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+    
+    from app.db.database import SessionLocal, engine
+    from app.db.migrations import MigrationRunner
+    from app.models.party import Party
+    from app.models.transaction_type import TransactionType
+    import app.models.party_balance  # noqa: F401
+    import app.models.serial_counter  # noqa: F401
+    from app.services.balance_service import BalanceService
+    from app.services.serial_allocator import SerialAllocator
+    from app.services.transaction_import_service import TransactionImportService
+    
+    MigrationRunner.upgrade(engine)
+    db = SessionLocal()
+    db.add_all([Party(name=f"Party {i}") for i in range(args.parties)])
+    db.add_all([TransactionType(note="Payment Received", type="add"),
+                TransactionType(note="Expense Paid", type="reduce")])
+    db.commit()
+    BalanceService.rebuild(db)
+    SerialAllocator.initialize(db)
+    
+    rng = random.Random(42)
+    start_date = date(2024, 1, 1)
+    lines = ["date,party,type,amount,transaction_note"]
+    for i in range(args.rows):
+        lines.append(",".join([
+            (start_date + timedelta(days=rng.randrange(365))).isoformat(),
+            f"Party {rng.randrange(args.parties)}",
+            rng.choice(["Payment Received", "Expense Paid"]),
+            str(rng.randint(1, 100_000)),
+            f"Bank line {i}",
+        ]))
+    payload = io.BytesIO("\n".join(lines).encode())
+    
+    started = time.perf_counter()
+    result = TransactionImportService.import_rows(db, TransactionImportService.iter_csv_rows(payload))
+    elapsed = time.perf_counter() - started
+    mismatches = BalanceService.find_mismatches(db)
+    db.close()
+    
+    rate = result["inserted"] / elapsed
+    print(f"rows={args.rows} inserted={result['inserted']} failed={result['failed']} "
+          f"elapsed={elapsed:.2f}s rate={rate:,.0f} rows/s balance_mismatches={len(mismatches)}")
+    ok = result["failed"] == 0 and not mismatches and rate >= args.target
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
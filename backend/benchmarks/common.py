@@ -0,0 +1,59 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import tempfile
+import time
+
+
+def use_temp_database(name: str) -> str:
+    """Point DATABASE_URL at a fresh SQLite file unless one is already configured; call before importing app"""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), name)}")
+    return os.environ["DATABASE_URL"]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def add_latency(engine, seconds):
+    """
+    Delay every statement executed on engine's SQLite connections, inside the thread
+    that runs it (the caller's thread for pysqlite, the worker thread for aiosqlite).
+    """
+    from sqlalchemy import event
+    
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        raw = dbapi_connection
+        # aiosqlite adapter -> aiosqlite.Connection -> sqlite3.Connection
+        if hasattr(raw, "_connection"):
+            raw = raw._connection._conn
+        raw.set_trace_callback(lambda statement: time.sleep(seconds))
+
+
+def bootstrap_database(admin_login: str = "bench", admin_password: str = "bench"):
+    """Create the schema, one admin, and initialize the balance projection, serial allocator and table versions"""
+    from app.db.database import SessionLocal, engine
+    from app.db.migrations import MigrationRunner
+    from app.models.admin import Admin
+    from app.core.security import get_password_hash
+    from app.services.balance_service import BalanceService
+    from app.services.serial_allocator import SerialAllocator
+    from app.services.table_version_service import TableVersionService
+    
+    MigrationRunner.upgrade(engine)
+    db = SessionLocal()
+    try:
+        db.add(Admin(login_id=admin_login, hashed_password=get_password_hash(admin_password)))
+        db.commit()
+        BalanceService.rebuild(db)
+        db.commit()
+        SerialAllocator.initialize(db)
+        TableVersionService.initialize(db)
+    finally:
+        db.close()
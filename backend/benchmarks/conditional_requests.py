@@ -0,0 +1,103 @@
+"""
+SQL statements and latency of conditional GETs (ETag / If-None-Match).
+
+For each list/total endpoint, counts the SQL statements of a full 200 response and
+of a 304 revalidation, with the table versions known in-process (expected: none)
+and right after another worker's write invalidated them (expected: one version
+lookup). Fails if a 304 runs more than that.
+
+Usage (from the backend directory):
+    python -m benchmarks.conditional_requests --transactions 20000 --requests 200
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+ENDPOINTS = [
+    ("/api/v1/transactions/", {"party_filter": "party 1"}),
+    ("/api/v1/transactions/page", {"limit": 50}),
+    ("/api/v1/transactions/outstanding/total", {"date_end": "2023-01-01"}),
+    ("/api/v1/parties/", {}),
+    ("/api/v1/transaction-types/", {}),
+]
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import event
+    from app.main import app
+    from app.db.database import SessionLocal, engine
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    from app.services.monthly_balance_service import MonthlyBalanceService
+    from app.core.reference_cache import reference_cache
+    
+    bootstrap_database()
+    rng = random.Random(5)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n}"} for n in range(200)])
+    db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+    db.commit()
+    db.bulk_insert_mappings(Transaction, [
+        {
+            "serial_number": n + 1, "date": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+            "party_id": rng.randint(1, 200), "type_id": rng.randint(1, 2), "amount": rng.randint(1, 1000),
+        }
+        for n in range(args.transactions)
+    ])
+    db.commit()
+    BalanceService.rebuild(db)
+    MonthlyBalanceService.rebuild(db)
+    db.commit()
+    db.close()
+    
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+    
+    async def request(client, path, params, headers):
+        statements.clear()
+        started = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        return response, len(statements), (time.perf_counter() - started) * 1000
+    
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for path, params in ENDPOINTS:
+            await client.get(path, params=params, headers=headers)  # warm caches
+            response, full_sql, _ = await request(client, path, params, headers)
+            conditional = {**headers, "If-None-Match": response.headers["etag"]}
+            not_modified, warm_sql, _ = await request(client, path, params, conditional)
+            for table in ("parties", "transaction_types", "transactions"):
+                reference_cache.invalidate(table)
+            _, cold_sql, _ = await request(client, path, params, conditional)
+            
+            full_ms = [(await request(client, path, params, headers))[2] for _ in range(args.requests)]
+            cached_ms = [(await request(client, path, params, conditional))[2] for _ in range(args.requests)]
+            ok = not_modified.status_code == 304 and warm_sql == 0 and cold_sql <= 1
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {path:42s} 200: {full_sql} SQL p50={percentile(full_ms, 50):7.2f}ms | "
+                  f"304: {warm_sql} SQL ({cold_sql} after invalidation) p50={percentile(cached_ms, 50):6.2f}ms")
+    print("PASS" if not failures else f"FAIL ({failures} endpoints)")
+    return 0 if not failures else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Conditional GET benchmark")
+    parser.add_argument("--transactions", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and mode")
+    args = parser.parse_args()
+    use_temp_database("conditional_requests.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
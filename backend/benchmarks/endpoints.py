@@ -0,0 +1,302 @@
+"""
+Endpoint benchmark suite and performance gate.
+
+Boots the app in-process (startup and shutdown handlers included) against a fresh
+SQLite database seeded by generate_data.py, then drives the real routes one
+scenario at a time with --concurrency clients: login, party list/search/CRUD, the
+transaction list with every combination of the party and date filters, the page
+and total endpoints, and transaction create/update/delete. The whole sequence
+runs --rounds times and each scenario keeps its best round (lowest latencies,
+highest throughput); interleaving the rounds means a burst of background load
+on a shared machine spoils one round of a scenario rather than all of them. Throughput and
+p50/p95/p99 latency per scenario are written to --output as JSON.
+
+With --baseline the results are compared to a stored run of the same workload:
+the suite fails if a --gate metric of a scenario (by default p50 and p95) grew,
+or its throughput fell, by more than --max-regression percent (latency changes
+under --min-delta-ms are noise and ignored), or if any request failed.
+--update-baseline stores this run as the new baseline. Baselines are
+machine-specific: record and compare them on the same, preferably dedicated,
+runner; on a shared machine raise --requests and --rounds first.
+
+Usage (from the backend directory):
+    python -m benchmarks.endpoints --transactions 100000 --update-baseline --baseline perf/endpoints.json
+    python -m benchmarks.endpoints --transactions 100000 --baseline perf/endpoints.json --max-regression 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from itertools import product
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+# Workload parameters a baseline must match to be comparable
+WORKLOAD_KEYS = ("transactions", "parties", "types", "seed", "concurrency", "requests", "rounds")
+
+LIST_FILTERS = {
+    "party": {"party_filter": "Traders"},
+    "start": {"date_start": "2024-01-01"},
+    "end": {"date_end": "2024-06-30"},
+}
+
+
+def list_scenarios():
+    """GET /transactions/ with every combination of the party and date filters"""
+    scenarios = {}
+    for enabled in product((False, True), repeat=len(LIST_FILTERS)):
+        names = [name for name, on in zip(LIST_FILTERS, enabled) if on]
+        params = {}
+        for name in names:
+            params.update(LIST_FILTERS[name])
+        label = "transactions.list" + ("[" + "+".join(names) + "]" if names else "")
+        scenarios[label] = ("GET", "/api/v1/transactions/", params)
+    return scenarios
+
+
+class Suite:
+    """
+    Scenario runner. A scenario is a request count per round and a step coroutine
+    called with the request's index across all rounds, so create/update/delete
+    chains address the rows created in the matching round.
+    """
+
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.headers = {}
+        self.created_parties = []
+        self.created_transactions = []
+
+    async def request(self, method, url, **kwargs):
+        return await self.client.request(method, url, headers=self.headers, **kwargs)
+
+    def scenarios(self):
+        """name -> (requests, step(index) coroutine)"""
+        requests = self.args.requests
+        scenarios = {
+            "auth.login": (
+                max(requests // 5, 1),
+                lambda n: self.client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"}),
+            ),
+            "parties.list": (requests, lambda n: self.request("GET", "/api/v1/parties/")),
+            "parties.search": (requests, lambda n: self.request(
+                "GET", "/api/v1/parties/search", params={"q": ("Shree", "Steel", "Mumbai", "Gan")[n % 4]},
+            )),
+            "parties.create": (requests, self.create_party),
+            "parties.update": (requests, lambda n: self.request(
+                "PUT", f"/api/v1/parties/{self.created_parties[n]}", json={"location": f"Updated {n}"},
+            )),
+            "parties.get": (requests, lambda n: self.request("GET", f"/api/v1/parties/{n % self.args.parties + 1}")),
+            "parties.balance": (requests, lambda n: self.request(
+                "GET", f"/api/v1/parties/{n % self.args.parties + 1}/balance",
+            )),
+        }
+        for label, (method, url, params) in list_scenarios().items():
+            scenarios[label] = (requests, lambda n, method=method, url=url, params=params: self.request(
+                method, url, params=params,
+            ))
+        scenarios.update({
+            "transactions.list[party_ids]": (requests, lambda n: self.request(
+                "GET", "/api/v1/transactions/", params={"party_ids": [n % self.args.parties + 1, 1]},
+            )),
+            "transactions.list[include]": (requests, lambda n: self.request(
+                "GET", "/api/v1/transactions/", params={"include": "party,type", "date_start": "2024-10-01"},
+            )),
+            "transactions.page": (requests, lambda n: self.request("GET", "/api/v1/transactions/page", params={"limit": 50})),
+            "transactions.page[party]": (requests, lambda n: self.request(
+                "GET", "/api/v1/transactions/page", params={"limit": 50, "party_filter": "Traders"},
+            )),
+            "transactions.total": (requests, lambda n: self.request("GET", "/api/v1/transactions/outstanding/total")),
+            "transactions.total[end]": (requests, lambda n: self.request(
+                "GET", "/api/v1/transactions/outstanding/total", params={"date_end": "2024-06-30"},
+            )),
+            "transactions.total[party+end]": (requests, lambda n: self.request(
+                "GET", "/api/v1/transactions/outstanding/total", params={"party_filter": "Traders", "date_end": "2024-06-30"},
+            )),
+            "transactions.get": (requests, lambda n: self.request("GET", f"/api/v1/transactions/{n * 7 % self.args.transactions + 1}")),
+            "transactions.create": (requests, self.create_transaction),
+            "transactions.update": (requests, lambda n: self.request(
+                "PUT", f"/api/v1/transactions/{self.created_transactions[n]}", json={"amount": 500 + n},
+            )),
+            "transactions.delete": (requests, lambda n: self.request(
+                "DELETE", f"/api/v1/transactions/{self.created_transactions[n]}",
+            )),
+            "parties.delete": (requests, lambda n: self.request("DELETE", f"/api/v1/parties/{self.created_parties[n]}")),
+        })
+        return scenarios
+
+    async def create_party(self, n):
+        response = await self.request("POST", "/api/v1/parties/", json={"name": f"Benchmark Party {n}", "location": "Pune"})
+        if response.status_code == 201:
+            self.created_parties.append(response.json()["id"])
+        return response
+
+    async def create_transaction(self, n):
+        response = await self.request("POST", "/api/v1/transactions/", json={
+            "date": (date(2024, 12, 1) + timedelta(days=n % 28)).isoformat(),
+            "party_id": n % self.args.parties + 1,
+            "type_id": n % self.args.types + 1,
+            "amount": 100 + n,
+            "transaction_note": f"Benchmark {n}",
+        })
+        if response.status_code == 201:
+            self.created_transactions.append(response.json()["id"])
+        return response
+
+    @staticmethod
+    def best(rounds):
+        """Best latencies and throughput over the rounds of one scenario"""
+        return {
+            "requests": sum(stats["requests"] for stats in rounds),
+            "errors": sum(stats["errors"] for stats in rounds),
+            "throughput_rps": max(stats["throughput_rps"] for stats in rounds),
+            **{key: min(stats[key] for stats in rounds) for key in ("p50_ms", "p95_ms", "p99_ms")},
+        }
+
+    async def run_round(self, count, step, first_index):
+        latencies = []
+        errors = 0
+        next_index = first_index
+
+        async def worker():
+            nonlocal errors, next_index
+            while next_index < first_index + count:
+                index = next_index
+                next_index += 1
+                started = time.perf_counter()
+                response = await step(index)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += response.status_code >= 400
+                await response.aread()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - started
+        return {
+            "requests": count,
+            "errors": errors,
+            "throughput_rps": round(count / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+
+def compare(results: dict, baseline: dict, gate: list, max_regression: float, min_delta_ms: float) -> list:
+    """Regressions of the gate metrics of results against baseline, as messages"""
+    regressions = []
+    allowed = max_regression / 100
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        for key in (key for key in gate if key.endswith("_ms")):
+            limit = max(previous[key] * (1 + allowed), previous[key] + min_delta_ms)
+            if current[key] > limit:
+                regressions.append(f"{name} {key} {current[key]:.2f} > {previous[key]:.2f} (+{max_regression:g}%)")
+        if "throughput_rps" in gate and current["throughput_rps"] < previous["throughput_rps"] * (1 - allowed):
+            regressions.append(
+                f"{name} throughput {current['throughput_rps']:.1f} < {previous['throughput_rps']:.1f} req/s (-{max_regression:g}%)"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+
+    results = {
+        "workload": {key: getattr(args, key) for key in WORKLOAD_KEYS},
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "node": platform.node()},
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "endpoints": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            suite = Suite(client, args)
+            token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+            suite.headers = {"Authorization": f"Bearer {token}"}
+            # One untimed request per read route, so caches and indexes are warm
+            for label, (method, url, params) in list_scenarios().items():
+                await suite.request(method, url, params=params)
+            scenarios = {
+                name: scenario for name, scenario in suite.scenarios().items()
+                if not args.only or any(name.startswith(prefix) for prefix in args.only)
+            }
+            rounds = {name: [] for name in scenarios}
+            for round_number in range(args.rounds):
+                for name, (count, step) in scenarios.items():
+                    rounds[name].append(await suite.run_round(count, step, count * round_number))
+            for name in scenarios:
+                stats = results["endpoints"][name] = suite.best(rounds[name])
+                print(f"{name:34s} {stats['throughput_rps']:9.1f} req/s  p50={stats['p50_ms']:8.2f}ms  "
+                      f"p95={stats['p95_ms']:8.2f}ms  p99={stats['p99_ms']:8.2f}ms"
+                      + (f"  {stats['errors']} errors" if stats["errors"] else ""))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Endpoint benchmark suite with a regression gate")
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--parties", type=int, default=2000)
+    parser.add_argument("--types", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario and round (login: a fifth)")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per scenario; the best one is kept")
+    parser.add_argument("--only", nargs="*", help="Run only scenarios starting with these prefixes")
+    parser.add_argument("--output", default="endpoint_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", help="Baseline results file to compare against (or to write)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--gate", nargs="+", default=["p50_ms", "p95_ms"],
+                        choices=["p50_ms", "p95_ms", "p99_ms", "throughput_rps"], help="Metrics compared to the baseline")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed regression, percent")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore latency regressions smaller than this")
+    args = parser.parse_args()
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline")
+
+    database_url = use_temp_database("endpoints.db")
+    bootstrap_database()
+    started = time.perf_counter()
+    subprocess.run([
+        sys.executable, "generate_data.py", "--seed", str(args.seed), "--parties", str(args.parties),
+        "--types", str(args.types), "--transactions", str(args.transactions),
+    ], env={**os.environ, "DATABASE_URL": database_url}, check=True, stdout=subprocess.DEVNULL)
+    print(f"Seeded {args.transactions} transactions in {time.perf_counter() - started:.1f}s")
+
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    failures = [f"{name}: {stats['errors']} failed requests" for name, stats in results["endpoints"].items() if stats["errors"]]
+    if args.baseline and args.update_baseline:
+        if failures:
+            print("Not updating the baseline from a run with failed requests")
+        else:
+            with open(args.baseline, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        if not os.path.exists(args.baseline):
+            failures.append(f"baseline {args.baseline} does not exist (create it with --update-baseline)")
+        else:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            if baseline["workload"] != results["workload"]:
+                failures.append(f"baseline workload {baseline['workload']} differs from this run's {results['workload']}")
+            else:
+                failures.extend(compare(results, baseline, args.gate, args.max_regression, args.min_delta_ms))
+    print("PASS" if not failures else "FAIL:\n  " + "\n  ".join(failures))
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Time and peak memory of GET /transactions/ serialization for many rows.
+
+Compares the response_model path (ORM objects validated into TransactionResponse,
+then dumped) with the row-tuple + orjson fast path, and checks both produce the
+same JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.list_serialization --transactions 100000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, use_temp_database
+
+
+def measure(fn, runs):
+    """Best wall time over runs (ms), then peak traced memory of one more run (MiB)"""
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    body = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 2 ** 20, body
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Transaction list serialization benchmark")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    use_temp_database("list_serialization.db")
+    
+    from typing import List
+    from pydantic import TypeAdapter
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.schemas.transaction import TransactionResponse
+    from app.services.transaction_service import TransactionService, RESPONSE_KEYS
+    from app.core.fast_json import encode_rows
+    
+    bootstrap_database()
+    rng = random.Random(11)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n}"} for n in range(500)])
+    db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+    db.commit()
+    db.bulk_insert_mappings(Transaction, [
+        {
+            "serial_number": n + 1, "date": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+            "party_id": rng.randint(1, 500), "type_id": rng.randint(1, 2), "amount": rng.randint(1, 100_000),
+            "transaction_note": f"Invoice #{n}",
+        }
+        for n in range(args.transactions)
+    ])
+    db.commit()
+    
+    adapter = TypeAdapter(List[TransactionResponse])
+    
+    def response_model_path():
+        db.expunge_all()
+        transactions = TransactionService.get_all_transactions(db)
+        return adapter.dump_json(adapter.validate_python(transactions, from_attributes=True))
+    
+    def fast_path():
+        return encode_rows(RESPONSE_KEYS, TransactionService.get_all_transaction_rows(db))
+    
+    slow_ms, slow_mib, slow_body = measure(response_model_path, args.runs)
+    fast_ms, fast_mib, fast_body = measure(fast_path, args.runs)
+    db.close()
+    
+    same = json.loads(slow_body) == json.loads(fast_body)
+    print(f"transactions={args.transactions} body={len(fast_body) / 2 ** 20:.1f} MiB")
+    print(f"  ORM + response model: {slow_ms:8.1f} ms  peak {slow_mib:7.1f} MiB")
+    print(f"  rows + orjson:        {fast_ms:8.1f} ms  peak {fast_mib:7.1f} MiB")
+    print(f"  speedup {slow_ms / fast_ms:.1f}x, memory {slow_mib / fast_mib:.1f}x less")
+    print("PASS (identical JSON)" if same else "FAIL (JSON differs)")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Login throughput versus concurrent read latency.
+
+Runs a read-only phase (GET /api/v1/parties/) alone, then the same reads while a burst
+of logins hammers POST /api/v1/auth/login, and reports login throughput, 503s from the
+bounded password executor, and read latency percentiles for both phases.
+
+Usage (from the backend directory):
+    python -m benchmarks.login_throughput --logins 8 --seconds 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    
+    bootstrap_database()
+    db = SessionLocal()
+    db.add_all([Party(name=f"Party {i}") for i in range(20)])
+    db.commit()
+    db.close()
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        async def phase(with_logins: bool):
+            deadline = time.perf_counter() + args.seconds
+            reads, logins = [], {"ok": 0, "busy": 0, "latency": []}
+            
+            async def reader():
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.get("/api/v1/parties/", headers=headers)
+                    assert response.status_code == 200, response.text
+                    reads.append((time.perf_counter() - started) * 1000)
+            
+            async def login():
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})
+                    if response.status_code == 200:
+                        logins["ok"] += 1
+                        logins["latency"].append((time.perf_counter() - started) * 1000)
+                    elif response.status_code == 503:
+                        logins["busy"] += 1
+                        await asyncio.sleep(0.05)
+                    else:
+                        raise AssertionError(response.text)
+            
+            tasks = [reader() for _ in range(args.readers)]
+            if with_logins:
+                tasks += [login() for _ in range(args.logins)]
+            await asyncio.gather(*tasks)
+            return reads, logins
+        
+        idle_reads, _ = await phase(False)
+        busy_reads, logins = await phase(True)
+    
+    print(f"readers={args.readers} concurrent_logins={args.logins} seconds={args.seconds}")
+    for label, reads in (("reads alone", idle_reads), ("reads + logins", busy_reads)):
+        print(f"  {label:15s} n={len(reads):5d} p50={percentile(reads, 50):6.1f}ms "
+              f"p95={percentile(reads, 95):6.1f}ms p99={percentile(reads, 99):6.1f}ms")
+    print(f"  logins: {logins['ok'] / args.seconds:.1f}/s ok={logins['ok']} busy(503)={logins['busy']} "
+          f"p50={percentile(logins['latency'], 50):.0f}ms p99={percentile(logins['latency'], 99):.0f}ms")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Login throughput versus concurrent read latency")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent reader tasks")
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent login tasks")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration of each phase")
+    args = parser.parse_args()
+    use_temp_database("login_throughput.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Latency of party-filtered transaction queries: the party name filter resolved to
+party ids first vs. the old join + ILIKE form. The query plans themselves (no scan
+of parties, an index led by party_id) are checked by tests/test_party_filter.py.
+
+Usage (from the backend directory):
+    python -m benchmarks.party_filter_plan --parties 20000 --transactions 200000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Party filter latency")
+    parser.add_argument("--parties", type=int, default=20_000)
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    use_temp_database("party_filter.db")
+    
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    from app.services.transaction_service import TransactionService
+    
+    bootstrap_database()
+    rng = random.Random(3)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n:05d} Traders"} for n in range(args.parties)])
+    db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+    db.commit()
+    start = date(2020, 1, 1)
+    db.bulk_insert_mappings(Transaction, [
+        {
+            "serial_number": n + 1, "date": start + timedelta(days=rng.randrange(1500)),
+            "party_id": rng.randint(1, args.parties), "type_id": rng.randint(1, 2), "amount": rng.randint(1, 1000),
+        }
+        for n in range(args.transactions)
+    ])
+    db.commit()
+    BalanceService.rebuild(db)
+    db.commit()
+    
+    term = "party 0123"
+    ids = [1, 2, 3]
+    
+    def resolved_list():
+        return TransactionService.get_all_transactions(db, term)
+    
+    def ids_list():
+        return TransactionService.get_all_transactions(db, party_ids=ids)
+    
+    def old_list():
+        return (
+            db.query(Transaction).join(Party).filter(Party.name.ilike(f"%{term}%"))
+            .order_by(Transaction.date.desc(), Transaction.serial_number.desc()).all()
+        )
+    
+    def timed(fn):
+        latencies = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - started) * 1000)
+        return percentile(latencies, 50)
+    
+    resolved_list()  # load the party index
+    print(f"parties={args.parties} transactions={args.transactions}")
+    print(f"  list, join + ILIKE:   p50={timed(old_list):8.2f}ms")
+    print(f"  list, resolved ids:   p50={timed(resolved_list):8.2f}ms")
+    print(f"  list, party_ids:      p50={timed(ids_list):8.2f}ms")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Party typeahead search latency with many parties.
+
+Compares the indexed, ranked search (PartySearchService) with the old
+ILIKE '%term%' scan for random fragments of existing names.
+
+Usage (from the backend directory):
+    python -m benchmarks.party_search --parties 100000 --queries 500
+"""
+import argparse
+import random
+import sys
+import time
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+WORDS = [
+    "acme", "traders", "sons", "enterprises", "agency", "steel", "textiles", "foods",
+    "kumar", "sharma", "patel", "global", "industries", "supplies", "motors", "pharma",
+    "bharat", "sri", "lakshmi", "ganesh", "krishna", "metals", "plastics", "electricals",
+]
+
+
+def timed(fn, terms):
+    latencies = []
+    for term in terms:
+        started = time.perf_counter()
+        fn(term)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Party search latency benchmark")
+    parser.add_argument("--parties", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="p99 latency target for the indexed search")
+    args = parser.parse_args()
+    use_temp_database("party_search.db")
+    
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    from app.services.party_service import PartyService
+    from app.services.party_search_service import PartySearchService
+    
+    bootstrap_database()
+    rng = random.Random(7)
+    names = [f"{' '.join(rng.sample(WORDS, rng.randint(1, 3))).title()} {n}" for n in range(args.parties)]
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": name} for name in names])
+    db.commit()
+    
+    terms = []
+    for _ in range(args.queries):
+        name = rng.choice(names).lower()
+        length = rng.randint(1, 8)
+        start = rng.randint(0, max(0, len(name) - length))
+        terms.append(name[start:start + length])
+    
+    started = time.perf_counter()
+    PartySearchService.search(db, "warm", args.limit)
+    print(f"parties={args.parties} queries={args.queries} index_build={(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    indexed = timed(lambda term: PartySearchService.search(db, term, args.limit), terms)
+    scan = timed(lambda term: PartyService.search_parties(db, term)[:args.limit], terms[:50])
+    db.close()
+    
+    for label, latencies in (("indexed", indexed), ("ilike scan", scan)):
+        print(f"  {label:10s} p50={percentile(latencies, 50):7.2f}ms p95={percentile(latencies, 95):7.2f}ms "
+              f"p99={percentile(latencies, 99):7.2f}ms")
+    ok = percentile(indexed, 99) <= args.budget_ms
+    print("PASS" if ok else f"FAIL (p99 above {args.budget_ms}ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Connection pool behaviour under concurrent load, for tuning the DB_POOL_* settings.
+
+Runs --concurrency clients against GET /transactions/{id} and
+GET /transactions/outstanding/total with every SQL statement delayed by
+--db-latency-ms. Prints request latency and, per engine, the pool stats:
+peak checked-out connections, checkout time, timeouts and connection churn.
+Pool options are passed as arguments (they become the DB_POOL_* settings), so
+configurations can be compared run by run, e.g. the ping cost of
+--pre-ping always against idle.
+
+Usage (from the backend directory):
+    python -m benchmarks.pool_load --concurrency 50 --pool-size 5 --max-overflow 10 --pre-ping idle
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date
+from benchmarks.common import add_latency, bootstrap_database, percentile, use_temp_database
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.db.database import SessionLocal, engine
+    from app.db.async_database import async_engine
+    from app.db.pool import pool_stats
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+
+    latency = args.db_latency_ms / 1000
+    add_latency(engine, latency)
+    add_latency(async_engine.sync_engine, latency)
+    bootstrap_database()
+    db = SessionLocal()
+    db.add_all([Party(name="Pool Party"), TransactionType(note="in", type="add")])
+    db.commit()
+    db.bulk_insert_mappings(Transaction, [
+        {"serial_number": n + 1, "date": date(2024, 1, 1), "party_id": 1, "type_id": 1, "amount": 10}
+        for n in range(100)
+    ])
+    db.commit()
+    BalanceService.rebuild(db)
+    db.commit()
+    db.close()
+    for stats in pool_stats.values():
+        stats.reset()
+
+    routes = {"item": "/api/v1/transactions/{n}", "total": "/api/v1/transactions/outstanding/total"}
+    timings = {name: [] for name in routes}
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def worker(index):
+            nonlocal failures
+            for n in range(args.requests):
+                name = "item" if (index + n) % 2 else "total"
+                started = time.perf_counter()
+                response = await client.get(routes[name].format(n=n % 100 + 1), headers=headers)
+                timings[name].append((time.perf_counter() - started) * 1000)
+                failures += response.status_code >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in timings.values())
+    print(f"pool_size={args.pool_size} max_overflow={args.max_overflow} pre_ping={args.pre_ping} "
+          f"concurrency={args.concurrency} db_latency={args.db_latency_ms}ms")
+    print(f"{total / elapsed:8.1f} req/s, {failures} failed")
+    for name, samples in timings.items():
+        print(f"  {name:5s} p50={percentile(samples, 50):8.1f}ms p99={percentile(samples, 99):8.1f}ms")
+    for name, stats in pool_stats.items():
+        snapshot = stats.snapshot()
+        print(f"  pool {name:5s} peak={snapshot['peak_checked_out']:3d} checkout avg={snapshot['checkout_ms_avg']:7.2f}ms "
+              f"max={snapshot['checkout_ms_max']:8.2f}ms timeouts={snapshot['timeouts']} "
+              f"opened={snapshot['connections_opened']} closed={snapshot['connections_closed']} "
+              f"pre_pings={snapshot['pre_pings']}")
+        if args.verbose:
+            print(json.dumps(snapshot["checkout_ms_buckets"]))
+    return 0 if not failures else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Connection pool load test")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument("--pre-ping", choices=["always", "idle", "never"], default="idle")
+    parser.add_argument("--verbose", action="store_true", help="Print checkout time histograms")
+    args = parser.parse_args()
+    # Settings are read when the app is imported
+    os.environ.update({
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_POOL_MAX_OVERFLOW": str(args.max_overflow),
+        "DB_POOL_TIMEOUT_SECONDS": str(args.pool_timeout),
+        "DB_POOL_PRE_PING": args.pre_ping,
+        "DB_POOL_PRE_PING_IDLE_SECONDS": "30",
+    })
+    use_temp_database("pool_load.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
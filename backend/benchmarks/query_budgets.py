@@ -0,0 +1,121 @@
+"""
+SQL statement budgets per route, read from the X-DB-Queries debug header.
+
+Seeds --parties parties and --transactions transactions, sends one request per
+route to warm the per-worker caches, then requests every route in BUDGETS and
+fails if one runs more statements than its budget or trips the N+1 detector
+(DB_N_PLUS_ONE_THRESHOLD). Budgets are for the steady state and do not depend on
+the number of rows, so a route that starts loading relationships per row fails
+here long before it is slow.
+
+Usage (from the backend directory):
+    python -m benchmarks.query_budgets --transactions 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, use_temp_database
+
+# name -> (path, query parameters, max statements)
+BUDGETS = {
+    "get_all_transactions": ("/api/v1/transactions/", {}, 1),
+    "get_all_transactions include": ("/api/v1/transactions/", {"include": "party,type"}, 1),
+    "get_all_transactions filtered": ("/api/v1/transactions/", {"party_filter": "party 1", "date_start": "2021-01-01"}, 1),
+    "get_transactions_page": ("/api/v1/transactions/page", {"limit": 50}, 1),
+    "get_outstanding_total": ("/api/v1/transactions/outstanding/total", {}, 1),
+    "get_outstanding_total by date": ("/api/v1/transactions/outstanding/total", {"date_end": "2022-01-01"}, 1),
+    "get_transaction": ("/api/v1/transactions/1", {"include": "party,type"}, 1),
+    "get_all_parties": ("/api/v1/parties/", {}, 0),
+    "get_party": ("/api/v1/parties/1", {}, 1),
+    "get_party_balance": ("/api/v1/parties/1/balance", {}, 1),
+    "get_all_transaction_types": ("/api/v1/transaction-types/", {}, 0),
+}
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def check_budget(response, budget: int) -> str:
+    """Error message if the response ran more SQL statements than budget, else an empty string"""
+    statements = int(response.headers["X-DB-Queries"])
+    if response.status_code != 200:
+        return f"status {response.status_code}"
+    if statements > budget:
+        return f"{statements} statements, budget {budget}"
+    return ""
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.db.database import SessionLocal
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    from app.services.monthly_balance_service import MonthlyBalanceService
+
+    bootstrap_database()
+    rng = random.Random(22)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n}"} for n in range(args.parties)])
+    db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+    db.commit()
+    db.bulk_insert_mappings(Transaction, [
+        {
+            "serial_number": n + 1, "date": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+            "party_id": rng.randint(1, args.parties), "type_id": rng.randint(1, 2), "amount": rng.randint(1, 1000),
+        }
+        for n in range(args.transactions)
+    ])
+    db.commit()
+    BalanceService.rebuild(db)
+    MonthlyBalanceService.rebuild(db)
+    db.commit()
+    db.close()
+
+    records = _Records()
+    logging.getLogger("app").addHandler(records)
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for path, params, _ in BUDGETS.values():
+            await client.get(path, params=params, headers=headers)
+        records.messages.clear()
+        for name, (path, params, budget) in BUDGETS.items():
+            response = await client.get(path, params=params, headers=headers)
+            error = check_budget(response, budget)
+            print(f"{name:32s} {response.headers['X-DB-Queries']:>3s} statements (budget {budget}) "
+                  f"{float(response.headers['X-DB-Time']):7.2f}ms  {error or 'ok'}")
+            if error:
+                failures.append(f"{name}: {error}")
+    failures.extend(records.messages)
+    print("PASS" if not failures else "FAIL:\n  " + "\n  ".join(failures))
+    return 0 if not failures else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQL statement budgets per route")
+    parser.add_argument("--parties", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=2000)
+    args = parser.parse_args()
+    # Settings are read when the app is imported
+    os.environ["DB_DEBUG_HEADERS"] = "true"
+    use_temp_database("query_budgets.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Cold start time: import of app.main plus the first request, in fresh processes.
+
+Each run starts a new interpreter that imports the app, runs the startup handlers,
+serves GET /health and then polls GET /ready until the pool is warm. With
+--db-connect-delay-ms every new DB connection is slowed down, which must delay
+/ready but not startup or /health. Fails if importing the app created an engine or
+loaded a DB driver, if /health waited for the database, or if import plus first
+request exceeds --budget-ms.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup_time --runs 5 --db-connect-delay-ms 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from benchmarks.common import bootstrap_database, percentile, use_temp_database
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+import app.db.database as database
+import app.db.async_database as async_database
+lazy = database._engine is None and async_database._async_engine is None
+drivers = sorted(name for name in ("sqlite3", "aiosqlite", "psycopg2", "asyncpg") if name in sys.modules)
+
+delay = float(sys.argv[1])
+if delay:
+    from sqlalchemy import event
+    event.listen(database.get_engine(), "connect", lambda *args: time.sleep(delay))
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    started_up = time.perf_counter()
+    health = client.get("/health").status_code
+    first_response = time.perf_counter()
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.01)
+    ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (started_up - imported) * 1000,
+    "first_request_ms": (first_response - started) * 1000,
+    "ready_ms": (ready - started) * 1000,
+    "health": health, "lazy": lazy, "drivers": drivers,
+}))
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db-connect-delay-ms", type=float, default=0)
+    parser.add_argument("--budget-ms", type=float, default=3000, help="Max median import + first request")
+    args = parser.parse_args()
+    use_temp_database("startup_time.db")
+    bootstrap_database()
+
+    env = {**os.environ, "MIGRATE_ON_STARTUP": "false", "EVENT_BUS_BACKEND": "memory"}
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, str(args.db_connect_delay_ms / 1000)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for key in ("import_ms", "startup_ms", "first_request_ms", "ready_ms"):
+        samples = [result[key] for result in results]
+        print(f"{key:18s} p50={percentile(samples, 50):8.1f}ms  max={max(samples):8.1f}ms")
+
+    failures = []
+    if not all(result["lazy"] for result in results):
+        failures.append("importing app.main created a database engine")
+    if any(result["drivers"] for result in results):
+        failures.append(f"importing app.main loaded DB drivers {results[0]['drivers']}")
+    if any(result["health"] != 200 for result in results):
+        failures.append("/health did not answer 200")
+    first_request = percentile([result["first_request_ms"] for result in results], 50)
+    if first_request > args.budget_ms:
+        failures.append(f"import + first request {first_request:.0f}ms over budget {args.budget_ms:.0f}ms")
+    if args.db_connect_delay_ms and first_request - percentile([r["import_ms"] for r in results], 50) >= args.db_connect_delay_ms:
+        failures.append("startup or /health waited for the database")
+    print("PASS" if not failures else "FAIL: " + "; ".join(failures))
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+SQL statements per request for transactions with embedded relations (?include=party,type).
+
+Counts the statements of the list and detail endpoints with and without include, at
+two data sizes. Embedding must not add statements, and the count must not grow
+with the number of rows (no per-row lazy loads); the script fails otherwise.
+
+Usage (from the backend directory):
+    python -m benchmarks.transaction_relations --transactions 10000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+from benchmarks.common import bootstrap_database, use_temp_database
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import event
+    from app.main import app
+    from app.db.database import SessionLocal, engine
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    from app.core.reference_cache import reference_cache
+
+    bootstrap_database()
+    rng = random.Random(17)
+    db = SessionLocal()
+    db.bulk_insert_mappings(Party, [{"name": f"Party {n}", "location": "City"} for n in range(500)])
+    db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+    db.commit()
+    db.close()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    async def count(client, path, params, headers):
+        # Forget known table versions so every request does the same version lookups
+        for table in ("parties", "transaction_types", "transactions"):
+            reference_cache.invalidate(table)
+        statements.clear()
+        started = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        return len(statements), (time.perf_counter() - started) * 1000, response.json()
+
+    results = {}
+    inserted = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", json={"login_id": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for size in (args.transactions // 10, args.transactions):
+            db = SessionLocal()
+            db.bulk_insert_mappings(Transaction, [
+                {
+                    "serial_number": inserted + n + 1,
+                    "date": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+                    "party_id": rng.randint(1, 500), "type_id": rng.randint(1, 2), "amount": rng.randint(1, 1000),
+                }
+                for n in range(size - inserted)
+            ])
+            db.commit()
+            BalanceService.rebuild(db)
+            db.commit()
+            db.close()
+            inserted = size
+
+            for label, path, params in [
+                ("list", "/api/v1/transactions/", {}),
+                ("list include", "/api/v1/transactions/", {"include": "party,type"}),
+                ("detail", "/api/v1/transactions/1", {}),
+                ("detail include", "/api/v1/transactions/1", {"include": "party,type"}),
+            ]:
+                await count(client, path, params, headers)  # warm caches
+                sql, ms, body = await count(client, path, params, headers)
+                rows = len(body) if isinstance(body, list) else 1
+                results[(label, size)] = sql
+                print(f"{label:15s} rows={rows:7d} SQL={sql:3d} {ms:9.1f}ms")
+
+    failures = []
+    small, large = args.transactions // 10, args.transactions
+    for label in ("list", "detail"):
+        if results[(f"{label} include", large)] != results[(label, large)]:
+            failures.append(f"{label}: include adds statements")
+        if results[(f"{label} include", large)] != results[(f"{label} include", small)]:
+            failures.append(f"{label}: statements grow with rows")
+    print("PASS" if not failures else "FAIL: " + "; ".join(failures))
+    return 0 if not failures else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Embedded relations query-count check")
+    parser.add_argument("--transactions", type=int, default=10_000)
+    args = parser.parse_args()
+    use_temp_database("transaction_relations.db")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+WebSocket broadcast fan-out benchmark.
+
+Connects in-process fake sockets to a ConnectionManager, a fraction of them slow,
+broadcasts a series of messages and reports delivery latency percentiles for fast
+and slow clients. The same workload is also run through a sequential
+"await send on each socket" loop for comparison.
+
+Usage (from the backend directory):
+    python -m benchmarks.ws_fanout --clients 5000 --messages 20 --slow-fraction 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from benchmarks.common import percentile
+
+
+class FakeWebSocket:
+    """Minimal stand-in for starlette's WebSocket that records delivery latency"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies = []
+        self.resyncs = 0
+        self.closed = False
+    
+    async def accept(self):
+        pass
+    
+    async def send_bytes(self, payload: bytes):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        message = json.loads(payload)
+        if message["type"] == "resync":
+            self.resyncs += 1
+        else:
+            self.latencies.append((time.perf_counter() - message["data"]["sent_at"]) * 1000)
+    
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def report(label, sockets, messages):
+    fast = [l for s in sockets if not s.delay for l in s.latencies]
+    slow = [l for s in sockets if s.delay for l in s.latencies]
+    delivered = sum(len(s.latencies) for s in sockets)
+    print(f"{label}: delivered={delivered}/{len(sockets) * messages} "
+          f"resyncs={sum(s.resyncs for s in sockets)} evicted={sum(s.closed for s in sockets)}")
+    for name, samples in (("fast clients", fast), ("slow clients", slow)):
+        if samples:
+            print(f"  {name:12s} p50={percentile(samples, 50):8.2f}ms p95={percentile(samples, 95):8.2f}ms "
+                  f"p99={percentile(samples, 99):8.2f}ms max={max(samples):8.2f}ms")
+
+
+async def run(args):
+    from app.core.websocket_manager import ConnectionManager
+    
+    rng = random.Random(7)
+    delays = [args.slow_delay_ms / 1000 if rng.random() < args.slow_fraction else 0 for _ in range(args.clients)]
+    
+    # Per-client queues (current manager)
+    manager = ConnectionManager(queue_size=args.queue_size, overflow_policy=args.overflow_policy)
+    sockets = [FakeWebSocket(delay) for delay in delays]
+    for socket in sockets:
+        await manager.connect(socket)
+    started = time.perf_counter()
+    for i in range(args.messages):
+        await manager.broadcast_update("transaction.created", {"n": i, "sent_at": time.perf_counter()})
+        await asyncio.sleep(args.interval_ms / 1000)
+    broadcast_time = time.perf_counter() - started
+    await asyncio.sleep(args.slow_delay_ms / 1000 * (args.queue_size + 2))
+    report(f"queued fan-out ({broadcast_time * 1000:.0f}ms to broadcast)", sockets, args.messages)
+    for socket in sockets:
+        manager.disconnect(socket)
+    
+    # Sequential await-per-socket broadcast (previous behaviour)
+    sockets = [FakeWebSocket(delay) for delay in delays]
+    started = time.perf_counter()
+    for i in range(args.messages):
+        message = {"type": "transaction.created", "data": {"n": i, "sent_at": time.perf_counter()}}
+        for socket in sockets:
+            await socket.send_bytes(json.dumps(message).encode())
+        await asyncio.sleep(args.interval_ms / 1000)
+    report(f"sequential broadcast ({(time.perf_counter() - started) * 1000:.0f}ms to broadcast)", sockets, args.messages)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="WebSocket fan-out latency benchmark")
+    parser.add_argument("--clients", type=int, default=5000, help="Fake connected clients")
+    parser.add_argument("--messages", type=int, default=20, help="Broadcasts to send")
+    parser.add_argument("--interval-ms", type=float, default=10, help="Pause between broadcasts")
+    parser.add_argument("--slow-fraction", type=float, default=0.01, help="Fraction of slow clients")
+    parser.add_argument("--slow-delay-ms", type=float, default=20, help="Per-send delay of a slow client")
+    parser.add_argument("--queue-size", type=int, default=8, help="Per-client send queue length")
+    parser.add_argument("--overflow-policy", choices=["resync", "evict"], default="resync")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
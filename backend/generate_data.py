@@ -0,0 +1,259 @@
+"""
+Generate a reproducible, production-sized synthetic ledger.
+
+Appends parties, transaction types and transactions to the configured database
+(DATABASE_URL) with skewed, realistic distributions: a few hot parties carry most
+of the transactions (Zipf), volume clusters on weekdays, month ends and the
+festive season and grows over the date range, and amounts are log-normal.
+Transactions are generated day by day and take their serial numbers from the
+serial allocator, so serial order follows date order, exactly as when they are
+entered through the app. Rows go in with bulk Core inserts, one commit per batch;
+the party balances and monthly checkpoints are rebuilt at the end.
+
+The same --seed and counts on an empty database produce the same data. Existing
+data is kept unless --wipe is given.
+
+Usage:
+    python generate_data.py --seed 42 --parties 50000 --transactions 5000000 --types 200
+    python generate_data.py --wipe --seed 7 --parties 1000 --transactions 100000
+"""
+import argparse
+import bisect
+import calendar
+import logging
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import func, insert, select, text
+from app.db.database import SessionLocal, engine
+from app.db.migrations import MigrationRunner
+from app.models.party import Party
+from app.models.party_balance import PartyBalance
+from app.models.party_monthly_balance import PartyMonthlyBalance
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+from app.services.serial_allocator import SerialAllocator
+from app.services.table_version_service import TableVersionService, PARTIES, TRANSACTION_TYPES, TRANSACTIONS
+
+NAME_PREFIXES = [
+    "Shree", "Sri", "New", "Royal", "Global", "National", "Om", "Sai", "Jai", "Laxmi", "Ganesh",
+    "Krishna", "Balaji", "Bharat", "Metro", "City", "Star", "Golden", "Supreme", "United", "Classic",
+    "Modern", "Prime", "Apex", "Vijay", "Mahalaxmi", "Annapurna", "Tirupati", "Hari", "Ambika",
+]
+NAME_CORES = [
+    "Textiles", "Traders", "Enterprises", "Steel", "Hardware", "Electricals", "Pharma", "Agencies",
+    "Foods", "Motors", "Plastics", "Paper", "Chemicals", "Garments", "Jewellers", "Furniture",
+    "Cement", "Builders", "Logistics", "Spices", "Dairy", "Auto Parts", "Medicals", "Stationers",
+    "Tiles", "Paints", "Timber", "Glass", "Grains", "Fabrics", "Tools", "Electronics", "Optics",
+    "Sweets", "Oils", "Packaging", "Printers", "Distributors", "Exports", "Imports",
+]
+NAME_SUFFIXES = ["", "Pvt Ltd", "Ltd", "& Co", "& Sons", "Brothers", "Corporation", "Industries", "LLP", "Agency"]
+LOCATIONS = [
+    "Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata", "Hyderabad", "Pune", "Ahmedabad", "Surat",
+    "Jaipur", "Lucknow", "Kanpur", "Nagpur", "Indore", "Bhopal", "Vadodara", "Ludhiana", "Coimbatore",
+    "Kochi", "Nashik", "Rajkot", "Agra", "Varanasi", "Patna", "Guwahati",
+]
+ADD_NOTES = [
+    "Payment Received", "Invoice Payment", "Advance Payment", "Cash Deposit", "Cheque Received",
+    "UPI Received", "NEFT Received", "RTGS Received", "Credit Note", "Sales",
+]
+REDUCE_NOTES = [
+    "Expense Paid", "Refund Issued", "Service Charge", "Goods Purchased", "Freight", "Commission",
+    "Discount Allowed", "Bank Charges", "Debit Note", "Purchase Return",
+]
+TRANSACTION_NOTES = ["Invoice #{n}", "Bill {n}", "Cheque {n}", "Order {n}", "Monthly payment", "Balance settlement"]
+
+# Share of the transaction types that are "add"; the rest are "reduce"
+ADD_TYPE_SHARE = 0.6
+# Zipf exponents: a higher value concentrates more transactions on the top parties and types
+PARTY_SKEW = 1.1
+TYPE_SKEW = 1.0
+# Share of transactions that carry a note
+NOTE_SHARE = 0.4
+
+
+def zipf_cum_weights(count: int, skew: float, rng: random.Random) -> List[float]:
+    """Cumulative Zipf weights, with the ranks shuffled so the hot items are spread over the ids"""
+    weights = [1 / (rank ** skew) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def day_weight(day: date, position: float, rng: random.Random) -> float:
+    """Relative transaction volume of a day; position runs from 0 (first day) to 1 (last day)"""
+    weight = 1 + position  # business grows over the range
+    weight *= (1.0, 1.0, 1.0, 1.0, 1.1, 0.6, 0.15)[day.weekday()]
+    days_in_month = calendar.monthrange(day.year, day.month)[1]
+    if day.day > days_in_month - 3:
+        weight *= 2.5  # month-end settlements
+    elif day.day == 1:
+        weight *= 1.5
+    if day.month in (10, 11):
+        weight *= 1.4  # festive season
+    return weight * rng.uniform(0.7, 1.3)
+
+
+def daily_counts(total: int, start: date, end: date, rng: random.Random) -> List[int]:
+    """Split total transactions over the days from start to end (inclusive) by day_weight"""
+    days = (end - start).days + 1
+    weights = [day_weight(start + timedelta(days=n), n / max(days - 1, 1), rng) for n in range(days)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Hand out the rounding remainder to the days with the largest fractional parts
+    remainder = total - sum(counts)
+    by_fraction = sorted(range(days), key=lambda n: weights[n] * scale - counts[n], reverse=True)
+    for n in by_fraction[:remainder]:
+        counts[n] += 1
+    return counts
+
+
+def party_rows(count: int, existing_names: set, rng: random.Random) -> List[dict]:
+    rows = []
+    for n in range(count):
+        location = rng.choice(LOCATIONS)
+        name = " ".join(filter(None, [rng.choice(NAME_PREFIXES), rng.choice(NAME_CORES), rng.choice(NAME_SUFFIXES)]))
+        if name in existing_names:
+            name = f"{name} {location}"
+        if name in existing_names:
+            name = f"{name} {n + 1}"
+        existing_names.add(name)
+        rows.append({"name": name, "billing_name": name if rng.random() < 0.5 else None, "location": location})
+    return rows
+
+
+def type_rows(count: int) -> List[dict]:
+    rows = []
+    used = {"add": 0, "reduce": 0}
+    for n in range(count):
+        kind = "add" if n % 10 < ADD_TYPE_SHARE * 10 else "reduce"
+        notes = ADD_NOTES if kind == "add" else REDUCE_NOTES
+        index = used[kind]
+        used[kind] += 1
+        note = notes[index % len(notes)]
+        if index >= len(notes):
+            note = f"{note} {index // len(notes) + 1}"
+        rows.append({"note": note, "type": kind})
+    return rows
+
+
+def wipe(db) -> None:
+    """Delete all parties, transaction types, transactions and balances (admins are kept)"""
+    for model in (Transaction, PartyBalance, PartyMonthlyBalance, Party, TransactionType):
+        db.query(model).delete(synchronize_session=False)
+    SerialAllocator.reset(db)
+    db.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic ledger")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--parties", type=int, default=1000)
+    parser.add_argument("--types", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2022, 1, 1))
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2024, 12, 31))
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per insert and commit")
+    parser.add_argument("--wipe", action="store_true",
+                        help="Delete all existing parties, types, transactions and balances first")
+    args = parser.parse_args()
+    if args.end_date < args.start_date:
+        parser.error("--end-date is before --start-date")
+    if args.transactions and (args.parties < 1 or args.types < 1):
+        parser.error("transactions need at least one party and one type")
+
+    # Every batch insert is a "slow query"; that is expected here
+    logging.getLogger("app.db.query_stats").setLevel(logging.ERROR)
+    MigrationRunner.upgrade(engine)
+    MigrationRunner.initialize_data(engine)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if args.wipe:
+            wipe(db)
+            print("Deleted existing parties, transaction types, transactions and balances")
+        if engine.dialect.name == "sqlite":
+            # A crash mid-load can corrupt only data that is rerun anyway; saves an fsync per batch
+            db.execute(text("PRAGMA synchronous = OFF"))
+
+        first_party = (db.scalar(select(func.max(Party.id))) or 0) + 1
+        existing_names = set(db.scalars(select(Party.name)))
+        rows = party_rows(args.parties, existing_names, rng)
+        for offset in range(0, len(rows), args.batch_size):
+            db.execute(insert(Party.__table__), rows[offset:offset + args.batch_size])
+        first_type = (db.scalar(select(func.max(TransactionType.id))) or 0) + 1
+        db.execute(insert(TransactionType.__table__), type_rows(args.types))
+        db.commit()
+        party_ids = list(db.scalars(select(Party.id).where(Party.id >= first_party).order_by(Party.id)))
+        type_ids = list(db.scalars(select(TransactionType.id).where(TransactionType.id >= first_type).order_by(TransactionType.id)))
+        print(f"Created {len(party_ids)} parties and {len(type_ids)} transaction types")
+
+        party_weights = zipf_cum_weights(len(party_ids), PARTY_SKEW, rng)
+        type_weights = zipf_cum_weights(len(type_ids), TYPE_SKEW, rng)
+        party_total, type_total = party_weights[-1], type_weights[-1]
+        counts = daily_counts(args.transactions, args.start_date, args.end_date, rng) if args.transactions else []
+        inserted = 0
+        batches = 0
+        batch: List[dict] = []
+
+        def flush() -> None:
+            nonlocal inserted, batches
+            serials = SerialAllocator.reserve_block(db, len(batch))
+            for row, serial in zip(batch, serials):
+                row["serial_number"] = serial
+            db.execute(insert(Transaction.__table__), batch)
+            db.commit()
+            inserted += len(batch)
+            batches += 1
+            batch.clear()
+            if batches % 25 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"  {inserted:>10,} transactions  {inserted / elapsed:,.0f} rows/s")
+
+        for n, count in enumerate(counts):
+            day = args.start_date + timedelta(days=n)
+            day_start = datetime(day.year, day.month, day.day, 9, tzinfo=timezone.utc)
+            # Entered during the business day, in order
+            for offset in sorted(rng.randrange(10 * 3600) for _ in range(count)):
+                note = None
+                if rng.random() < NOTE_SHARE:
+                    note = rng.choice(TRANSACTION_NOTES).format(n=rng.randrange(1000, 100000))
+                batch.append({
+                    "date": day,
+                    "party_id": party_ids[bisect.bisect_left(party_weights, rng.random() * party_total)],
+                    "type_id": type_ids[bisect.bisect_left(type_weights, rng.random() * type_total)],
+                    "amount": max(10, int(round(rng.lognormvariate(8.5, 1.3), -1))),
+                    "transaction_note": note,
+                    "created_at": day_start + timedelta(seconds=offset),
+                })
+                if len(batch) >= args.batch_size:
+                    flush()
+        if batch:
+            flush()
+
+        BalanceService.rebuild(db)
+        MonthlyBalanceService.rebuild(db)
+        TableVersionService.bump(db, PARTIES, TRANSACTION_TYPES, TRANSACTIONS)
+        db.commit()
+        elapsed = time.perf_counter() - started
+        print(f"Inserted {inserted:,} transactions in {elapsed:.1f}s; party balances and monthly checkpoints rebuilt")
+        print("Restart running workers so their caches and party search index pick up the new data")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
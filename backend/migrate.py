@@ -0,0 +1,51 @@
+"""
+Apply, revert and list versioned schema migrations (app/db/migrations.py).
+
+Usage:
+    python migrate.py                     # apply all pending migrations, then the data set-up
+    python migrate.py upgrade --to 2      # apply pending migrations up to version 2
+    python migrate.py downgrade --to 1    # revert migrations newer than version 1
+    python migrate.py status              # list migrations and whether they are applied
+"""
+import argparse
+import sys
+from app.db.database import engine
+from app.db.migrations import MIGRATIONS, MigrationRunner
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manage schema migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "downgrade", "status"])
+    parser.add_argument("--to", type=int, help="Target version (required for downgrade)")
+    args = parser.parse_args()
+    
+    if args.command == "status":
+        applied = dict(MigrationRunner.applied_versions(engine))
+        for migration in MIGRATIONS:
+            state = f"applied {applied[migration.version]:%Y-%m-%d %H:%M}" if migration.version in applied else "pending"
+            print(f"{migration.version:4d}  {migration.name:40s} {state}")
+        return 0
+    
+    if args.command == "downgrade":
+        if args.to is None:
+            parser.error("downgrade requires --to")
+        try:
+            done = MigrationRunner.downgrade(engine, args.to)
+        except ValueError as e:
+            print(e)
+            return 1
+        for migration in done:
+            print(f"Reverted {migration.version}: {migration.name}")
+    else:
+        done = MigrationRunner.upgrade(engine, args.to)
+        for migration in done:
+            print(f"Applied {migration.version}: {migration.name}")
+        if args.to is None:
+            MigrationRunner.initialize_data(engine)
+    if not done:
+        print("Nothing to do")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
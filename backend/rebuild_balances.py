@@ -0,0 +1,59 @@
+"""
+Rebuild the party_balances projection and the party_monthly_balances checkpoints
+from the transactions table and verify them.
+
+Usage:
+    python rebuild_balances.py           # rebuild, then verify
+    python rebuild_balances.py --check   # only verify, exit 1 on mismatch
+"""
+import argparse
+import sys
+from app.db.database import SessionLocal, engine
+from app.db.migrations import MigrationRunner
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild and verify the party balances and monthly checkpoints")
+    parser.add_argument("--check", action="store_true", help="Only verify, do not rebuild")
+    args = parser.parse_args()
+    
+    MigrationRunner.upgrade(engine)
+    db = SessionLocal()
+    try:
+        if not args.check:
+            count = BalanceService.rebuild(db)
+            db.commit()
+            months = MonthlyBalanceService.rebuild(db)
+            db.commit()
+            print(f"Rebuilt balances for {count} parties and {months} monthly checkpoints")
+        
+        failed = False
+        mismatches = BalanceService.find_mismatches(db)
+        if mismatches:
+            print(f"{len(mismatches)} parties do not match the raw aggregates:")
+            for m in mismatches:
+                print(f"   party {m['party_id']}: expected {m['expected']}, stored {m['actual']}")
+            failed = True
+        else:
+            print("Party balances match the raw aggregates")
+
+        monthly_mismatches = MonthlyBalanceService.find_mismatches(db)
+        if monthly_mismatches:
+            print(f"{len(monthly_mismatches)} monthly checkpoints do not match the raw aggregates:")
+            for m in monthly_mismatches:
+                print(f"   party {m['party_id']} {m['month']}: expected {m['expected']}, stored {m['actual']}")
+            failed = True
+        else:
+            print("Monthly checkpoints match the raw aggregates")
+        return 1 if failed else 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
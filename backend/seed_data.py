@@ -1,17 +1,31 @@
 """
-Seed data script for populating initial data
+Seed data script for populating initial data.
+
+Creates the admins and, on an empty database, a few sample parties, transaction
+types and transactions. Existing data is only deleted with --reset. For
+production-sized data use generate_data.py.
 """
+import argparse
+import sys
 from app.db.database import SessionLocal, engine
 from app.models.party import Party
+from app.models.party_balance import PartyBalance
+from app.models.party_monthly_balance import PartyMonthlyBalance
 from app.models.transaction_type import TransactionType
 from app.models.transaction import Transaction
 from app.models.admin import Admin
-from app.db.database import Base
+from app.db.migrations import MigrationRunner
 from app.core.security import get_password_hash
+from app.services.serial_allocator import SerialAllocator
+from app.services.table_version_service import TableVersionService, PARTIES, TRANSACTION_TYPES, TRANSACTIONS
 from datetime import date, timedelta
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+parser = argparse.ArgumentParser(description="Seed admins and sample data")
+parser.add_argument("--reset", action="store_true", help="Delete existing parties, types and transactions first")
+args = parser.parse_args()
+
+# Create or update the schema
+MigrationRunner.upgrade(engine)
 
 db = SessionLocal()
 
@@ -27,11 +41,20 @@ try:
         db.commit()
         print("✅ Created 2 admins: admin1/admin123, admin2/admin456")
 
-    # Clear existing data (optional - comment out if you want to keep existing data)
-    db.query(Transaction).delete()
-    db.query(Party).delete()
-    db.query(TransactionType).delete()
-    db.commit()
+    if args.reset:
+        # Balances and checkpoints are rebuilt from the new transactions by initialize_data below
+        db.query(PartyBalance).delete()
+        db.query(PartyMonthlyBalance).delete()
+        db.query(Transaction).delete()
+        db.query(Party).delete()
+        db.query(TransactionType).delete()
+        # Cached lists and ETags must change, and numbering restarts at 1
+        TableVersionService.bump(db, PARTIES, TRANSACTION_TYPES, TRANSACTIONS)
+        SerialAllocator.reset(db)
+        db.commit()
+    elif db.query(Party.id).first() is not None or db.query(TransactionType.id).first() is not None:
+        print("Database already has data; not adding sample data (use --reset to replace it)")
+        sys.exit(0)
 
     # Create Parties
     parties = [
@@ -42,6 +65,7 @@ try:
     ]
     for party in parties:
         db.add(party)
+    TableVersionService.bump(db, PARTIES)
     db.commit()
 
     # Refresh to get IDs
@@ -59,6 +83,7 @@ try:
     ]
     for trans_type in transaction_types:
         db.add(trans_type)
+    TableVersionService.bump(db, TRANSACTION_TYPES)
     db.commit()
 
     # Refresh to get IDs
@@ -111,7 +136,10 @@ try:
     ]
     for transaction in transactions:
         db.add(transaction)
+    TableVersionService.bump(db, TRANSACTIONS)
     db.commit()
+    # Balance projection, serial counter and table versions (formerly done at app startup)
+    MigrationRunner.initialize_data(engine)
 
     print("✅ Seed data created successfully!")
     print(f"   - {len(parties)} parties")
@@ -21,8 +21,15 @@ if [ ! -f "venv/.installed" ]; then
     touch venv/.installed
 fi
 
-# Check if database exists, if not, seed data
-if [ ! -f "ledger.db" ]; then
+# Check if database exists before migrations create it
+[ -f "ledger.db" ] && SEED=0 || SEED=1
+
+# Apply schema migrations
+echo "🗄️  Applying database migrations..."
+python migrate.py || { echo "❌ Migrations failed"; exit 1; }
+
+# Seed data into a new database
+if [ "$SEED" = "1" ]; then
     echo "🌱 Seeding initial data..."
     python seed_data.py
 fi
@@ -0,0 +1,118 @@
+"""
+Shared test fixtures. Settings are read when app is imported, so the test database is
+configured here first: a fresh SQLite file, or TEST_DATABASE_URL to run against PostgreSQL.
+"""
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ["DB_DEBUG_HEADERS"] = "true"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["LOG_FORMAT"] = "text"
+
+import pytest
+from fastapi.testclient import TestClient
+from app.db import query_stats
+from app.db.database import SessionLocal, get_engine
+from app.db.migrations import MigrationRunner
+
+ADMIN_LOGIN = "test"
+ADMIN_PASSWORD = "test"
+SEED_PARTIES = 50
+SEED_TRANSACTIONS = 1000
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The migrated and initialized test database, with one admin"""
+    from app.core.security import get_password_hash
+    from app.models.admin import Admin
+    
+    engine = get_engine()
+    MigrationRunner.upgrade(engine)
+    MigrationRunner.initialize_data(engine)
+    with SessionLocal() as db:
+        db.add(Admin(login_id=ADMIN_LOGIN, hashed_password=get_password_hash(ADMIN_PASSWORD)))
+        db.commit()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def ledger(engine):
+    """Parties, an add and a reduce type and transactions, with the projections rebuilt"""
+    from app.models.party import Party
+    from app.models.transaction import Transaction
+    from app.models.transaction_type import TransactionType
+    from app.services.balance_service import BalanceService
+    from app.services.monthly_balance_service import MonthlyBalanceService
+    from app.services.serial_allocator import SerialAllocator
+    from app.services.table_version_service import TableVersionService, VERSIONED_TABLES
+    
+    rng = random.Random(22)
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(Party, [{"name": f"Party {n:03d} Traders"} for n in range(SEED_PARTIES)])
+        db.bulk_insert_mappings(TransactionType, [{"note": "in", "type": "add"}, {"note": "out", "type": "reduce"}])
+        db.commit()
+        party_ids = [party_id for (party_id,) in db.query(Party.id).order_by(Party.id)]
+        type_ids = [type_id for (type_id,) in db.query(TransactionType.id).order_by(TransactionType.id)]
+        db.bulk_insert_mappings(Transaction, [
+            {
+                "serial_number": n + 1, "date": date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+                "party_id": rng.choice(party_ids), "type_id": rng.choice(type_ids), "amount": rng.randint(1, 1000),
+            }
+            for n in range(SEED_TRANSACTIONS)
+        ])
+        BalanceService.rebuild(db)
+        MonthlyBalanceService.rebuild(db)
+        TableVersionService.bump(db, *VERSIONED_TABLES)
+        db.commit()
+        SerialAllocator.initialize(db)
+    return {"party_ids": party_ids, "type_ids": type_ids}
+
+
+@pytest.fixture
+def db(engine):
+    """A session on the test database"""
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    """TestClient for the app, started up once for the session"""
+    from app.main import app
+    
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post("/api/v1/auth/login", json={"login_id": ADMIN_LOGIN, "password": ADMIN_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Context manager factory: `with assert_max_queries(n): ...` fails the test if the
+    block runs more than n SQL statements (counted like a request's X-DB-Queries)
+    """
+    @contextmanager
+    def check(limit: int):
+        token = query_stats.begin_request()
+        try:
+            yield
+        finally:
+            stats = query_stats.end_request(token)
+        assert stats.statements <= limit, (
+            f"{stats.statements} statements, expected at most {limit}:\n  " + "\n  ".join(stats.counts)
+        )
+    
+    return check
@@ -0,0 +1,192 @@
+"""
+Balance projections: after every kind of write the party_balances rows, the monthly
+checkpoints, and the totals read from them, match raw SUM aggregates of the transactions
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import case, func, update
+from app.models.party import Party
+from app.models.party_balance import PartyBalance
+from app.models.party_monthly_balance import PartyMonthlyBalance
+from app.models.transaction import Transaction
+from app.models.transaction_type import TransactionType
+from app.schemas.party import PartyCreate
+from app.schemas.transaction import TransactionCreate, TransactionUpdate
+from app.schemas.transaction_type import TransactionTypeCreate, TransactionTypeUpdate
+from app.services.balance_service import BalanceService
+from app.services.monthly_balance_service import MonthlyBalanceService
+from app.services.party_service import PartyService
+from app.services.transaction_service import TransactionService
+from app.services.transaction_type_service import TransactionTypeService
+
+# Around the seeded range (2020-01-01 to early 2024), in both halves of their months
+DATES = [date(2019, 12, 31), date(2020, 1, 1), date(2021, 6, 5), date(2021, 6, 30), date(2022, 2, 14), date(2025, 1, 1)]
+
+
+def raw_total(db, date_end=None, party_ids=None) -> int:
+    """Outstanding total as one SUM over the transactions"""
+    signed = case((TransactionType.type == "add", Transaction.amount), else_=-Transaction.amount)
+    query = db.query(func.coalesce(func.sum(signed), 0)).select_from(Transaction).join(
+        TransactionType, TransactionType.id == Transaction.type_id
+    )
+    if date_end is not None:
+        query = query.filter(Transaction.date <= date_end)
+    if party_ids is not None:
+        query = query.filter(Transaction.party_id.in_(party_ids))
+    return int(query.scalar())
+
+
+def raw_month_end_totals(db):
+    """(party_id, month) -> (add, reduce) summed over every transaction up to that month's end"""
+    rows = db.query(Transaction.party_id, Transaction.date, TransactionType.type, Transaction.amount).join(
+        TransactionType, TransactionType.id == Transaction.type_id
+    ).all()
+    by_party = defaultdict(list)
+    for party_id, day, kind, amount in rows:
+        by_party[party_id].append((day, kind, amount))
+
+    def totals(party_id, month):
+        month_end = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+        rows = [(kind, amount) for day, kind, amount in by_party[party_id] if day <= month_end]
+        return (sum(amount for kind, amount in rows if kind == "add"),
+                sum(amount for kind, amount in rows if kind == "reduce"))
+
+    months = {(party_id, day.replace(day=1)) for party_id, days in by_party.items() for day, _, _ in days}
+    return totals, months
+
+
+def raw_party_totals(db):
+    """party_id -> (add, reduce) summed over all the party's transactions, for every party"""
+    totals = {party_id: (0, 0) for (party_id,) in db.query(Party.id)}
+    rows = db.query(
+        Transaction.party_id,
+        func.sum(case((TransactionType.type == "add", Transaction.amount), else_=0)),
+        func.sum(case((TransactionType.type == "reduce", Transaction.amount), else_=0)),
+    ).join(TransactionType, TransactionType.id == Transaction.type_id).group_by(Transaction.party_id)
+    totals.update({party_id: (int(add), int(reduce)) for party_id, add, reduce in rows})
+    return totals
+
+
+def assert_consistent(db, *dates: date, party_ids=None):
+    """
+    party_balances rows, checkpoint rows, the current total and the totals up to dates
+    (and the default DATES) equal the raw aggregates
+    """
+    db.expire_all()
+    balances = {row.party_id: (row.add_total, row.reduce_total, row.net) for row in db.query(PartyBalance)}
+    assert balances == {party_id: (add, reduce, add - reduce) for party_id, (add, reduce) in raw_party_totals(db).items()}
+    assert TransactionService.calculate_outstanding_total(db) == raw_total(db)
+    if party_ids:
+        assert TransactionService.calculate_outstanding_total(db, party_ids=party_ids) == raw_total(db, party_ids=party_ids)
+    assert BalanceService.find_mismatches(db) == []
+
+    totals, months = raw_month_end_totals(db)
+    stored = {(row.party_id, row.month): (row.add_total, row.reduce_total) for row in db.query(PartyMonthlyBalance)}
+    assert months <= set(stored), "every month with transactions has a checkpoint"
+    assert {key: value for key, value in stored.items() if value != totals(*key)} == {}
+
+    for day in (*DATES, *dates, *(d - timedelta(days=1) for d in dates)):
+        assert TransactionService.calculate_outstanding_total(db, date_end=day) == raw_total(db, day), day
+        if party_ids:
+            assert TransactionService.calculate_outstanding_total(db, date_end=day, party_ids=party_ids) == \
+                raw_total(db, day, party_ids), day
+    assert MonthlyBalanceService.find_mismatches(db) == []
+
+
+@pytest.fixture
+def party(db, ledger):
+    party = PartyService.create_party(db, PartyCreate(name="Checkpoint Test Traders"))
+    yield party.id
+    PartyService.delete_party(db, party.id)
+
+
+def create(db, party_id: int, type_id: int, day: date, amount: int) -> Transaction:
+    return TransactionService.create_transaction(db, TransactionCreate(
+        date=day, party_id=party_id, type_id=type_id, amount=amount,
+    ))
+
+
+def test_back_dated_create_update_delete(db, ledger, party):
+    add_type, reduce_type = ledger["type_ids"]
+    other_party = ledger["party_ids"][0]
+    late = create(db, party, add_type, date(2023, 7, 20), 500)
+    assert_consistent(db, date(2023, 7, 20), party_ids=[party])
+
+    # Back-dated: every later checkpoint of the party moves
+    early = create(db, party, reduce_type, date(2021, 3, 10), 120)
+    assert_consistent(db, date(2021, 3, 10), date(2023, 7, 20), party_ids=[party])
+
+    TransactionService.update_transaction(db, early.id, TransactionUpdate(date=date(2020, 11, 25), amount=80))
+    assert_consistent(db, date(2020, 11, 25), date(2021, 3, 10), party_ids=[party])
+
+    TransactionService.update_transaction(db, early.id, TransactionUpdate(type_id=add_type))
+    assert_consistent(db, date(2020, 11, 25), party_ids=[party])
+
+    TransactionService.update_transaction(db, early.id, TransactionUpdate(party_id=other_party))
+    assert_consistent(db, date(2020, 11, 25), party_ids=[party, other_party])
+
+    TransactionService.update_transaction(db, late.id, TransactionUpdate(date=date(2020, 2, 1)))
+    assert_consistent(db, date(2020, 2, 1), date(2023, 7, 20), party_ids=[party])
+
+    for transaction in (early, late):
+        TransactionService.delete_transaction(db, transaction.id)
+    assert_consistent(db, date(2020, 2, 1), date(2020, 11, 25), party_ids=[party, other_party])
+
+
+def test_type_flip_moves_amounts_between_credit_and_debit(db, party):
+    transaction_type = TransactionTypeService.create_transaction_type(db, TransactionTypeCreate(note="flip", type="add"))
+    for day, amount in ((date(2020, 4, 3), 40), (date(2022, 9, 28), 70)):
+        create(db, party, transaction_type.id, day, amount)
+    assert_consistent(db, date(2020, 4, 3), date(2022, 9, 28), party_ids=[party])
+
+    TransactionTypeService.update_transaction_type(db, transaction_type.id, TransactionTypeUpdate(type="reduce"))
+    assert_consistent(db, date(2020, 4, 3), date(2022, 9, 28), party_ids=[party])
+
+    TransactionTypeService.delete_transaction_type(db, transaction_type.id)
+    assert_consistent(db, date(2020, 4, 3), date(2022, 9, 28), party_ids=[party])
+
+
+def test_party_deletion_removes_its_balances(db, ledger):
+    party = PartyService.create_party(db, PartyCreate(name="Deleted Checkpoint Traders"))
+    for day, amount in ((date(2020, 6, 1), 10), (date(2021, 6, 15), 20), (date(2023, 1, 31), 30)):
+        create(db, party.id, ledger["type_ids"][0], day, amount)
+    assert_consistent(db, date(2021, 6, 15), party_ids=[party.id])
+
+    PartyService.delete_party(db, party.id)
+    assert db.query(PartyMonthlyBalance).filter(PartyMonthlyBalance.party_id == party.id).count() == 0
+    assert BalanceService.get_party_balance(db, party.id) is None
+    assert_consistent(db, date(2021, 6, 15))
+
+
+def test_find_mismatches_reports_a_corrupt_checkpoint_and_rebuild_repairs_it(db, ledger):
+    party_id = ledger["party_ids"][1]
+    month = db.query(func.min(PartyMonthlyBalance.month)).filter(PartyMonthlyBalance.party_id == party_id).scalar()
+    db.execute(
+        update(PartyMonthlyBalance.__table__)
+        .where(PartyMonthlyBalance.party_id == party_id, PartyMonthlyBalance.month == month)
+        .values(add_total=PartyMonthlyBalance.add_total + 5)
+    )
+    db.commit()
+    mismatches = MonthlyBalanceService.find_mismatches(db)
+    assert [(mismatch["party_id"], mismatch["month"]) for mismatch in mismatches] == [(party_id, month.isoformat())]
+
+    MonthlyBalanceService.rebuild(db)
+    db.commit()
+    assert_consistent(db, month)
+
+
+def test_balance_find_mismatches_reports_a_corrupt_row_and_rebuild_repairs_it(db, ledger):
+    party_id = ledger["party_ids"][2]
+    db.execute(
+        update(PartyBalance.__table__)
+        .where(PartyBalance.party_id == party_id)
+        .values(reduce_total=PartyBalance.reduce_total + 3, net=PartyBalance.net - 3)
+    )
+    db.commit()
+    assert [mismatch["party_id"] for mismatch in BalanceService.find_mismatches(db)] == [party_id]
+
+    BalanceService.rebuild(db)
+    db.commit()
+    assert_consistent(db)
@@ -0,0 +1,53 @@
+"""
+Bulk import error handling: a row that fails at insert time only rejects itself, and
+the listed errors are capped while the failed count stays exact
+"""
+import json
+from app.services import transaction_import_service
+from app.services.balance_service import BalanceService
+
+# Passes validation, but does not fit a 64-bit integer column
+TOO_LARGE = 2 ** 63
+
+
+def ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+def post_bulk(client, auth_headers, rows):
+    response = client.post(
+        "/api/v1/transactions/bulk", params={"format": "ndjson"}, content=ndjson(rows), headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_failing_row_does_not_fail_its_chunk(client, auth_headers, db, ledger):
+    party_id, add_type_id = ledger["party_ids"][0], ledger["type_ids"][0]
+    amounts = [10, 20, TOO_LARGE, 30, 40]
+    total_before = BalanceService.get_outstanding_total(db)
+
+    result = post_bulk(client, auth_headers, [
+        {"date": "2024-01-15", "party_id": party_id, "type_id": add_type_id, "amount": amount} for amount in amounts
+    ])
+
+    assert result["inserted"] == 4
+    assert result["failed"] == 1
+    assert result["errors"] == [{"row": 3, "error": "Insert failed: value out of range"}]
+    assert result["errors_truncated"] is False
+    db.expire_all()
+    assert BalanceService.get_outstanding_total(db) == total_before + 100
+
+
+def test_reported_errors_are_capped(client, auth_headers, ledger, monkeypatch):
+    monkeypatch.setattr(transaction_import_service, "MAX_REPORTED_ERRORS", 2)
+
+    result = post_bulk(client, auth_headers, [
+        {"date": "2024-01-15", "party": "No Such Party", "type_id": ledger["type_ids"][0], "amount": 1}
+        for _ in range(5)
+    ])
+
+    assert result["inserted"] == 0
+    assert result["failed"] == 5
+    assert [error["row"] for error in result["errors"]] == [1, 2]
+    assert result["errors_truncated"] is True
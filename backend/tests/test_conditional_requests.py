@@ -0,0 +1,70 @@
+"""
+Conditional GETs: a 304 runs no SQL while the table versions are known current, one
+version lookup after an invalidation, and table versions change in the same
+transaction as the data.
+"""
+import pytest
+from app.core.reference_cache import reference_cache
+from app.schemas.party import PartyCreate
+from app.services.party_service import PartyService
+from app.services.table_version_service import TableVersionService, PARTIES, TRANSACTION_TYPES, VERSIONED_TABLES
+
+ENDPOINTS = [
+    ("/api/v1/transactions/", {"party_filter": "party 01"}),
+    ("/api/v1/transactions/page", {"limit": 50}),
+    ("/api/v1/transactions/outstanding/total", {"date_end": "2023-01-01"}),
+    ("/api/v1/parties/", {}),
+    ("/api/v1/transaction-types/", {}),
+]
+
+
+@pytest.mark.parametrize("path, params", ENDPOINTS)
+def test_not_modified_sql_count(client, auth_headers, ledger, path, params):
+    client.get(path, params=params, headers=auth_headers)
+    etag = client.get(path, params=params, headers=auth_headers).headers["etag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    
+    response = client.get(path, params=params, headers=conditional)
+    assert response.status_code == 304
+    assert response.headers["X-DB-Queries"] == "0"
+    
+    for table in VERSIONED_TABLES:
+        reference_cache.invalidate(table)
+    response = client.get(path, params=params, headers=conditional)
+    assert response.status_code == 304
+    assert int(response.headers["X-DB-Queries"]) <= 1
+
+
+def test_change_event_from_another_worker_changes_the_etag(client, auth_headers, ledger, engine):
+    path = "/api/v1/transaction-types/"
+    etag = client.get(path, headers=auth_headers).headers["etag"]
+    # Another worker's write: the version and the event are committed together
+    with engine.begin() as conn:
+        TableVersionService.increment(conn, [TRANSACTION_TYPES])
+    reference_cache.apply_event("transaction_type.updated", "{}")
+    response = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_bump_increments_in_the_committing_transaction(db):
+    before = TableVersionService.get_version(db, PARTIES)
+    TableVersionService.bump(db, PARTIES)
+    db.rollback()
+    assert TableVersionService.get_version(db, PARTIES) == before
+    
+    TableVersionService.bump(db, PARTIES)
+    db.commit()
+    assert TableVersionService.get_version(db, PARTIES) == before + 1
+
+
+def test_write_is_rolled_back_when_the_version_increment_fails(db, monkeypatch):
+    def fail(conn, tables):
+        raise RuntimeError("counter row locked")
+    
+    monkeypatch.setattr(TableVersionService, "increment", staticmethod(fail))
+    with pytest.raises(RuntimeError):
+        PartyService.create_party(db, PartyCreate(name="Unversioned Party"))
+    db.rollback()
+    monkeypatch.undo()
+    assert not PartyService.search_parties(db, "Unversioned Party")
@@ -0,0 +1,27 @@
+"""
+Event log: late events (committed after later ones were consumed) are flagged for
+live clients, and no client can resume past one it may have missed
+"""
+import json
+from app.core.events import EventLog
+
+
+def test_late_event_is_flagged_and_forces_a_resync(monkeypatch):
+    log = EventLog(buffer_size=10, epoch="e")
+    sent = []
+    monkeypatch.setattr(log, "_deliver", sent.append)
+    log.start_at(0)
+
+    for seq in (1, 3):
+        log.receive(seq, "transaction.created", "{}")
+    log.receive(2, "transaction.created", "{}")
+
+    messages = [json.loads(text) for text in sent]
+    assert [(message["seq"], message.get("late", False)) for message in messages] == [(1, False), (3, False), (2, True)]
+    # Clients at or before seq 3 may have been away when seq 2 arrived
+    assert log.replay(1, "e") is None
+    assert log.replay(3, "e") is None
+
+    log.receive(4, "transaction.created", "{}")
+    assert log.replay(4, "e") == []
+    assert log.replay(3, "e") is None
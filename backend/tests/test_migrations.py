@@ -0,0 +1,52 @@
+"""
+The migrations build the schema the models describe, so a model change without a
+migration fails here
+"""
+import os
+import tempfile
+from sqlalchemy import create_engine, inspect
+from app.db.database import Base
+from app.db.migrations import MigrationRunner, schema_migrations
+import app.models.admin  # noqa: F401 - register every table on Base.metadata
+import app.models.event_outbox  # noqa: F401
+import app.models.party  # noqa: F401
+import app.models.party_balance  # noqa: F401
+import app.models.party_monthly_balance  # noqa: F401
+import app.models.serial_counter  # noqa: F401
+import app.models.table_version  # noqa: F401
+import app.models.transaction  # noqa: F401
+import app.models.transaction_type  # noqa: F401
+
+
+def describe(engine):
+    """Columns, indexes, primary and foreign keys of every table"""
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted((c["name"], str(c["type"]), c["nullable"], str(c.get("default"))) for c in inspector.get_columns(table)),
+            sorted((i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in inspector.get_indexes(table)),
+            inspector.get_pk_constraint(table)["constrained_columns"],
+            sorted((f["referred_table"], tuple(f["constrained_columns"])) for f in inspector.get_foreign_keys(table)),
+        )
+        for table in inspector.get_table_names()
+        if table != schema_migrations.name
+    }
+
+
+def test_migrations_match_models():
+    directory = tempfile.mkdtemp()
+    migrated = create_engine(f"sqlite:///{os.path.join(directory, 'migrated.db')}")
+    from_models = create_engine(f"sqlite:///{os.path.join(directory, 'models.db')}")
+    MigrationRunner.upgrade(migrated)
+    Base.metadata.create_all(from_models)
+    assert describe(migrated) == describe(from_models)
+
+
+def test_downgrade_and_upgrade_again():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'roundtrip.db')}")
+    MigrationRunner.upgrade(engine)
+    expected = describe(engine)
+    MigrationRunner.downgrade(engine, 1)
+    assert "party_monthly_balances" not in describe(engine)
+    MigrationRunner.upgrade(engine)
+    assert describe(engine) == expected
@@ -0,0 +1,46 @@
+"""
+SQL statement budgets of the transaction list and outstanding total. They do not
+depend on the number of rows, so a change that loads relationships per row (N+1)
+fails here long before it is slow.
+"""
+from datetime import date
+import pytest
+from app.services.transaction_service import TransactionService
+
+FILTERS = {
+    "unfiltered": {},
+    "party_filter": {"party_filter": "party 01"},
+    "party_ids": {"party_ids": [1, 2, 3]},
+}
+
+
+@pytest.mark.parametrize("date_range", [{}, {"date_start": date(2021, 1, 1), "date_end": date(2022, 1, 1)}],
+                         ids=["all dates", "date range"])
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+def test_get_all_transactions_runs_one_statement(db, ledger, assert_max_queries, filters, date_range):
+    # Warm the per-worker party index
+    TransactionService.get_all_transactions(db, **filters, **date_range)
+    with assert_max_queries(1):
+        transactions = TransactionService.get_all_transactions(db, **filters, **date_range)
+    assert transactions
+
+
+@pytest.mark.parametrize("date_end", [None, date(2021, 6, 30), date(2021, 6, 5)], ids=["no date", "late", "early"])
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+def test_calculate_outstanding_total_runs_one_statement(db, ledger, assert_max_queries, filters, date_end):
+    TransactionService.calculate_outstanding_total(db, date_end=date_end, **filters)
+    with assert_max_queries(1):
+        TransactionService.calculate_outstanding_total(db, date_end=date_end, **filters)
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/v1/transactions/", {"include": "party,type"}),
+    ("/api/v1/transactions/", {"party_filter": "party 1", "date_start": "2021-01-01"}),
+    ("/api/v1/transactions/page", {"limit": 50}),
+    ("/api/v1/transactions/outstanding/total", {"date_end": "2022-01-01"}),
+])
+def test_route_runs_one_statement(client, auth_headers, ledger, path, params):
+    client.get(path, params=params, headers=auth_headers)
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) <= 1
@@ -0,0 +1,58 @@
+"""
+Serial numbers under concurrency: parallel writers through create_transaction, plus
+block reservations, never get the same number and never fail
+"""
+import threading
+from datetime import date
+from app.db.database import SessionLocal
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionCreate
+from app.services.serial_allocator import SerialAllocator
+from app.services.transaction_service import TransactionService
+
+WRITERS = 50
+PER_WRITER = 10
+BLOCK_SIZE = 25
+
+
+def test_concurrent_writers_get_unique_serials(ledger):
+    party_id, type_id = ledger["party_ids"][0], ledger["type_ids"][0]
+    serials, reserved, errors = [], [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(WRITERS)
+    
+    def writer(index: int):
+        barrier.wait()
+        for i in range(PER_WRITER):
+            session = SessionLocal()
+            try:
+                if i == 0:
+                    block = SerialAllocator.reserve_block(session, BLOCK_SIZE)
+                    session.commit()
+                    with lock:
+                        reserved.extend(block)
+                created = TransactionService.create_transaction(session, TransactionCreate(
+                    date=date.today(), party_id=party_id, type_id=type_id, amount=index + 1,
+                ))
+                with lock:
+                    serials.append(created.serial_number)
+            except Exception as e:  # noqa: BLE001 - every failure is a test failure
+                session.rollback()
+                with lock:
+                    errors.append(f"writer {index}: {e!r}")
+            finally:
+                session.close()
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(serials) == WRITERS * PER_WRITER
+    numbers = serials + reserved
+    assert len(set(numbers)) == len(numbers)
+    with SessionLocal() as db:
+        stored = {serial for (serial,) in db.query(Transaction.serial_number).filter(Transaction.serial_number.in_(serials))}
+    assert stored == set(serials)
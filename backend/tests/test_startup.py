@@ -0,0 +1,114 @@
+"""
+Application startup: lazy imports, readiness of an unmigrated database and the
+startup checks
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.serial_counter import SerialCounter
+from app.services.serial_allocator import SerialAllocator, TRANSACTION_SEQUENCE
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Starts against an empty database, applies the migrations the way `python migrate.py
+# upgrade --to <head>` would (without the data set-up) and creates a transaction
+UNMIGRATED_CHILD = r"""
+import json, time
+from fastapi.testclient import TestClient
+import app.main
+from app.core.security import get_password_hash
+from app.db.database import SessionLocal, get_engine
+from app.db.migrations import MigrationRunner
+from app.models.admin import Admin
+
+def wait_for(client, done, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if done(response) or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+with TestClient(app.main.app) as client:
+    unmigrated = wait_for(client, lambda response: response.json()["status"] != "starting")
+    MigrationRunner.upgrade(get_engine())
+    ready = wait_for(client, lambda response: response.status_code == 200)
+    with SessionLocal() as db:
+        db.add(Admin(login_id="admin", hashed_password=get_password_hash("admin")))
+        db.commit()
+    token = client.post("/api/v1/auth/login", json={"login_id": "admin", "password": "admin"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    party = client.post("/api/v1/parties/", json={"name": "Acme"}, headers=headers).json()
+    kind = client.post("/api/v1/transaction-types/", json={"note": "in", "type": "add"}, headers=headers).json()
+    created = client.post("/api/v1/transactions/", json={
+        "date": "2024-01-01", "party_id": party["id"], "type_id": kind["id"], "amount": 10,
+    }, headers=headers)
+print(json.dumps({
+    "unmigrated": [unmigrated.status_code, unmigrated.json()["status"]],
+    "ready": [ready.status_code, ready.json()["status"]],
+    "created": [created.status_code, created.json().get("serial_number")],
+}))
+"""
+
+
+def fresh_database_env():
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}",
+        "MIGRATE_ON_STARTUP": "false",
+        "EVENT_BUS_BACKEND": "memory",
+    }
+
+
+def test_startup_time():
+    """Importing the app opens no connection and loads no driver; /health never waits for the database"""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_time", "--runs", "1", "--db-connect-delay-ms", "500"],
+        cwd=BACKEND, env=fresh_database_env(), capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "PASS" in result.stdout
+
+
+def test_unmigrated_database_is_reported_then_initialized():
+    output = subprocess.run(
+        [sys.executable, "-c", UNMIGRATED_CHILD],
+        cwd=BACKEND, env=fresh_database_env(), capture_output=True, text=True, timeout=120, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["unmigrated"] == [503, "migrations pending"]
+    assert result["ready"] == [200, "ready"]
+    # The warm-up ran the data set-up, so the serial counter exists without `python migrate.py`
+    assert result["created"] == [201, 1]
+
+
+def test_create_reports_missing_serial_counter(client, auth_headers, ledger, db):
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"DROP SEQUENCE {TRANSACTION_SEQUENCE}"))
+    else:
+        db.query(SerialCounter).delete()
+    db.commit()
+    try:
+        response = client.post("/api/v1/transactions/", json={
+            "date": "2024-01-01", "party_id": ledger["party_ids"][0], "type_id": ledger["type_ids"][0], "amount": 1,
+        }, headers=auth_headers)
+        assert response.status_code == 503
+        assert "migrate.py" in response.json()["detail"]
+    finally:
+        SerialAllocator.initialize(db)
+
+
+def test_memory_bus_refuses_several_workers(monkeypatch):
+    from app.main import start_event_bus
+    
+    monkeypatch.setattr(settings, "EVENT_BUS_BACKEND", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    with pytest.raises(RuntimeError, match="shared event bus"):
+        asyncio.run(start_event_bus())
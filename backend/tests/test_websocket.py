@@ -0,0 +1,23 @@
+"""
+WebSocket authentication: /ws needs the same access token as the REST routes
+"""
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+from app.core.security import create_access_token
+
+
+@pytest.mark.parametrize("params", [{}, {"token": "not-a-jwt"}, {"token": create_access_token(10_000)}],
+                         ids=["missing", "invalid", "unknown admin"])
+def test_rejects_connections_without_a_valid_token(client, params):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/ws", params=params):
+            pass
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_accepts_a_valid_token(client, auth_headers):
+    token = auth_headers["Authorization"].removeprefix("Bearer ")
+    with client.websocket_connect("/ws", params={"token": token}) as socket:
+        message = socket.receive_json(mode="binary")
+    assert message["type"] == "outstanding_total"
@@ -5,8 +5,8 @@ import React, { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from 'react-query';
 import DatePicker from 'react-datepicker';
 import 'react-datepicker/dist/react-datepicker.css';
-import { transactionAPI, partyAPI, transactionTypeAPI } from '../services/api';
-import type { Transaction, Party, TransactionType } from '../types';
+import { transactionAPI } from '../services/api';
+import type { Transaction, TransactionWithRelations } from '../types';
 import { TransactionForm } from './TransactionForm';
 import { format } from 'date-fns';
 
@@ -29,27 +29,20 @@ export const TransactionTable: React.FC<TransactionTableProps> = ({
 
   const tillDateStr = tillDate ? format(tillDate, 'yyyy-MM-dd') : undefined;
 
-  // Fetch transactions with filters (till date = show from beginning up to this date)
-  const { data: transactions = [], isLoading } = useQuery<Transaction[]>(
+  // Fetch transactions with filters (till date = show from beginning up to this date),
+  // with party and type details embedded so the table needs a single request
+  const { data: transactions = [], isLoading } = useQuery<TransactionWithRelations[]>(
     ['transactions', partyFilter, tillDateStr],
     () =>
       transactionAPI
         .getAll({
+          include: 'party,type',
           party_filter: partyFilter || undefined,
           date_end: tillDateStr,
         })
         .then((res) => res.data)
   );
 
-  // Fetch parties and transaction types for display
-  const { data: parties = [] } = useQuery<Party[]>(['parties'], () =>
-    partyAPI.getAll().then((res) => res.data)
-  );
-  const { data: transactionTypes = [] } = useQuery<TransactionType[]>(
-    ['transaction-types'],
-    () => transactionTypeAPI.getAll().then((res) => res.data)
-  );
-
   const deleteMutation = useMutation(transactionAPI.delete, {
     onSuccess: () => {
       queryClient.invalidateQueries(['transactions']);
@@ -72,14 +65,6 @@ export const TransactionTable: React.FC<TransactionTableProps> = ({
     }
   };
 
-  const getPartyName = (partyId: number) => {
-    return parties.find((p) => p.id === partyId)?.name || 'Unknown';
-  };
-
-  const getTransactionType = (typeId: number) => {
-    return transactionTypes.find((t) => t.id === typeId);
-  };
-
   const handleAddClick = () => {
     setEditingTransaction(null);
     setIsFormOpen(true);
@@ -174,7 +159,7 @@ export const TransactionTable: React.FC<TransactionTableProps> = ({
               </tr>
             ) : (
               transactions.map((transaction) => {
-                const transactionType = getTransactionType(transaction.type_id);
+                const transactionType = transaction.transaction_type;
                 return (
                   <tr key={transaction.id} className="hover:bg-gray-50">
                     <td className="px-4 py-3 whitespace-nowrap text-sm text-gray-900">
@@ -184,7 +169,7 @@ export const TransactionTable: React.FC<TransactionTableProps> = ({
                       {format(new Date(transaction.date), 'dd/MM/yyyy')}
                     </td>
                     <td className="px-4 py-3 whitespace-nowrap text-sm text-gray-900">
-                      {getPartyName(transaction.party_id)}
+                      {transaction.party?.name || 'Unknown'}
                     </td>
                     <td className="px-4 py-3 text-sm text-gray-900">
                       {transaction.transaction_note || '-'}
@@ -43,18 +43,31 @@ export const useWebSocket = () => {
       queryClient.invalidateQueries(['outstanding-total']);
     };
 
-    // Listen for transaction updates
-    const handleTransactionCreated = () => {
+    // Listen for transaction updates; events carry the new unfiltered outstanding total
+    const setUnfilteredTotal = (data: { outstanding_total?: number }) => {
+      if (data.outstanding_total === undefined) {
+        queryClient.invalidateQueries(['outstanding-total']);
+        return;
+      }
+      queryClient.setQueryData(['outstanding-total', '', null], { total: data.outstanding_total });
+      // Filtered totals still need a refetch
+      queryClient.invalidateQueries({
+        predicate: (query) =>
+          query.queryKey[0] === 'outstanding-total' &&
+          !(query.queryKey[1] === '' && query.queryKey[2] === null),
+      });
+    };
+    const handleTransactionCreated = (data: { outstanding_total?: number }) => {
       queryClient.invalidateQueries(['transactions']);
-      queryClient.invalidateQueries(['outstanding-total']);
+      setUnfilteredTotal(data);
     };
-    const handleTransactionUpdated = () => {
+    const handleTransactionUpdated = (data: { outstanding_total?: number }) => {
       queryClient.invalidateQueries(['transactions']);
-      queryClient.invalidateQueries(['outstanding-total']);
+      setUnfilteredTotal(data);
     };
-    const handleTransactionDeleted = () => {
+    const handleTransactionDeleted = (data: { outstanding_total?: number }) => {
       queryClient.invalidateQueries(['transactions']);
-      queryClient.invalidateQueries(['outstanding-total']);
+      setUnfilteredTotal(data);
     };
 
     // Listen for outstanding total updates
@@ -62,30 +75,42 @@ export const useWebSocket = () => {
       queryClient.setQueryData(['outstanding-total'], { total: data.total });
     };
 
+    // Server dropped queued updates for this client (it fell behind): refetch everything
+    const handleResync = () => {
+      queryClient.invalidateQueries(['parties']);
+      queryClient.invalidateQueries(['transaction-types']);
+      queryClient.invalidateQueries(['transactions']);
+      queryClient.invalidateQueries(['outstanding-total']);
+    };
+
     // Register event listeners
-    wsService.on('party_created', handlePartyCreated);
-    wsService.on('party_updated', handlePartyUpdated);
-    wsService.on('party_deleted', handlePartyDeleted);
-    wsService.on('transaction_type_created', handleTransactionTypeCreated);
-    wsService.on('transaction_type_updated', handleTransactionTypeUpdated);
-    wsService.on('transaction_type_deleted', handleTransactionTypeDeleted);
-    wsService.on('transaction_created', handleTransactionCreated);
-    wsService.on('transaction_updated', handleTransactionUpdated);
-    wsService.on('transaction_deleted', handleTransactionDeleted);
+    wsService.on('party.created', handlePartyCreated);
+    wsService.on('party.updated', handlePartyUpdated);
+    wsService.on('party.deleted', handlePartyDeleted);
+    wsService.on('transaction_type.created', handleTransactionTypeCreated);
+    wsService.on('transaction_type.updated', handleTransactionTypeUpdated);
+    wsService.on('transaction_type.deleted', handleTransactionTypeDeleted);
+    wsService.on('transaction.created', handleTransactionCreated);
+    wsService.on('transaction.updated', handleTransactionUpdated);
+    wsService.on('transaction.deleted', handleTransactionDeleted);
     wsService.on('outstanding_total', handleOutstandingTotal);
+    wsService.on('resync', handleResync);
+    wsService.on('transactions.imported', handleTransactionCreated);
 
     // Cleanup on unmount
     return () => {
-      wsService.off('party_created', handlePartyCreated);
-      wsService.off('party_updated', handlePartyUpdated);
-      wsService.off('party_deleted', handlePartyDeleted);
-      wsService.off('transaction_type_created', handleTransactionTypeCreated);
-      wsService.off('transaction_type_updated', handleTransactionTypeUpdated);
-      wsService.off('transaction_type_deleted', handleTransactionTypeDeleted);
-      wsService.off('transaction_created', handleTransactionCreated);
-      wsService.off('transaction_updated', handleTransactionUpdated);
-      wsService.off('transaction_deleted', handleTransactionDeleted);
+      wsService.off('party.created', handlePartyCreated);
+      wsService.off('party.updated', handlePartyUpdated);
+      wsService.off('party.deleted', handlePartyDeleted);
+      wsService.off('transaction_type.created', handleTransactionTypeCreated);
+      wsService.off('transaction_type.updated', handleTransactionTypeUpdated);
+      wsService.off('transaction_type.deleted', handleTransactionTypeDeleted);
+      wsService.off('transaction.created', handleTransactionCreated);
+      wsService.off('transaction.updated', handleTransactionUpdated);
+      wsService.off('transaction.deleted', handleTransactionDeleted);
       wsService.off('outstanding_total', handleOutstandingTotal);
+      wsService.off('resync', handleResync);
+      wsService.off('transactions.imported', handleTransactionCreated);
       wsService.disconnect();
     };
   }, [queryClient]);
@@ -1,6 +1,6 @@
 
 import axios from 'axios';
-import type { Party, TransactionType, Transaction, OutstandingTotal } from '../types';
+import type { Party, TransactionType, Transaction, TransactionWithRelations, TransactionPage, OutstandingTotal } from '../types';
 import { getStoredToken, clearStoredToken } from '../utils/authStorage';
 
 // const API_BASE_URL = '/api/v1';
@@ -12,6 +12,8 @@ const api = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
+  // Repeat array params (party_ids=1&party_ids=2) as FastAPI expects
+  paramsSerializer: { indexes: null },
 });
 
 // Add Bearer token to all requests
@@ -69,14 +71,17 @@ export const transactionTypeAPI = {
 
 // Transaction APIs
 export const transactionAPI = {
-  getAll: (params?: { party_filter?: string; date_start?: string; date_end?: string }) => 
-    api.get<Transaction[]>('/transactions/', { params }),
-  getById: (id: number) => api.get<Transaction>(`/transactions/${id}`),
+  getAll: (params?: { include?: string; party_filter?: string; party_ids?: number[]; date_start?: string; date_end?: string }) => 
+    api.get<TransactionWithRelations[]>('/transactions/', { params }),
+  getPage: (params?: { limit?: number; cursor?: string; party_filter?: string; party_ids?: number[]; date_start?: string; date_end?: string }) =>
+    api.get<TransactionPage>('/transactions/page', { params }),
+  getById: (id: number, include?: string) =>
+    api.get<TransactionWithRelations>(`/transactions/${id}`, { params: { include } }),
   create: (data: Omit<Transaction, 'id' | 'serial_number' | 'created_at' | 'updated_at'>) => 
     api.post<Transaction>('/transactions/', data),
   update: (id: number, data: Partial<Transaction>) => 
     api.put<Transaction>(`/transactions/${id}`, data),
   delete: (id: number) => api.delete(`/transactions/${id}`),
-  getOutstandingTotal: (params?: { party_filter?: string; date_end?: string }) =>
+  getOutstandingTotal: (params?: { party_filter?: string; party_ids?: number[]; date_end?: string }) =>
     api.get<OutstandingTotal>('/transactions/outstanding/total', { params }),
 };
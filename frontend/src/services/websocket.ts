@@ -1,25 +1,47 @@
 /**
  * WebSocket service for real-time updates
  */
+import { getStoredToken, clearStoredToken } from '../utils/authStorage';
 
 export type WebSocketMessage = {
   type: string;
   data: any;
+  seq?: number;
+  epoch?: string;
+  // Committed after later events were sent: its seq is below the stream position
+  late?: boolean;
 };
 
+// Messages arrive as UTF-8 encoded JSON in binary frames (encoded once per broadcast on the server)
+const decoder = new TextDecoder();
+
 export class WebSocketService {
   private ws: WebSocket | null = null;
   private reconnectAttempts = 0;
   private maxReconnectAttempts = 5;
   private reconnectDelay = 3000;
   private listeners: Map<string, Set<(data: any) => void>> = new Map();
+  // Position in the server's event stream, sent on reconnect to receive only missed events
+  private lastSeq: number | null = null;
+  private epoch: string | null = null;
 
   connect(): void {
+    // The server closes the socket (1008) without a valid access token
+    const token = getStoredToken();
+    if (!token) {
+      return;
+    }
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws`;
+    const params = new URLSearchParams({ token });
+    if (this.lastSeq !== null && this.epoch !== null) {
+      params.set('since', String(this.lastSeq));
+      params.set('epoch', this.epoch);
+    }
+    const wsUrl = `${protocol}//${window.location.host}/ws?${params}`;
     
     try {
       this.ws = new WebSocket(wsUrl);
+      this.ws.binaryType = 'arraybuffer';
 
       this.ws.onopen = () => {
         console.log('WebSocket connected');
@@ -28,7 +50,8 @@ export class WebSocketService {
 
       this.ws.onmessage = (event) => {
         try {
-          const message: WebSocketMessage = JSON.parse(event.data);
+          const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+          const message: WebSocketMessage = JSON.parse(text);
           this.handleMessage(message);
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
@@ -39,8 +62,14 @@ export class WebSocketService {
         console.error('WebSocket error:', error);
       };
 
-      this.ws.onclose = () => {
+      this.ws.onclose = (event) => {
         console.log('WebSocket disconnected');
+        if (event.code === 1008) {
+          // Token rejected: same as a 401 from the API
+          clearStoredToken();
+          window.dispatchEvent(new Event('auth-logout'));
+          return;
+        }
         this.attemptReconnect();
       };
     } catch (error) {
@@ -60,6 +89,22 @@ export class WebSocketService {
   }
 
   private handleMessage(message: WebSocketMessage): void {
+    if (message.late) {
+      // Sent once, live, and never replayed: apply it without moving the position
+    } else if (message.seq !== undefined) {
+      // Ignore anything already applied (replay can overlap live events)
+      if (message.epoch === this.epoch && this.lastSeq !== null && message.seq <= this.lastSeq) {
+        return;
+      }
+      this.lastSeq = message.seq;
+      this.epoch = message.epoch ?? null;
+    } else if (message.type === 'outstanding_total' && this.lastSeq === null) {
+      this.lastSeq = message.data.seq;
+      this.epoch = message.data.epoch;
+    } else if (message.type === 'resync') {
+      this.lastSeq = null;
+      this.epoch = null;
+    }
     const listeners = this.listeners.get(message.type);
     if (listeners) {
       listeners.forEach((callback) => callback(message.data));
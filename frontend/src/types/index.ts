@@ -31,6 +31,11 @@ export interface Transaction {
   updated_at?: string;
 }
 
+export interface TransactionPage {
+  items: Transaction[];
+  next_cursor: string | null;
+}
+
 export interface TransactionWithRelations extends Transaction {
   party?: Party;
   transaction_type?: TransactionType;